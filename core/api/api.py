@@ -1,16 +1,22 @@
 from flask import Flask, request, g
 from flask_restful import Api
-from typing import Optional, Callable, Type, Any, Dict
+from typing import Optional, Callable, Type, Any, Dict, List
 from functools import wraps
 from flask_sqlalchemy import SQLAlchemy
+from api.resources.batch import BatchResource
 from api.resources.library_item import LibraryItemResource
+from api.resources.library_item_bulk import LibraryItemBulkResource
 from api.resources.playlist import PlaylistResource
 from api.resources.playlist_item import PlaylistItemResource
 from api.resources.system_event import SystemEventResource
 from api.resources.system_user import SystemUserResource
 from api.resources.library import LibraryResource
+from api.resources.library_stats import LibraryStatsResource
+from api.resources.search import SearchResource
 from api.resources.version import VersionResource
 from api.auth import ApiAuthenticator
+from api.compression import ResponseCompressor
+from api.metrics import RequestMetrics
 from api.validators import InputValidator
 
 
@@ -20,6 +26,8 @@ class APIHandler:
         self.api: Api = Api(self.app)
         self.db: SQLAlchemy = db
         self.authenticator: ApiAuthenticator = ApiAuthenticator(app, db)
+        self.compressor: ResponseCompressor = ResponseCompressor(app)
+        self.metrics: RequestMetrics = RequestMetrics(app, db)
         self.validator: Type[InputValidator] = validator
         self.setup_routes()
 
@@ -33,15 +41,17 @@ class APIHandler:
 
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            _token_raw: Optional[str] = request.headers.get("Authorization")
-            _token: Optional[str] = (
-                _token_raw.split(" ")[1]
-                if _token_raw
-                and len(_token_raw.split(" ")) > 1
-                and len(_token_raw.split(" ")[1]) == 36
-                else None
-            )
-            user = self.authenticator.authenticate(_token)
+            # Requests of a batch run as the user who authenticated the batch
+            user = request.environ.get(BatchResource.USER_ENVIRON_KEY)
+            if user is None:
+                _token_raw: str = request.headers.get("Authorization", "")
+                _token_parts: List[str] = _token_raw.split(" ")
+                _token: Optional[str] = (
+                    _token_parts[1]
+                    if len(_token_parts) > 1 and len(_token_parts[1]) == 36
+                    else None
+                )
+                user = self.authenticator.authenticate(_token)
             if not user:
                 return self.unauthorized()
 
@@ -51,6 +61,13 @@ class APIHandler:
         return wrapper
 
     def setup_routes(self) -> None:
+        """
+        Register the API resources.
+
+        Every resource class is instantiated once here, with its repositories and
+        auth-wrapped methods (see `Resource.init_every_request`), and that instance
+        serves all requests of its routes.
+        """
         constructor_kwargs = {
             "require_auth": self.require_auth,
             "app": self.app,
@@ -78,6 +95,12 @@ class APIHandler:
             resource_class_kwargs=constructor_kwargs,
         )
 
+        self.api.add_resource(
+            LibraryStatsResource,
+            "/api/libraries/<uuid:library_id>/stats",
+            resource_class_kwargs=constructor_kwargs,
+        )
+
         self.api.add_resource(
             LibraryItemResource,
             "/api/libraries/<uuid:library_id>/items",
@@ -85,6 +108,16 @@ class APIHandler:
             resource_class_kwargs=constructor_kwargs,
         )
 
+        self.api.add_resource(
+            LibraryItemBulkResource,
+            "/api/libraries/<uuid:library_id>/items/bulk",
+            resource_class_kwargs=constructor_kwargs,
+        )
+
+        self.api.add_resource(
+            SearchResource, "/api/search", resource_class_kwargs=constructor_kwargs
+        )
+
         # Playlist routes
         self.api.add_resource(
             PlaylistResource, "/api/playlists", "/api/playlists/<uuid:playlist_id>"
@@ -96,5 +129,9 @@ class APIHandler:
             "/api/playlists/<uuid:playlist_id>/items/<uuid:item_id>",
         )
 
+        self.api.add_resource(
+            BatchResource, "/api/batch", resource_class_kwargs=constructor_kwargs
+        )
+
         # Version routes
         self.api.add_resource(VersionResource, "/version", "/api/system/version")
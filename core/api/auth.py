@@ -1,10 +1,152 @@
-from typing import Optional
+import mmap
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import ORMExecuteState, Session
+
+
+class InvalidationStamp:
+    """
+    A token in a memory-mapped file, shared by every process mapping the same file.
+
+    A process that changed users writes a new random token after the commit, and the
+    other processes drop their cached principals once they see it changed. Reading it
+    is a memory access, so it is checked on every cache hit. Writing is lock-free: the
+    token only has to differ from the previous one.
+    """
+
+    SIZE: int = 8
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        fd: int = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size < self.SIZE:
+                os.ftruncate(fd, self.SIZE)
+            self._mmap: mmap.mmap = mmap.mmap(fd, self.SIZE)
+        finally:
+            os.close(fd)
+
+    def read(self) -> bytes:
+        return self._mmap[: self.SIZE]
+
+    def bump(self) -> None:
+        self._mmap[: self.SIZE] = os.urandom(self.SIZE)
+
+
+class PrincipalCache:
+    """
+    Thread-safe TTL + LRU cache of authenticated principals, keyed by API key.
+
+    With a `stamp`, the cache is emptied whenever another process bumps it, and an
+    entry looked up before a bump is not stored, see `generation`.
+    """
+
+    def __init__(
+        self, max_size: int, ttl: float, stamp: Optional[InvalidationStamp] = None
+    ) -> None:
+        self.max_size: int = max_size
+        self.ttl: float = ttl
+        self.stamp: Optional[InvalidationStamp] = stamp
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+        self._generation: bytes = self.generation()
+
+    def generation(self) -> bytes:
+        """
+        Read the shared stamp, to pass to `set` along with a principal looked up after.
+        """
+        return self.stamp.read() if self.stamp is not None else b""
+
+    def _sync(self) -> None:
+        # Called with the lock held
+        generation: bytes = self.generation()
+        if generation != self._generation:
+            self._entries.clear()
+            self._generation = generation
+
+    def get(self, api_key: str) -> Optional[dict]:
+        with self._lock:
+            self._sync()
+            entry = self._entries.get(api_key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[api_key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(api_key)
+            self.hits += 1
+            return entry[1]
+
+    def set(
+        self, api_key: str, principal: dict, generation: Optional[bytes] = None
+    ) -> None:
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._sync()
+            if generation is not None and generation != self._generation:
+                return  # Users changed in another process since the lookup
+            self._entries[api_key] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(api_key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *api_keys: str) -> None:
+        with self._lock:
+            for api_key in api_keys:
+                self._entries.pop(api_key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
 
 
 class ApiAuthenticator:
+    """
+    Resolves API keys to principals, through a per-process `PrincipalCache`.
+
+    The session events below only see the writes of their own process. When the app
+    config has an `AUTH_CACHE_STAMP_PATH`, every process mapping that file (gunicorn
+    workers, the scheduler leader's tasks, the CLI) bumps it after committing user
+    changes, and all the others then drop their cached principals: a deactivated user
+    or regenerated key stops working everywhere on the next request. Without it, other
+    processes keep their entries for up to `AUTH_CACHE_TTL` seconds.
+    """
+
+    AUTH_CACHE_SIZE: int = 1024
+    AUTH_CACHE_TTL: float = 60.0
+    INVALIDATED_KEYS_INFO: str = "auth_invalidated_api_keys"
+    BULK_INVALIDATED_INFO: str = "auth_bulk_invalidated"
+
     def __init__(self, app, db) -> None:
         self.app = app
         self.db = db
+        stamp_path: Optional[str] = app.config.get("AUTH_CACHE_STAMP_PATH")
+        self.cache: PrincipalCache = PrincipalCache(
+            max_size=int(os.getenv("AUTH_CACHE_SIZE", self.AUTH_CACHE_SIZE)),
+            ttl=float(os.getenv("AUTH_CACHE_TTL", self.AUTH_CACHE_TTL)),
+            stamp=InvalidationStamp(stamp_path) if stamp_path else None,
+        )
+        self.register_invalidation_events()
 
     def authenticate(self, token: Optional[str]) -> Optional[dict]:
         """
@@ -15,6 +157,70 @@ class ApiAuthenticator:
         if not token:
             return None
 
-        return UserRepository(app=self.app, db=self.db).search_by_api_key(
+        principal: Optional[dict] = self.cache.get(token)
+        if principal is not None:
+            return principal
+
+        generation: bytes = self.cache.generation()
+        user = UserRepository(app=self.app, db=self.db).search_by_api_key(
             token, is_active=True, is_admin=False, is_confirmed=True
         )
+        if user is None:
+            return None
+
+        principal = user.api_response(full=False)
+        self.cache.set(token, principal, generation)
+        return principal
+
+    def register_invalidation_events(self) -> None:
+        """
+        Drop cached principals whenever a user is changed or deleted through the ORM.
+
+        Keys are dropped as soon as the change is flushed, and once more after the
+        commit so a concurrent request cannot re-cache the state from before it.
+        Bulk UPDATE and DELETE statements on users do not say which keys they touch,
+        so they clear the whole cache, at the same two points. Either way, the shared
+        stamp is bumped after the commit for the other processes.
+        """
+        event.listen(self.db.session, "after_flush", self._after_flush)
+        event.listen(self.db.session, "do_orm_execute", self._do_orm_execute)
+        event.listen(self.db.session, "after_commit", self._after_commit)
+        event.listen(self.db.session, "after_rollback", self._after_rollback)
+
+    def _after_flush(self, session: Session, flush_context: Any) -> None:
+        from models.user import User
+
+        api_keys: Set[str] = session.info.setdefault(self.INVALIDATED_KEYS_INFO, set())
+        for instance in (*session.dirty, *session.deleted):
+            if not isinstance(instance, User):
+                continue
+
+            history = inspect(instance).attrs.api_key.history
+            api_keys.update(key for key in (*history.deleted, instance.api_key) if key)
+
+        if api_keys:
+            self.cache.invalidate(*api_keys)
+
+    def _do_orm_execute(self, orm_execute_state: ORMExecuteState) -> None:
+        from models.user import User
+
+        if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ is User:
+            orm_execute_state.session.info[self.BULK_INVALIDATED_INFO] = True
+            self.cache.clear()
+
+    def _after_commit(self, session: Session) -> None:
+        api_keys: Set[str] = session.info.pop(self.INVALIDATED_KEYS_INFO, set())
+        bulk: bool = session.info.pop(self.BULK_INVALIDATED_INFO, False)
+        if api_keys:
+            self.cache.invalidate(*api_keys)
+        if bulk:
+            self.cache.clear()
+        if (api_keys or bulk) and self.cache.stamp is not None:
+            self.cache.stamp.bump()
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(self.INVALIDATED_KEYS_INFO, None)
+        session.info.pop(self.BULK_INVALIDATED_INFO, None)
@@ -0,0 +1,180 @@
+import os
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+from flask import Flask, Response, request
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+
+class GzipCompressor:
+    DEFAULT_LEVEL: int = 6
+    LEVELS: Tuple[int, int] = (1, 9)
+
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class ZstdCompressor:
+    DEFAULT_LEVEL: int = 3
+    LEVELS: Tuple[int, int] = (1, 19)
+
+    def __init__(self, level: int) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+class BrotliCompressor:
+    DEFAULT_LEVEL: int = 4
+    LEVELS: Tuple[int, int] = (0, 11)
+
+    def __init__(self, level: int) -> None:
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+Compressor = Union[GzipCompressor, ZstdCompressor, BrotliCompressor]
+
+
+def available_encodings() -> Dict[str, Callable[[int], Compressor]]:
+    """
+    Get the content codings this process can produce, in order of server preference.
+    """
+    encodings: Dict[str, Callable[[int], Compressor]] = {}
+    if zstandard is not None:
+        encodings["zstd"] = ZstdCompressor
+    if brotli is not None:
+        encodings["br"] = BrotliCompressor
+    encodings["gzip"] = GzipCompressor
+    return encodings
+
+
+class ResponseCompressor:
+    """
+    Negotiates a Content-Encoding from Accept-Encoding and compresses API responses.
+
+    Buffered responses are compressed once they reach `min_size` bytes, streamed
+    responses are always compressed, one flushed block per chunk of the stream.
+    """
+
+    EXTENSION_KEY: str = "response_compressor"
+    COMPRESSION_MIN_SIZE: int = 1024
+    SKIPPED_STATUS_CODES: Tuple[int, ...] = (204, 206, 304)
+
+    def __init__(
+        self,
+        app: Optional[Flask] = None,
+        min_size: Optional[int] = None,
+        level: Optional[int] = None,
+    ) -> None:
+        self.min_size: int = (
+            min_size
+            if min_size is not None
+            else int(os.getenv("COMPRESSION_MIN_SIZE", self.COMPRESSION_MIN_SIZE))
+        )
+        env_level: Optional[str] = os.getenv("COMPRESSION_LEVEL")
+        self.level: Optional[int] = (
+            level if level is not None else int(env_level) if env_level else None
+        )
+        self.encodings: Dict[str, Callable[[int], Compressor]] = available_encodings()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.extensions[self.EXTENSION_KEY] = self
+
+    def negotiate(self) -> Optional[str]:
+        """
+        Pick the preferred encoding the client accepts, or None to send the body as is.
+        """
+        if not request.accept_encodings:
+            return None
+        return request.accept_encodings.best_match(list(self.encodings))
+
+    def compressor(self, encoding: str) -> Compressor:
+        factory = self.encodings[encoding]
+        if self.level is None:
+            return factory(factory.DEFAULT_LEVEL)
+
+        lowest, highest = factory.LEVELS
+        return factory(min(max(self.level, lowest), highest))
+
+    def compress(self, response: Response) -> Response:
+        """
+        Compress the body of a response with the negotiated encoding, in place.
+        """
+        if (
+            response.status_code < 200
+            or response.status_code in self.SKIPPED_STATUS_CODES
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding: Optional[str] = self.negotiate()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self._compress_stream(
+                response.response, self.compressor(encoding)
+            )
+            response.headers.pop("Content-Length", None)
+        else:
+            data: bytes = response.get_data()
+            if len(data) < self.min_size:
+                return response
+
+            compressor = self.compressor(encoding)
+            response.set_data(compressor.compress(data) + compressor.finish())
+
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    def _compress_stream(
+        self, chunks: Iterable[Union[str, bytes]], compressor: Compressor
+    ) -> Iterator[bytes]:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            # Flush every chunk, so the client receives rows as they are produced
+            block: bytes = compressor.compress(chunk) + compressor.flush()
+            if block:
+                yield block
+        yield compressor.finish()
+
+
+def get_compressor(app: Flask) -> Optional[ResponseCompressor]:
+    return app.extensions.get(ResponseCompressor.EXTENSION_KEY)
@@ -0,0 +1,129 @@
+import dataclasses
+import logging
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, Optional, Type
+from uuid import UUID
+from flask import Flask, Response
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the stdlib provider is used without it
+    orjson = None
+
+
+def _default(o: Any) -> Any:
+    """
+    Serialize the non-JSON types `BaseModel` payloads carry, the same way for both providers.
+    """
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, (UUID, Decimal)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """
+    Flask's default provider, with ISO 8601 dates and a `dumpb` that returns bytes.
+    """
+
+    default = staticmethod(_default)
+
+    def dumpb(self, obj: Any) -> bytes:
+        """
+        Serialize data as compact JSON, encoded as UTF-8 bytes.
+        """
+        return self.dumps(obj, separators=(",", ":")).encode()
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    """
+    JSON provider backed by orjson.
+
+    datetime, date, time and UUID are serialized natively by orjson, Decimal through
+    `_default`. Calls with keyword arguments orjson has no equivalent for are passed
+    on to the stdlib implementation.
+    """
+
+    def options(self, indent: bool = False) -> int:
+        option: int = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumpb(obj).decode()
+
+    def dumpb(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=self.default, option=self.options())
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        indent: bool = (
+            self.compact is None and self._app.debug
+        ) or self.compact is False
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.options(indent))
+            + b"\n",
+            mimetype=self.mimetype,
+        )
+
+
+JSON_PROVIDERS: Dict[str, Type[StdlibJSONProvider]] = {
+    "stdlib": StdlibJSONProvider,
+    "orjson": OrjsonProvider,
+}
+
+
+def json_provider_class(name: Optional[str] = None) -> Type[StdlibJSONProvider]:
+    """
+    Resolve a JSON provider by name.
+
+    :param name: "orjson", "stdlib", or "auto"/None for orjson when it is installed
+    :return: The provider class, falling back to the stdlib one if orjson is missing
+    """
+    name = (name or "auto").lower()
+    if name == "auto":
+        name = "stdlib" if orjson is None else "orjson"
+    if name not in JSON_PROVIDERS:
+        raise ValueError(f"Unknown JSON provider '{name}'.")
+
+    if name == "orjson" and orjson is None:
+        logging.getLogger(__name__).warning(
+            "orjson is not installed, falling back to the stdlib JSON provider."
+        )
+        name = "stdlib"
+    return JSON_PROVIDERS[name]
+
+
+def dumpb(provider: JSONProvider, obj: Any) -> bytes:
+    """
+    Serialize data to compact JSON bytes with any provider, natively if it supports it.
+    """
+    if isinstance(provider, StdlibJSONProvider):
+        return provider.dumpb(obj)
+    return provider.dumps(obj).encode()
+
+
+def init_json_provider(app: Flask, name: Optional[str] = None) -> JSONProvider:
+    """
+    Install the selected JSON provider on a Flask app.
+    """
+    app.json_provider_class = json_provider_class(name)
+    app.json = app.json_provider_class(app)
+    return app.json
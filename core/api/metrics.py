@@ -0,0 +1,136 @@
+import os
+from time import perf_counter
+from typing import Any, Iterable, Optional, Tuple
+from flask import Flask, Response, request
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from metrics import (
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    LabelValues,
+    MultiProcessMetrics,
+    Registry,
+)
+
+
+class RequestMetrics:
+    """
+    Collect per-route request metrics and DB metrics, and serve them on /metrics.
+
+    Requests are timed from `before_request` to `after_request` (for streamed
+    responses, until the headers are ready) and labelled with the URL rule rather
+    than the path, so IDs do not create a series each. Query durations come from
+    the engine's cursor events. Metrics are per process: under gunicorn, the workers
+    set `multiprocess` so a scrape, served by any of them, covers all of them.
+    """
+
+    EXTENSION_KEY: str = "request_metrics"
+    ENDPOINT: str = "/metrics"
+    START_KEY: str = "dmdd.request_start"
+    CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(
+        self, app: Flask, db: SQLAlchemy, registry: Optional[Registry] = None
+    ) -> None:
+        self.app: Flask = app
+        self.db: SQLAlchemy = db
+        self.registry: Registry = registry or REGISTRY
+        self.multiprocess: Optional[MultiProcessMetrics] = None
+        self.enabled: bool = os.getenv("METRICS_ENABLED", "1").lower() not in (
+            "0",
+            "false",
+        )
+
+        self.request_duration: Histogram = self.registry.histogram(
+            "dmdd_http_request_duration_seconds",
+            "Duration of HTTP requests.",
+            ["route", "method", "status"],
+        )
+        self.requests_in_flight: Gauge = self.registry.gauge(
+            "dmdd_http_requests_in_flight", "HTTP requests being served."
+        )
+        self.query_duration: Histogram = self.registry.histogram(
+            "dmdd_db_query_duration_seconds", "Duration of SQL statements."
+        )
+        self.query_errors: Counter = self.registry.counter(
+            "dmdd_db_query_errors", "SQL statements that raised an error."
+        )
+        self.registry.gauge(
+            "dmdd_db_pool_connections",
+            "Connections of the DB pool, by state.",
+            ["state"],
+            callback=self.pool_connections,
+        )
+
+        if self.enabled:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.extensions[self.EXTENSION_KEY] = self
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        app.teardown_request(self.teardown_request)
+        app.add_url_rule(self.ENDPOINT, "metrics", self.render)
+
+        with app.app_context():
+            for engine in self.db.engines.values():
+                self.instrument_engine(engine)
+
+    def before_request(self) -> None:
+        request.environ[self.START_KEY] = perf_counter()
+        self.requests_in_flight.inc()
+
+    def after_request(self, response: Response) -> Response:
+        start: Optional[float] = request.environ.get(self.START_KEY)
+        if start is not None:
+            self.request_duration.observe(
+                perf_counter() - start,
+                request.url_rule.rule if request.url_rule else "unmatched",
+                request.method,
+                str(response.status_code),
+            )
+        return response
+
+    def teardown_request(self, exception: Optional[BaseException]) -> None:
+        # Also runs when the view raised and after_request was skipped
+        if request.environ.pop(self.START_KEY, None) is not None:
+            self.requests_in_flight.dec()
+
+    def instrument_engine(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self.after_cursor_execute)
+        event.listen(engine, "handle_error", self.handle_error)
+
+    def before_cursor_execute(self, conn, *args: Any) -> None:
+        conn.info.setdefault("query_start", []).append(perf_counter())
+
+    def after_cursor_execute(self, conn, *args: Any) -> None:
+        self.query_duration.observe(perf_counter() - conn.info["query_start"].pop())
+
+    def handle_error(self, context: Any) -> None:
+        self.query_errors.inc()
+        connection = context.connection
+        if connection is not None and connection.info.get("query_start"):
+            connection.info["query_start"].pop()
+
+    def pool_connections(self) -> Iterable[Tuple[LabelValues, float]]:
+        with self.app.app_context():
+            pool = self.db.engine.pool
+        # Pools without a fixed size (e.g. SQLite's) only report what they have
+        for state, attribute in (
+            ("size", "size"),
+            ("checked_out", "checkedout"),
+            ("checked_in", "checkedin"),
+            ("overflow", "overflow"),
+        ):
+            if callable(getattr(pool, attribute, None)):
+                yield (state,), getattr(pool, attribute)()
+
+    def render(self) -> Response:
+        if self.multiprocess is not None:
+            return Response(self.multiprocess.render(), content_type=self.CONTENT_TYPE)
+        return Response(self.registry.render(), content_type=self.CONTENT_TYPE)
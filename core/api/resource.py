@@ -1,11 +1,44 @@
-from typing import Dict, Optional, Any, Union, List
-from flask import jsonify, Response
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Any,
+    Set,
+    Tuple,
+    Type,
+    Union,
+    List,
+)
+from flask import current_app, request, stream_with_context, Response
 from flask_restful import Resource as BaseFlaskResource
+from datetime import datetime, timezone
+from itertools import islice
+import hashlib
 import logging
 import os
+import re
+
+from api.compression import get_compressor
+from api.json_provider import dumpb
+from models.model import BaseModel
+from repositories.repository import InvalidQueryError, parse_fieldset
 
 
 class Resource(BaseFlaskResource):
+    # Resources are built once when `APIHandler.setup_routes` registers them and are
+    # shared by all requests (and threads), so they must not keep request state on self.
+    init_every_request: bool = False
+
+    JSON_MIMETYPE: str = "application/json"
+    NDJSON_MIMETYPE: str = "application/x-ndjson"
+    STREAM_CHUNK_ROWS: int = 100
+    FILTER_PARAM = re.compile(r"^filter\[(\w+)\](?:\[(\w+)\])?$")
+    # Version prefix of the ETag of a record, see `entity_etag`
+    VERSION_FORMAT: str = "%Y%m%dT%H%M%S.%f"
+    # Content codings a strong ETag may carry as a suffix, see `with_validators`
+    CONTENT_CODINGS: Tuple[str, ...] = ("gzip", "zstd", "br")
+
     def __init__(
         self, *args: Any, logger: Optional[logging.Logger] = None, **kwargs: Any
     ):
@@ -15,7 +48,7 @@ class Resource(BaseFlaskResource):
         super().__init__(*args, **kwargs)
         class_name = self.__class__.__name__
         self.logger = logger or logging.getLogger(f"{__name__}.{class_name}")
-        self.logger.info(
+        self.logger.debug(
             "%s initialized with args: %s, kwargs: %s", class_name, args, kwargs
         )
 
@@ -27,12 +60,14 @@ class Resource(BaseFlaskResource):
     ) -> Response:
         """
         Ensure responses are always JSON serializable and compatible with Flask's Response.
+
+        The body is serialized by the app's JSON provider, see `api.json_provider`.
         """
         if isinstance(data, (dict, list)):
-            response = jsonify(data)
+            response = current_app.json.response(data)
         elif isinstance(data, (str, int, float, bool, type(None))):
             # Directly support primitives that are JSON-compatible
-            response = jsonify(data=data)
+            response = current_app.json.response(data=data)
         else:
             self.logger.error("Non-serializable response data provided.")
             response = Response("Invalid response data", mimetype="text/plain")
@@ -43,8 +78,256 @@ class Resource(BaseFlaskResource):
         if headers:
             response.headers.extend(headers)
 
+        return self.compress(response)
+
+    def wants_stream(self) -> bool:
+        """
+        Check whether the client asked for a streamed collection, through
+        `Accept: application/x-ndjson` or the `stream=1` query parameter.
+        """
+        return self.wants_ndjson() or request.args.get("stream") in ("1", "true")
+
+    def wants_ndjson(self) -> bool:
+        return (
+            request.accept_mimetypes.best_match(
+                [self.JSON_MIMETYPE, self.NDJSON_MIMETYPE]
+            )
+            == self.NDJSON_MIMETYPE
+        )
+
+    def stream_response(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        key: str,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        """
+        Stream a collection of serialized rows without building it in memory.
+
+        Clients accepting NDJSON get one JSON document per line, everyone else gets the
+        usual success envelope with the rows written out as a chunked JSON array.
+
+        :param rows: The serialized rows, typically a generator over `BaseRepository.stream`
+        :param key: The key of the collection inside the envelope's `data`
+        """
+        provider = current_app.json
+
+        def chunks() -> Iterator[List[Dict[str, Any]]]:
+            iterator = iter(rows)
+            while chunk := list(islice(iterator, self.STREAM_CHUNK_ROWS)):
+                yield chunk
+
+        def generate_ndjson() -> Iterator[bytes]:
+            for chunk in chunks():
+                yield b"".join(dumpb(provider, row) + b"\n" for row in chunk)
+
+        def generate_envelope() -> Iterator[bytes]:
+            yield b'{"status":"success","data":{' + dumpb(provider, key) + b":["
+            separator = b""
+            for chunk in chunks():
+                yield separator + b",".join(dumpb(provider, row) for row in chunk)
+                separator = b","
+            yield b"]}}"
+
+        if self.wants_ndjson():
+            generator, mimetype = generate_ndjson(), self.NDJSON_MIMETYPE
+        else:
+            generator, mimetype = generate_envelope(), self.JSON_MIMETYPE
+
+        response = Response(
+            stream_with_context(generator), status=status_code, mimetype=mimetype
+        )
+        if headers:
+            response.headers.extend(headers)
+        return self.compress(response)
+
+    def compress(self, response: Response) -> Response:
+        """
+        Apply the negotiated Content-Encoding, when the app has a `ResponseCompressor`.
+        """
+        compressor = get_compressor(current_app)
+        if compressor is None:
+            return response
+        return compressor.compress(response)
+
+    def make_etag(self, *parts: Any) -> str:
+        """
+        Derive an ETag from the parts that identify a representation.
+        """
+        return hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+
+    def entity_etag(
+        self,
+        _id: Any,
+        version: datetime,
+        fields: Optional[Tuple[str, ...]] = None,
+        last_modified: Optional[datetime] = None,
+    ) -> str:
+        """
+        Derive the strong ETag of a record, prefixed with its version (updated_at).
+
+        The prefix lets a write check `If-Match` in its own WHERE clause instead of
+        reading the record first, see `if_match_versions`.
+
+        :param last_modified: The last modification of the rows the representation
+            nests, when newer than the record, see `BaseRepository.get_versions`
+        """
+        return (
+            f"{version.strftime(self.VERSION_FORMAT)}-"
+            f"{self.make_etag(_id, last_modified or version, fields)}"
+        )
+
+    def if_match_versions(self) -> Optional[List[datetime]]:
+        """
+        Read the record versions (updated_at) the ETags of `If-Match` stand for.
+
+        If-Match uses the strong comparison, so weak tags never match. The strong tags
+        of a version carry the same version prefix, whatever their fields or content
+        coding.
+
+        :return: The versions a write may apply to, None when any version will do
+            (no If-Match, or `*`), an empty list when no tag names a version
+        """
+        if not request.if_match or request.if_match.star_tag:
+            return None
+
+        versions: List[datetime] = []
+        for tag in request.if_match.as_set():
+            try:
+                versions.append(
+                    datetime.strptime(
+                        self.strip_content_coding(tag).split("-", 1)[0],
+                        self.VERSION_FORMAT,
+                    )
+                )
+            except ValueError:
+                continue  # Not one of ours, it cannot match
+        return versions
+
+    def if_unmodified_since(self) -> Optional[datetime]:
+        """
+        Read `If-Unmodified-Since` as a naive UTC datetime, like the updated_at columns.
+        """
+        since: Optional[datetime] = request.if_unmodified_since
+        return since.replace(tzinfo=None) if since else None
+
+    def collection_etag(self, last_modified: Optional[datetime], count: int) -> str:
+        """
+        Derive the ETag of a collection from its max(updated_at) and row count.
+
+        The query string and negotiated format are part of the tag, since every page,
+        filter and stream format is a different representation of the collection. Like
+        the tags of records, it is sent as a strong validator, see `with_validators`.
+        """
+        return self.make_etag(
+            last_modified, count, request.query_string.decode(), self.wants_ndjson()
+        )
+
+    def strip_content_coding(self, etag: str) -> str:
+        """
+        Remove the content coding suffix `with_validators` adds to a strong ETag.
+        """
+        base, _, coding = etag.rpartition("-")
+        return base if base and coding in self.CONTENT_CODINGS else etag
+
+    def not_modified(
+        self, etag: str, last_modified: Optional[datetime] = None
+    ) -> Optional[Response]:
+        """
+        Answer a conditional GET with 304 Not Modified when the client's copy is current.
+
+        If-None-Match takes precedence over If-Modified-Since, as in RFC 9110. It uses
+        the weak comparison, whatever content coding the client's copy was sent with,
+        and the 304 carries the tag of that copy.
+
+        :return: A 304 response, or None when the full response has to be sent
+        """
+        if request.if_none_match:
+            fresh = request.if_none_match.star_tag
+            for tag in request.if_none_match.as_set(include_weak=True):
+                if self.strip_content_coding(tag) == etag:
+                    fresh, etag = True, tag
+                    break
+        elif request.if_modified_since and last_modified:
+            fresh = _as_http_date(last_modified) <= request.if_modified_since
+        else:
+            fresh = False
+
+        if not fresh:
+            return None
+        return self.with_validators(Response(status=304), etag, last_modified)
+
+    def with_validators(
+        self, response: Response, etag: str, last_modified: Optional[datetime] = None
+    ) -> Response:
+        """
+        Attach the ETag and Last-Modified validators to a response.
+
+        ETags are sent as strong validators, which name the exact bytes sent, so the
+        content coding of a compressed response is appended to them, e.g. `<tag>-gzip`.
+        `not_modified` ignores that suffix, as If-None-Match uses the weak comparison.
+        """
+        encoding: Optional[str] = response.headers.get("Content-Encoding")
+        if encoding:
+            etag = f"{etag}-{encoding}"
+        response.set_etag(etag)
+        if last_modified:
+            response.last_modified = _as_http_date(last_modified)
         return response
 
+    def pagination_args(self) -> Tuple[Optional[int], Optional[str]]:
+        """
+        Read the keyset pagination parameters (`limit` and `after`) from the query string.
+        """
+        limit: Optional[int] = request.args.get("limit", type=int)
+        after: Optional[str] = request.args.get("after") or None
+        return limit, after
+
+    def fields_arg(self, model: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+        """
+        Read the sparse fieldset of `model` (`fields=a,b`) from the query string.
+
+        :return: The fieldset, or None when the client did not ask for one
+        :raises InvalidFieldsError: When it names fields the model does not expose
+        """
+        fields: Optional[str] = request.args.get("fields")
+        return None if fields is None else parse_fieldset(model, fields)
+
+    def include_args(self) -> Set[str]:
+        """
+        Read the optional parts a client asked to include (`include=a,b`) from the query string.
+        """
+        return {
+            part.strip()
+            for part in request.args.get("include", "").split(",")
+            if part.strip()
+        }
+
+    def filter_args(self) -> List[Tuple[str, str, str]]:
+        """
+        Read the list filters (`filter[field]=v` or `filter[field][op]=v`) from the query string.
+
+        :return: (field, operator, value) triples, see `BaseRepository.list_query`
+        :raises InvalidQueryError: When a filter parameter is malformed
+        """
+        filters: List[Tuple[str, str, str]] = []
+        for key, value in request.args.items(multi=True):
+            if not key.startswith("filter"):
+                continue
+            match = self.FILTER_PARAM.match(key)
+            if match is None:
+                raise InvalidQueryError(f"Malformed filter parameter '{key}'.")
+            field, operator = match.groups()
+            filters.append((field, operator or "eq", value))
+        return filters
+
+    def sort_arg(self) -> Optional[str]:
+        """
+        Read the list sort (`sort=field` or `sort=-field` for descending) from the query string.
+        """
+        return request.args.get("sort") or None
+
     def success_response(
         self,
         data: Optional[Union[str, List[Any], Dict[Any, Any]]] = None,
@@ -91,3 +374,10 @@ class Resource(BaseFlaskResource):
             response_data["message"] = "An internal server error occurred."
 
         return self.make_response(response_data, status_code)
+
+
+def _as_http_date(value: datetime) -> datetime:
+    """
+    Convert a naive UTC timestamp to the second precision used by HTTP dates.
+    """
+    return value.replace(microsecond=0, tzinfo=value.tzinfo or timezone.utc)
@@ -1,12 +1,17 @@
-from typing import Callable, Tuple, Type
-from flask import Flask
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from flask import Flask, Response, request
 from flask_sqlalchemy import SQLAlchemy
 from api.validators import InputValidator
 from api.resource import Resource
+from models.model import BaseModel
+from repositories.repository import BaseRepository
 
 
 class AuthResource(Resource):
     func_auth_required: Tuple[str, ...] = ()
+    # Fields a PATCH cannot change, updated_at is read as a precondition instead
+    READ_ONLY_FIELDS: Tuple[str, ...] = ("id", "created_at")
 
     def __init__(
         self,
@@ -15,6 +20,7 @@ class AuthResource(Resource):
         db: SQLAlchemy,
         validator: Type[InputValidator],
     ) -> None:
+        super().__init__()
         self.app: Flask = app
         self.db: SQLAlchemy = db
         self.require_auth: Callable = require_auth
@@ -23,6 +29,9 @@ class AuthResource(Resource):
         self.apply_auths()
 
     def apply_auths(self) -> None:
+        """
+        Wrap the methods of `func_auth_required` with the auth check, once per resource.
+        """
         for func in self.func_auth_required:
             if (
                 hasattr(self, func)
@@ -33,3 +42,79 @@ class AuthResource(Resource):
 
     def apply_auth(self, func) -> Callable:
         return self.require_auth(func)
+
+    def patch_response(
+        self,
+        repo: BaseRepository,
+        model: Type[BaseModel],
+        _id: Any,
+        name: str,
+        **scope: Any,
+    ) -> Response:
+        """
+        Apply a partial JSON body to one record with a single UPDATE ... RETURNING.
+
+        Optimistic concurrency comes from `If-Match` (ETags of `entity_etag`, exact to
+        the microsecond), or from `If-Unmodified-Since` or an `updated_at` in the body
+        (to the second): a record changed since is answered with 412 Precondition
+        Failed. Only a failed update reads the record, to tell a missing record from
+        a changed one.
+
+        The response holds the columns of the returned row (relationships would take
+        more queries), with the validators of its new version.
+
+        :param name: The name of the record in messages, e.g. "Library"
+        :param scope: Equality filters the record must also match, e.g. its library
+        """
+        data: Any = request.get_json(silent=True)
+        if not isinstance(data, dict) or not data:
+            return self.failure_response("Invalid input data", status_code=400)
+
+        values: Dict[str, Any] = dict(data)
+        unmodified_since: Optional[datetime] = self.if_unmodified_since()
+        if "updated_at" in values:
+            # Serialized as in responses, i.e. to the second like If-Unmodified-Since
+            try:
+                version: datetime = datetime.fromisoformat(values.pop("updated_at"))
+            except (TypeError, ValueError):
+                return self.failure_response(
+                    errors=["Field 'updated_at' should be an ISO 8601 date."],
+                    status_code=400,
+                )
+            version = version.replace(tzinfo=None)
+            unmodified_since = min(version, unmodified_since or version)
+
+        errors: List[str] = [
+            f"Field '{field}' cannot be changed."
+            for field in self.READ_ONLY_FIELDS
+            if field in values
+        ]
+        errors += self.validator.verify_input(values, model, partial=True)
+        if errors:
+            return self.failure_response(errors=errors, status_code=400)
+        if not values:
+            return self.failure_response("No fields to update", status_code=400)
+
+        entity: Optional[BaseModel] = repo.patch(
+            _id,
+            values,
+            versions=self.if_match_versions(),
+            unmodified_since=unmodified_since,
+            **scope,
+        )
+        if entity is None:
+            if repo.get_version(_id, **scope) is None:
+                return self.failure_response(f"{name} not found", status_code=404)
+            return self.failure_response(
+                f"{name} was modified since, fetch it again", status_code=412
+            )
+
+        fields: Tuple[str, ...] = model.column_fields()
+        return self.with_validators(
+            self.success_response(
+                data=entity.api_response(fields=fields),
+                message=f"{name} updated successfully",
+            ),
+            self.entity_etag(entity.id, entity.updated_at, fields),
+            entity.updated_at,
+        )
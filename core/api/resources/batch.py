@@ -0,0 +1,185 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from flask import Flask, Response, g, request
+from flask_sqlalchemy import SQLAlchemy
+from werkzeug.test import EnvironBuilder
+
+from api.resources.auth import AuthResource
+from api.validators import InputValidator
+
+
+class BatchResource(AuthResource):
+    """
+    Run many API requests in one round trip.
+
+    The body is a JSON array (or `{"requests": [...]}`) of sub-requests, each with a
+    `method`, a `path` under /api/, an optional JSON `body` and an optional client
+    `id` echoed back. Sub-requests are dispatched internally through the URL map as
+    the user who authenticated the batch, and answered in order with their own
+    status codes.
+
+    Runs of consecutive GETs are dispatched concurrently, each on its own session.
+    Other methods act as barriers: they run one at a time, in order, in the app
+    context and DB session of the batch, and see the writes of earlier sub-requests.
+    """
+
+    func_auth_required: Tuple[str, ...] = ("post",)
+    MAX_BATCH_REQUESTS: int = 50
+    MAX_CONCURRENT_READS: int = 4
+    METHODS: Tuple[str, ...] = ("GET", "POST", "PUT", "PATCH", "DELETE")
+
+    # WSGI environ key carrying the batch's user to the auth check of sub-requests.
+    # Clients cannot set it, request headers only reach the environ as HTTP_*.
+    USER_ENVIRON_KEY: str = "dmdd.batch_user"
+
+    def __init__(
+        self,
+        require_auth: Callable,
+        app: Flask,
+        db: SQLAlchemy,
+        validator: Type[InputValidator],
+    ) -> None:
+        super().__init__(require_auth, app, db, validator)
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=self.MAX_CONCURRENT_READS, thread_name_prefix="api-batch"
+        )
+
+    def post(self):
+        """
+        Dispatch a batch of sub-requests and combine their responses.
+        """
+        try:
+            body: Any = request.get_json(silent=True)
+            sub_requests: Any = body.get("requests") if isinstance(body, dict) else body
+            if not isinstance(sub_requests, list) or not sub_requests:
+                return self.failure_response(
+                    "Expected a non-empty JSON array of requests", status_code=400
+                )
+            if len(sub_requests) > self.MAX_BATCH_REQUESTS:
+                return self.failure_response(
+                    f"At most {self.MAX_BATCH_REQUESTS} requests can be batched",
+                    status_code=413,
+                )
+
+            errors: List[str] = [
+                f"Request {index}: {error}"
+                for index, sub_request in enumerate(sub_requests)
+                for error in self.validate_sub_request(sub_request)
+            ]
+            if errors:
+                return self.failure_response(errors=errors, status_code=400)
+
+            results: List[Optional[Dict[str, Any]]] = [None] * len(sub_requests)
+            reads: List[Tuple[int, Dict[str, Any]]] = []
+            for index, sub_request in enumerate(sub_requests):
+                if sub_request["method"].upper() == "GET":
+                    reads.append((index, sub_request))
+                    continue
+                self.run_reads(reads, results)
+                results[index] = self.dispatch(sub_request)
+            self.run_reads(reads, results)
+
+            return self.success_response(data={"responses": results})
+        except Exception as e:
+            return self.exception_response(e)
+
+    def validate_sub_request(self, sub_request: Any) -> List[str]:
+        if not isinstance(sub_request, dict):
+            return ["should be a JSON object."]
+        errors: List[str] = []
+        method: Any = sub_request.get("method")
+        path: Any = sub_request.get("path")
+        if not isinstance(method, str) or method.upper() not in self.METHODS:
+            errors.append(f"'method' should be one of {', '.join(self.METHODS)}.")
+        if not isinstance(path, str) or not path.startswith("/api/"):
+            errors.append("'path' should be an API path starting with /api/.")
+        elif path.split("?")[0].rstrip("/") == request.path.rstrip("/"):
+            errors.append("batches cannot be nested.")
+        return errors
+
+    def run_reads(
+        self,
+        reads: List[Tuple[int, Dict[str, Any]]],
+        results: List[Optional[Dict[str, Any]]],
+    ) -> None:
+        """
+        Dispatch a run of GETs concurrently, then clear it.
+        """
+        if len(reads) == 1:
+            index, sub_request = reads[0]
+            results[index] = self.dispatch(sub_request)
+        elif reads:
+            futures = [
+                (
+                    index,
+                    self.executor.submit(
+                        self.dispatch_in_thread, sub_request, self.environ(sub_request)
+                    ),
+                )
+                for index, sub_request in reads
+            ]
+            for index, future in futures:
+                results[index] = future.result()
+        reads.clear()
+
+    def environ(self, sub_request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the WSGI environ of a sub-request, carrying the batch's user.
+        """
+        builder = EnvironBuilder(
+            path=sub_request["path"],
+            method=sub_request["method"].upper(),
+            base_url=request.host_url,
+            headers={"Accept": self.JSON_MIMETYPE},
+            json=sub_request.get("body"),
+        )
+        try:
+            environ: Dict[str, Any] = builder.get_environ()
+        finally:
+            builder.close()
+        environ[self.USER_ENVIRON_KEY] = g.user
+        return environ
+
+    def dispatch(
+        self, sub_request: Dict[str, Any], environ: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Dispatch a sub-request through the app and collect its response.
+
+        Within the batch's app context, the request context of the sub-request reuses
+        that app context, and with it `g` and the DB session.
+        """
+        with self.app.request_context(environ or self.environ(sub_request)):
+            try:
+                response: Response = self.app.full_dispatch_request()
+                status, data = response.status_code, self.response_data(response)
+            except Exception:
+                self.logger.error("Batched request failed", exc_info=True)
+                status = 500
+                data = {
+                    "status": "error",
+                    "message": "An internal server error occurred.",
+                }
+
+        result: Dict[str, Any] = {"status": status, "body": data}
+        if "id" in sub_request:
+            result["id"] = sub_request["id"]
+        return result
+
+    def dispatch_in_thread(
+        self, sub_request: Dict[str, Any], environ: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Dispatch a sub-request from a worker thread, in an app context of its own.
+
+        The environ has to be built by the request thread, see `environ`.
+        """
+        with self.app.app_context():
+            return self.dispatch(sub_request, environ)
+
+    def response_data(self, response: Response) -> Any:
+        if response.status_code == 204:
+            return None
+        if response.is_json:
+            return response.get_json()
+        return response.get_data(as_text=True)
@@ -1,43 +1,136 @@
-from typing import Optional, Tuple, Type
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
 from flask import Flask, request
 from flask_sqlalchemy import SQLAlchemy
 from api.resources.auth import AuthResource
 from api.validators import InputValidator
 from models.library import Library
 from repositories.library_repository import LibraryRepository
+from repositories.library_stats_repository import LibraryStatsRepository
+from repositories.repository import (
+    InvalidCursorError,
+    InvalidFieldsError,
+    InvalidQueryError,
+    ListQuery,
+)
 
 
 class LibraryResource(AuthResource):
-    func_auth_required: Tuple[str, ...] = ("get", "post", "put", "delete")
+    func_auth_required: Tuple[str, ...] = ("get", "post", "put", "patch", "delete")
 
     def __init__(
         self, require_auth, app: Flask, db: SQLAlchemy, validator: Type[InputValidator]
     ) -> None:
         super().__init__(require_auth, app, db, validator)
         self.repo = LibraryRepository(app=self.app, db=self.db)
+        self.stats_repo = LibraryStatsRepository(app=self.app, db=self.db)
 
     def get(self, library_id: Optional[str] = None):
         """
         Fetch a library by ID or list all libraries.
+
+        With `include=stats` every library carries its item statistics. Those change
+        with the items rather than the library, so such responses are not cached
+        through ETag or Last-Modified.
         """
         try:
+            fields: Optional[Tuple[str, ...]] = self.fields_arg(Library)
+            with_stats: bool = "stats" in self.include_args()
             if library_id:
-                library = self.repo.get_by_id(library_id)
+                versions = self.repo.get_versions(
+                    library_id, fields or Library.serialize_only
+                )
+                if versions is None:
+                    return self.failure_response("Library not found", status_code=404)
+
+                version, last_modified = versions
+                etag = self.entity_etag(library_id, version, fields, last_modified)
+                not_modified = (
+                    None if with_stats else self.not_modified(etag, last_modified)
+                )
+                if not_modified:
+                    return not_modified
+
+                library = self.repo.get_by_id(library_id, profile=fields or "full")
                 if not library:
                     return self.failure_response("Library not found", status_code=404)
-                return self.success_response(data=library.api_response(full=True))
+                data = library.api_response(full=True, fields=fields)
+                if with_stats:
+                    data["stats"] = self.stats_repo.get_for_library(library_id)
+                    return self.success_response(data=data)
+                return self.with_validators(
+                    self.success_response(data=data), etag, last_modified
+                )
+
+            list_query: ListQuery = self.repo.list_query(
+                self.filter_args(), self.sort_arg()
+            )
+            last_modified, count = self.repo.get_collection_version(
+                *list_query.criteria, fields=fields
+            )
+            etag = self.collection_etag(last_modified, count)
+            not_modified = (
+                None if with_stats else self.not_modified(etag, last_modified)
+            )
+            if not_modified:
+                return not_modified
+
+            if self.wants_stream():
+                libraries: Iterable[Library] = self.repo.stream(
+                    profile=fields or "head", list_query=list_query
+                )
+                response = self.stream_response(
+                    self.serialize(libraries, fields, with_stats), "libraries"
+                )
             else:
-                libraries = self.repo.get_all()
-                return self.success_response(
+                limit, after = self.pagination_args()
+                libraries, next_cursor = self.repo.get_page(
+                    limit=limit,
+                    after=after,
+                    profile=fields or "head",
+                    list_query=list_query,
+                )
+                response = self.success_response(
                     data={
-                        "libraries": [
-                            library.api_response(full=False) for library in libraries
-                        ]
+                        "libraries": list(
+                            self.serialize(libraries, fields, with_stats)
+                        ),
+                        "next_cursor": next_cursor,
                     }
                 )
+            if with_stats:
+                return response
+            return self.with_validators(response, etag, last_modified)
+        except (InvalidCursorError, InvalidFieldsError, InvalidQueryError) as e:
+            return self.failure_response(str(e), status_code=400)
         except Exception as e:
             return self.exception_response(e)
 
+    def serialize(
+        self,
+        libraries: Iterable[Library],
+        fields: Optional[Tuple[str, ...]],
+        with_stats: bool,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Serialize listed libraries, fetching their statistics one chunk of rows at a time.
+        """
+        libraries = iter(libraries)
+        while True:
+            chunk: List[Library] = list(islice(libraries, self.STREAM_CHUNK_ROWS))
+            if not chunk:
+                return
+            stats: Dict[str, Dict[str, Any]] = (
+                self.stats_repo.get_for_libraries(library.id for library in chunk)
+                if with_stats
+                else {}
+            )
+            for library in chunk:
+                data: Dict[str, Any] = library.api_response(full=False, fields=fields)
+                if with_stats:
+                    data["stats"] = stats[library.id]
+                yield data
+
     def post(self):
         """
         Create a new library.
@@ -94,6 +187,15 @@ class LibraryResource(AuthResource):
         except Exception as e:
             return self.exception_response(e)
 
+    def patch(self, library_id: str):
+        """
+        Update some fields of a library by ID, see `patch_response`.
+        """
+        try:
+            return self.patch_response(self.repo, Library, library_id, "Library")
+        except Exception as e:
+            return self.exception_response(e)
+
     def delete(self, library_id: str):
         """
         Delete a library by ID.
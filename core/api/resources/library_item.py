@@ -9,10 +9,23 @@ from api.resources.auth import AuthResource
 from api.validators import InputValidator
 
 from repositories.library_item_repository import LibraryItemRepository
+from repositories.repository import (
+    InvalidCursorError,
+    InvalidFieldsError,
+    InvalidQueryError,
+    ListQuery,
+)
 
 
 class LibraryItemResource(AuthResource):
-    func_auth_required: Tuple[str, ...] = ("get", "post", "put", "delete", "link")
+    func_auth_required: Tuple[str, ...] = (
+        "get",
+        "post",
+        "put",
+        "patch",
+        "delete",
+        "link",
+    )
 
     def __init__(
         self,
@@ -26,31 +39,91 @@ class LibraryItemResource(AuthResource):
             app=self.app, db=self.db
         )
 
-    def get(self, item_id: Optional[str] = None):
+    def get(self, library_id: str, item_id: Optional[str] = None):
         """
-        Fetch a library item by ID or list all library items.
+        Fetch a library item by ID or list the items of a library.
         """
         try:
+            fields: Optional[Tuple[str, ...]] = self.fields_arg(LibraryItem)
             if item_id:
-                item: Optional[LibraryItem] = self.repo.get_by_id(item_id)
+                versions = self.repo.get_versions(
+                    item_id,
+                    fields or LibraryItem.serialize_only,
+                    library_id=str(library_id),
+                )
+                if versions is None:
+                    return self.failure_response(
+                        "Library item not found", status_code=404
+                    )
+
+                version, last_modified = versions
+                etag = self.entity_etag(item_id, version, fields, last_modified)
+                not_modified = self.not_modified(etag, last_modified)
+                if not_modified:
+                    return not_modified
+
+                item: Optional[LibraryItem] = self.repo.get_in_library(
+                    item_id, library_id, profile=fields or "full"
+                )
                 if not item:
                     return self.failure_response(
                         "Library item not found", status_code=404
                     )
-                return self.success_response(data=item.api_response(full=True))
+                return self.with_validators(
+                    self.success_response(
+                        data=item.api_response(full=True, fields=fields)
+                    ),
+                    etag,
+                    last_modified,
+                )
+
+            list_query: ListQuery = self.repo.list_query_for_library(
+                library_id, self.filter_args(), self.sort_arg()
+            )
+            last_modified, count = self.repo.get_collection_version(
+                *list_query.criteria, fields=fields
+            )
+            etag = self.collection_etag(last_modified, count)
+            not_modified = self.not_modified(etag, last_modified)
+            if not_modified:
+                return not_modified
+
+            if self.wants_stream():
+                response = self.stream_response(
+                    (
+                        item.api_response(full=False, fields=fields)
+                        for item in self.repo.stream(
+                            profile=fields or "head", list_query=list_query
+                        )
+                    ),
+                    "library_items",
+                )
             else:
-                items: List[LibraryItem] = self.repo.get_all()
-                return self.success_response(
+                limit, after = self.pagination_args()
+                items, next_cursor = self.repo.get_page_for_library(
+                    library_id,
+                    limit=limit,
+                    after=after,
+                    profile=fields or "head",
+                    list_query=list_query,
+                )
+                response = self.success_response(
                     data={
                         "library_items": [
-                            item.api_response(full=False) for item in items
-                        ]
+                            item.api_response(full=False, fields=fields)
+                            for item in items
+                        ],
+                        "total": count,
+                        "next_cursor": next_cursor,
                     }
                 )
+            return self.with_validators(response, etag, last_modified)
+        except (InvalidCursorError, InvalidFieldsError, InvalidQueryError) as e:
+            return self.failure_response(str(e), status_code=400)
         except Exception as e:
             return self.exception_response(e)
 
-    def post(self):
+    def post(self, library_id: str):
         """
         Create a new library item.
         """
@@ -74,7 +147,7 @@ class LibraryItemResource(AuthResource):
                     file_path=item_data["file_path"],
                     is_public=item_data.get("is_public", True),
                     owner_id=item_data.get("owner_id"),
-                    library_id=item_data.get("library_id"),
+                    library_id=str(library_id),
                 )
             )
             return self.success_response(
@@ -85,7 +158,7 @@ class LibraryItemResource(AuthResource):
         except Exception as e:
             return self.exception_response(e)
 
-    def put(self, item_id: str):
+    def put(self, library_id: str, item_id: str):
         """
         Update an existing library item by ID.
         """
@@ -94,7 +167,7 @@ class LibraryItemResource(AuthResource):
             if item_data is None:
                 return self.failure_response("Invalid input data", status_code=400)
 
-            item = self.repo.get_by_id(item_id)
+            item = self.repo.get_in_library(item_id, library_id)
             if not item:
                 return self.failure_response("Library item not found", status_code=404)
 
@@ -114,12 +187,27 @@ class LibraryItemResource(AuthResource):
         except Exception as e:
             return self.exception_response(e)
 
-    def delete(self, item_id: str):
+    def patch(self, library_id: str, item_id: str):
+        """
+        Update some fields of a library item by ID, see `patch_response`.
+        """
+        try:
+            return self.patch_response(
+                self.repo,
+                LibraryItem,
+                item_id,
+                "Library item",
+                library_id=str(library_id),
+            )
+        except Exception as e:
+            return self.exception_response(e)
+
+    def delete(self, library_id: str, item_id: str):
         """
         Delete a library item by ID.
         """
         try:
-            item = self.repo.get_by_id(item_id)
+            item = self.repo.get_in_library(item_id, library_id)
             if not item:
                 return self.failure_response("Library item not found", status_code=404)
 
@@ -0,0 +1,158 @@
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type
+from flask import Flask, current_app, request
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import IntegrityError
+
+from models.library_item import LibraryItem
+
+from api.resources.auth import AuthResource
+from api.validators import InputValidator
+
+from repositories.library_item_repository import LibraryItemRepository
+from repositories.library_repository import LibraryRepository
+
+
+class LibraryItemBulkResource(AuthResource):
+    """
+    Create many library items of one library in a single transaction.
+
+    The body is either a JSON array of items or NDJSON with one item per line. Every
+    row is validated up front, the valid rows are inserted with multi-row INSERTs and
+    committed once, and the response reports the outcome of each row by its index.
+    """
+
+    func_auth_required: Tuple[str, ...] = ("post",)
+    MAX_BULK_ITEMS: int = 10_000
+
+    def __init__(
+        self,
+        require_auth: Callable,
+        app: Flask,
+        db: SQLAlchemy,
+        validator: Type[InputValidator],
+    ) -> None:
+        super().__init__(require_auth, app, db, validator)
+        self.repo: LibraryItemRepository = LibraryItemRepository(
+            app=self.app, db=self.db
+        )
+        self.library_repo: LibraryRepository = LibraryRepository(
+            app=self.app, db=self.db
+        )
+
+    def post(self, library_id: str):
+        """
+        Create a batch of library items.
+        """
+        try:
+            rows: Optional[List[Any]] = self.read_rows()
+            if rows is None:
+                return self.failure_response(
+                    "Expected a JSON array or an NDJSON body", status_code=400
+                )
+            if not rows:
+                return self.failure_response("No items provided", status_code=400)
+            if len(rows) > self.MAX_BULK_ITEMS:
+                return self.failure_response(
+                    f"At most {self.MAX_BULK_ITEMS} items can be created at once",
+                    status_code=413,
+                )
+
+            if self.library_repo.get_version(library_id) is None:
+                return self.failure_response("Library not found", status_code=404)
+
+            results: List[Dict[str, Any]] = [
+                {"index": index, "status": "error"} for index in range(len(rows))
+            ]
+            valid: Dict[int, Dict[str, Any]] = {}
+            for index, item_data in enumerate(rows):
+                errors: List[str] = self.validate_row(item_data)
+                if errors:
+                    results[index]["errors"] = errors
+                    continue
+                valid[index] = self.build_row(item_data, library_id)
+
+            self.reject_duplicate_names(valid, results)
+
+            try:
+                ids: List[str] = self.repo.insert_many(list(valid.values()))
+            except IntegrityError:
+                # A concurrent request took one of the names after the lookup
+                return self.failure_response(
+                    "Library items conflict with existing data, nothing was created",
+                    status_code=409,
+                )
+
+            for index, item_id in zip(valid, ids):
+                results[index] = {"index": index, "status": "created", "id": item_id}
+
+            created: int = len(ids)
+            data: Dict[str, Any] = {
+                "results": results,
+                "created": created,
+                "failed": len(rows) - created,
+            }
+            if not created:
+                return self.failure_response(
+                    "No library items were created", errors=data, status_code=400
+                )
+            return self.success_response(
+                data=data,
+                message=f"{created} library items created",
+                status_code=201 if created == len(rows) else 207,
+            )
+        except Exception as e:
+            return self.exception_response(e)
+
+    def read_rows(self) -> Optional[List[Any]]:
+        """
+        Read the rows of the request body, a JSON array or NDJSON.
+
+        NDJSON lines that are not valid JSON are kept as None, so they are reported
+        as failed rows instead of failing the whole batch.
+        """
+        if request.mimetype == self.NDJSON_MIMETYPE:
+            rows: List[Any] = []
+            for line in request.get_data().splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    rows.append(current_app.json.loads(line))
+                except ValueError:
+                    rows.append(None)
+            return rows
+
+        rows = request.get_json(silent=True)
+        return rows if isinstance(rows, list) else None
+
+    def validate_row(self, item_data: Any) -> List[str]:
+        if not isinstance(item_data, dict):
+            return ["Item should be a JSON object."]
+        return self.validator.verify_input(item_data, LibraryItem)
+
+    def build_row(self, item_data: Dict[str, Any], library_id: str) -> Dict[str, Any]:
+        return {
+            "name": item_data["name"],
+            "description": item_data.get("description"),
+            "mime_type": item_data["mime_type"],
+            "file_size": item_data["file_size"],
+            "file_path": item_data["file_path"],
+            "is_public": item_data.get("is_public", True),
+            "owner_id": item_data.get("owner_id"),
+            "library_id": str(library_id),
+        }
+
+    def reject_duplicate_names(
+        self, valid: Dict[int, Dict[str, Any]], results: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Move rows whose unique name is taken, or repeated in the batch, to the failures.
+        """
+        taken: Set[str] = self.repo.existing_names(
+            row["name"] for row in valid.values()
+        )
+        for index, row in list(valid.items()):
+            if row["name"] in taken:
+                del valid[index]
+                results[index]["errors"] = ["Field 'name' must be unique."]
+            else:
+                taken.add(row["name"])
@@ -0,0 +1,43 @@
+from typing import Callable, Tuple, Type
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+
+from api.resources.auth import AuthResource
+from api.validators import InputValidator
+
+from repositories.library_repository import LibraryRepository
+from repositories.library_stats_repository import LibraryStatsRepository
+
+
+class LibraryStatsResource(AuthResource):
+    """
+    Item count, total bytes and MIME type breakdown of a library.
+    """
+
+    func_auth_required: Tuple[str, ...] = ("get",)
+
+    def __init__(
+        self,
+        require_auth: Callable,
+        app: Flask,
+        db: SQLAlchemy,
+        validator: Type[InputValidator],
+    ) -> None:
+        super().__init__(require_auth, app, db, validator)
+        self.repo: LibraryStatsRepository = LibraryStatsRepository(
+            app=self.app, db=self.db
+        )
+        self.library_repo: LibraryRepository = LibraryRepository(
+            app=self.app, db=self.db
+        )
+
+    def get(self, library_id: str):
+        """
+        Fetch the statistics of a library.
+        """
+        try:
+            if self.library_repo.get_version(library_id) is None:
+                return self.failure_response("Library not found", status_code=404)
+            return self.success_response(data=self.repo.get_for_library(library_id))
+        except Exception as e:
+            return self.exception_response(e)
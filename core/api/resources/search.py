@@ -0,0 +1,68 @@
+from typing import Callable, List, Optional, Tuple, Type
+from flask import Flask, request
+from flask_sqlalchemy import SQLAlchemy
+
+from api.resources.auth import AuthResource
+from api.validators import InputValidator
+
+from repositories.repository import InvalidCursorError
+from repositories.search_repository import InvalidSearchError, SearchRepository
+
+
+class SearchResource(AuthResource):
+    """
+    Full-text search over library items and libraries.
+
+    `q` is free text where every term has to match the start of a word, `type`
+    optionally restricts the results to `library_item` or `library`, and results are
+    paginated with `limit` and `after` like the list endpoints.
+    """
+
+    func_auth_required: Tuple[str, ...] = ("get",)
+
+    def __init__(
+        self,
+        require_auth: Callable,
+        app: Flask,
+        db: SQLAlchemy,
+        validator: Type[InputValidator],
+    ) -> None:
+        super().__init__(require_auth, app, db, validator)
+        self.repo: SearchRepository = SearchRepository(app=self.app, db=self.db)
+
+    def get(self):
+        """
+        Search library items and libraries, best matches first.
+        """
+        try:
+            query: str = request.args.get("q", "")
+            kinds: Optional[List[str]] = request.args.getlist("type") or None
+            unknown: List[str] = [
+                kind for kind in kinds or [] if kind not in self.repo.KINDS
+            ]
+            if unknown:
+                return self.failure_response(
+                    f"Unknown result type: {', '.join(unknown)}", status_code=400
+                )
+
+            limit, after = self.pagination_args()
+            results, next_cursor = self.repo.search(
+                query, limit=limit, after=after, kinds=kinds
+            )
+            return self.success_response(
+                data={
+                    "results": [
+                        {
+                            "type": kind,
+                            "rank": rank,
+                            "data": entity.api_response(full=False),
+                        }
+                        for kind, entity, rank in results
+                    ],
+                    "next_cursor": next_cursor,
+                }
+            )
+        except (InvalidCursorError, InvalidSearchError) as e:
+            return self.failure_response(str(e), status_code=400)
+        except Exception as e:
+            return self.exception_response(e)
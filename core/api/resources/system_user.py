@@ -4,10 +4,11 @@ from flask_sqlalchemy import SQLAlchemy
 from models.user import User
 from api.resources.auth import AuthResource
 from api.validators import InputValidator
+from repositories.repository import InvalidCursorError, InvalidFieldsError
 
 
 class SystemUserResource(AuthResource):
-    func_auth_required: Tuple[str, ...] = ("get", "post", "put", "delete")
+    func_auth_required: Tuple[str, ...] = ("get", "post", "put", "patch", "delete")
 
     def __init__(
         self,
@@ -25,19 +26,34 @@ class SystemUserResource(AuthResource):
         """
         Fetch user by ID or list all users.
         """
+        try:
+            fields: Optional[Tuple[str, ...]] = self.fields_arg(User)
+        except InvalidFieldsError as e:
+            return self.failure_response(str(e), status_code=400)
+
         if user_id:
-            user = self.repo.get_by_id(user_id)
+            user = self.repo.get_by_id(user_id, profile=fields or "full")
             if not user:
-                return {"status": "error", "message": "User not found"}, 404
-            return self.make_response(
-                {"status": "success", "data": user.api_response(full=True)}
+                return self.failure_response("User not found", status_code=404)
+            return self.success_response(
+                data=user.api_response(full=True, fields=fields)
             )
         else:
-            users = self.repo.get_all()
-            return {
-                "status": "success",
-                "data": {"users": [user.api_response(full=False) for user in users]},
-            }
+            limit, after = self.pagination_args()
+            try:
+                users, next_cursor = self.repo.get_page(
+                    limit=limit, after=after, profile=fields or "head"
+                )
+            except InvalidCursorError as e:
+                return self.failure_response(str(e), status_code=400)
+            return self.success_response(
+                data={
+                    "users": [
+                        user.api_response(full=False, fields=fields) for user in users
+                    ],
+                    "next_cursor": next_cursor,
+                }
+            )
 
     def post(self):
         """
@@ -47,7 +63,7 @@ class SystemUserResource(AuthResource):
         try:
             validation_errors = self.validator.verify_input(user_data, User)
             if user_data is None or validation_errors:
-                return {"status": "error", "errors": validation_errors}, 400
+                return self.failure_response(errors=validation_errors, status_code=400)
 
             new_user = self.repo.register_user(
                 username=user_data["username"],
@@ -58,13 +74,13 @@ class SystemUserResource(AuthResource):
                 admin_user=user_data.get("is_admin", False),
                 generate_api_key=user_data.get("generate_api_key", False),
             )
-            return {
-                "status": "success",
-                "data": new_user.api_response(full=True),
-                "message": "User created successfully",
-            }, 201
+            return self.success_response(
+                data=new_user.api_response(full=True),
+                message="User created successfully",
+                status_code=201,
+            )
         except Exception as e:
-            return {"status": "error", "message": str(e)}, 400
+            return self.failure_response(str(e), status_code=400)
 
     def put(self, user_id: str):
         """
@@ -73,24 +89,32 @@ class SystemUserResource(AuthResource):
         user_data = request.json
         user = self.repo.get_by_id(user_id)
         if not user:
-            return {"status": "error", "message": "sser not found"}, 404
+            return self.failure_response("User not found", status_code=404)
 
         try:
             validation_errors = self.validator.verify_input(user_data, User)
             if user_data is None or validation_errors:
-                return {"status": "error", "errors": validation_errors}, 400
+                return self.failure_response(errors=validation_errors, status_code=400)
 
             for key, value in user_data.items():
                 if hasattr(user, key):
                     setattr(user, key, value)
             updated_user = self.repo.update(user)
-            return {
-                "status": "success",
-                "data": updated_user.api_response(full=True),
-                "message": "User updated successfully",
-            }
+            return self.success_response(
+                data=updated_user.api_response(full=True),
+                message="User updated successfully",
+            )
         except Exception as e:
-            return {"status": "error", "message": str(e)}, 400
+            return self.failure_response(str(e), status_code=400)
+
+    def patch(self, user_id: str):
+        """
+        Update some fields of a user by ID, see `patch_response`.
+        """
+        try:
+            return self.patch_response(self.repo, User, user_id, "User")
+        except Exception as e:
+            return self.failure_response(str(e), status_code=400)
 
     def delete(self, user_id: str):
         """
@@ -98,16 +122,15 @@ class SystemUserResource(AuthResource):
         """
         user = self.repo.get_by_id(user_id)
         if not user:
-            return {"status": "error", "message": "User not found"}, 404
+            return self.failure_response("User not found", status_code=404)
 
         try:
             self.repo.delete(user)
-            return {
-                "status": "success",
-                "message": f"User {user_id} deleted successfully",
-            }, 204
+            return self.success_response(
+                message=f"User {user_id} deleted successfully", status_code=204
+            )
         except Exception as e:
-            return {"status": "error", "message": str(e)}, 400
+            return self.failure_response(str(e), status_code=400)
 
     def activate(self, user_id: str):
         """
@@ -115,13 +138,13 @@ class SystemUserResource(AuthResource):
         """
         user = self.repo.get_by_id(user_id)
         if not user:
-            return {"status": "error", "message": "User not found"}, 404
+            return self.failure_response("User not found", status_code=404)
 
         try:
             self.repo.activate_user(user)
-            return {"status": "success", "message": "User activated successfully"}
+            return self.success_response(message="User activated successfully")
         except Exception as e:
-            return {"status": "error", "message": str(e)}, 400
+            return self.failure_response(str(e), status_code=400)
 
     def deactivate(self, user_id: str):
         """
@@ -129,13 +152,13 @@ class SystemUserResource(AuthResource):
         """
         user = self.repo.get_by_id(user_id)
         if not user:
-            return {"status": "error", "message": "User not found"}, 404
+            return self.failure_response("User not found", status_code=404)
 
         try:
             self.repo.deactivate_user(user)
-            return {"status": "success", "message": "User deactivated successfully"}
+            return self.success_response(message="User deactivated successfully")
         except Exception as e:
-            return {"status": "error", "message": str(e)}, 400
+            return self.failure_response(str(e), status_code=400)
 
     def confirm(self, user_id: str):
         """
@@ -143,13 +166,13 @@ class SystemUserResource(AuthResource):
         """
         user = self.repo.get_by_id(user_id)
         if not user:
-            return {"status": "error", "message": "User not found"}, 404
+            return self.failure_response("User not found", status_code=404)
 
         try:
             self.repo.confirm_user(user)
-            return {"status": "success", "message": "User confirmed successfully"}
+            return self.success_response(message="User confirmed successfully")
         except Exception as e:
-            return {"status": "error", "message": str(e)}, 400
+            return self.failure_response(str(e), status_code=400)
 
     def unconfirm(self, user_id: str):
         """
@@ -157,10 +180,10 @@ class SystemUserResource(AuthResource):
         """
         user = self.repo.get_by_id(user_id)
         if not user:
-            return {"status": "error", "message": "User not found"}, 404
+            return self.failure_response("User not found", status_code=404)
 
         try:
             self.repo.unconfirm_user(user)
-            return {"status": "success", "message": "User unconfirmed successfully"}
+            return self.success_response(message="User unconfirmed successfully")
         except Exception as e:
-            return {"status": "error", "message": str(e)}, 400
+            return self.failure_response(str(e), status_code=400)
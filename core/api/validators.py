@@ -1,122 +1,285 @@
-from typing import Any, Callable, Dict, Iterable, List, Optional, Type, Union
+from copy import deepcopy
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Type, Union
 from models.model import T
 
+Validator = Callable[[Any], List[str]]
+TypeValidation = Callable[[object, Type], bool]
+
 
 class InputValidator:
+    # Compiled validators, keyed by (model or frozen schema, exclude_internal, type_validation)
+    _compiled: Dict[Hashable, Validator] = {}
+    # Fast path for schema dicts seen before: id -> (schema, snapshot, options, validator)
+    _compiled_schemas: Dict[int, Tuple[dict, dict, tuple, Validator]] = {}
+    MAX_CACHED_SCHEMAS: int = 256
+    MAX_CACHED_VALIDATORS: int = 256
+
     @staticmethod
     def verify_input(
         input_data: Optional[Union[Dict[Any, Any], Any]],
         model: Union[Type[T], Dict[str, Type]],
         exclude_internal: bool = True,
-        type_validation: Callable[[object, Type], bool] = lambda value,
-        expected_type: isinstance(value, expected_type),
+        type_validation: Callable[
+            [object, Type], bool
+        ] = lambda value, expected_type: isinstance(value, expected_type),
+        partial: bool = False,
     ) -> List[str]:
         """
         Verify input data matches the model fields and types or a provided schema, including nested validation.
 
+        The model or schema is compiled into a validator on first use and cached, see `compile`.
+
         :param input_data: The data to verify
         :param model: The SQLAlchemy model or a dictionary defining required fields and types
         :param exclude_internal: If True, excludes internal columns (e.g., primary key, timestamps)
         :param type_validation: A custom callable for type validation
+        :param partial: If True, fields may be missing, as in the body of a PATCH
         :return: A list of validation error messages
         """
-        errors = []
-        internal_columns = (
-            ["id", "created_at", "updated_at"] if exclude_internal else []
-        )
+        return InputValidator.compile(
+            model, exclude_internal, type_validation, partial
+        )(input_data)
 
-        def get_allowed_api_fields(model_class: Type[T]) -> Optional[Iterable[str]]:
-            """
-            Retrieve the allowed API fields for the given model.
+    @staticmethod
+    def compile(
+        model: Union[Type[T], Dict[str, Type]],
+        exclude_internal: bool = True,
+        type_validation: TypeValidation = lambda value, expected_type: isinstance(
+            value, expected_type
+        ),
+        partial: bool = False,
+    ) -> Validator:
+        """
+        Get the cached validator of a model or dictionary schema, compiling it if needed.
+
+        A schema dict seen before is recognized by identity, as long as it still equals
+        the snapshot taken when it was compiled. Other schemas are looked up by value, so
+        an equal schema built on every request still reuses its validator. Schemas holding
+        unhashable types are compiled per call.
 
-            :param model_class: The SQLAlchemy model class
-            :return: An iterable of allowed field names
-            """
-            if not hasattr(model_class, "get_allowed_fields"):
-                return None
+        :param model: The SQLAlchemy model or a dictionary defining required fields and types
+        :param exclude_internal: If True, excludes internal columns (e.g., primary key, timestamps)
+        :param type_validation: A custom callable for type validation
+        :param partial: If True, fields may be missing, as in the body of a PATCH
+        :return: A callable returning the validation error messages of its input
+        """
+        options: tuple = (exclude_internal, type_validation, partial)
+        if isinstance(model, dict):
+            entry = InputValidator._compiled_schemas.get(id(model))
+            if (
+                entry is not None
+                and entry[0] is model
+                and entry[2] == options
+                and entry[1] == model
+            ):
+                return entry[3]
 
-            allowed_fields: Optional[Iterable[str]] = getattr(
-                model_class, "get_allowed_fields"
+        try:
+            key: Optional[Hashable] = (
+                _freeze_schema(model) if isinstance(model, dict) else model,
+                exclude_internal,
+                type_validation,
+                partial,
             )
+            validator: Optional[Validator] = InputValidator._compiled.get(key)
+        except TypeError:
+            key, validator = None, None
 
-            if not allowed_fields:
-                # Default to all column names if __ALLOWED_API_FIELDS__ is None or empty
-                return [column.name for column in model_class.__table__.columns]
-            return allowed_fields
-
-        def validate_field(value: Any, expected_type: Any, field_name: str) -> None:
-            """Perform validation for a single field, including nested objects."""
-            if isinstance(expected_type, dict):
-                # Recursive validation for nested dictionaries
-                if not isinstance(value, dict):
-                    errors.append(f"Field '{field_name}' should be a dictionary.")
-                else:
-                    nested_errors = InputValidator.verify_input(
-                        value, expected_type, exclude_internal, type_validation
-                    )
-                    errors.extend([f"{field_name}.{err}" for err in nested_errors])
-            elif isinstance(expected_type, list):
-                # Validation for lists of a specific type
-                if not isinstance(value, list):
-                    errors.append(f"Field '{field_name}' should be a list.")
-                else:
-                    for idx, item in enumerate(value):
-                        for subtype in expected_type:
-                            if not type_validation(item, subtype):
-                                errors.append(
-                                    f"Field '{field_name}[{idx}]' should be of type '{subtype.__name__}'."
-                                )
+        if validator is None:
+            if isinstance(model, dict):
+                validator = _compile_schema(
+                    model, exclude_internal, type_validation, partial
+                )
             else:
-                # Basic type validation
-                if not type_validation(value, expected_type):
-                    errors.append(
-                        f"Field '{field_name}' should be of type '{expected_type.__name__}'."
-                    )
+                validator = _compile_model(
+                    model, exclude_internal, type_validation, partial
+                )
+            if key is not None:
+                if (
+                    len(InputValidator._compiled)
+                    >= InputValidator.MAX_CACHED_VALIDATORS
+                ):
+                    InputValidator._compiled.clear()
+                InputValidator._compiled[key] = validator
 
         if isinstance(model, dict):
-            # Validate against a provided dictionary schema
-            for field, field_type in model.items():
-                if not isinstance(input_data, dict) or field not in input_data:
-                    errors.append(f"Field '{field}' is required.")
-                    continue
+            if (
+                len(InputValidator._compiled_schemas)
+                >= InputValidator.MAX_CACHED_SCHEMAS
+            ):
+                InputValidator._compiled_schemas.clear()
+            InputValidator._compiled_schemas[id(model)] = (
+                model,
+                deepcopy(model),
+                options,
+                validator,
+            )
+        return validator
 
-                validate_field(input_data[field], field_type, field)
 
-            if input_data is not None:
-                for key in input_data.keys():
-                    if key not in model:
-                        errors.append(
-                            f"Field '{key}' is not valid for the provided schema."
-                        )
-        else:
-            # Validate against SQLAlchemy model
-            allowed_fields: Optional[Iterable[str]] = get_allowed_api_fields(model)
+def _freeze_schema(schema: Any) -> Hashable:
+    """
+    Turn a (nested) dictionary schema into a hashable cache key.
+    """
+    if isinstance(schema, dict):
+        return (
+            dict,
+            tuple((key, _freeze_schema(value)) for key, value in schema.items()),
+        )
+    if isinstance(schema, list):
+        return (list, tuple(schema))
+    return schema
 
-            for column in model.__table__.columns:
-                column_name: str = column.name
 
-                if column_name in internal_columns or column_name not in allowed_fields:
-                    continue
+def _compile_model(
+    model: Type[T],
+    exclude_internal: bool,
+    type_validation: TypeValidation,
+    partial: bool = False,
+) -> Validator:
+    """
+    Resolve the columns of a model once into the checks `verify_input` runs on them.
+    """
+    internal_columns = {"id", "created_at", "updated_at"} if exclude_internal else set()
+    column_names = {column.name for column in model.__table__.columns}
 
-                if column_name not in input_data:
-                    if not column.nullable and column.default is None:
-                        errors.append(f"Field '{column_name}' is required.")
-                    continue
+    allowed_fields = (
+        model.get_allowed_fields() if hasattr(model, "get_allowed_fields") else None
+    )
+    if not allowed_fields:
+        # Default to all column names if __ALLOWED_API_FIELDS__ is None or empty
+        allowed_fields = column_names
+    allowed_fields = set(allowed_fields)
 
-                value: Optional[str] = input_data[column_name] if input_data else None
+    # (name, required error or None, expected type, type error) per validated column
+    checks: List[Tuple[str, Optional[str], Optional[type], str]] = []
+    for column in model.__table__.columns:
+        name: str = column.name
+        if name in internal_columns or name not in allowed_fields:
+            continue
 
-                # Type validation
-                expected_type = column.type.python_type
-                validate_field(value, expected_type, column_name)
+        required: bool = not partial and not column.nullable and column.default is None
+        try:
+            expected_type: Optional[type] = column.type.python_type
+        except NotImplementedError:
+            expected_type = None  # Nothing to check values of this column against
+        checks.append(
+            (
+                name,
+                f"Field '{name}' is required." if required else None,
+                expected_type,
+                f"Field '{name}' should be of type '{getattr(expected_type, '__name__', None)}'.",
+            )
+        )
+    accepted_fields = column_names & allowed_fields
+    model_name: str = model.__name__
 
-            # Additional validation for unexpected fields
-            for key in input_data.keys() if input_data is not None else []:
-                if (
-                    key not in [column.name for column in model.__table__.columns]
-                    or key not in allowed_fields
-                ):
+    def validate(input_data: Any) -> List[str]:
+        errors: List[str] = []
+        for name, required_error, expected_type, type_error in checks:
+            if name not in input_data:
+                if required_error:
+                    errors.append(required_error)
+                continue
+            if expected_type is not None and not type_validation(
+                input_data[name], expected_type
+            ):
+                errors.append(type_error)
+
+        for key in input_data.keys() if input_data is not None else []:
+            if key not in accepted_fields:
+                errors.append(f"Field '{key}' is not valid for model '{model_name}'.")
+        return errors
+
+    return validate
+
+
+def _compile_schema(
+    schema: Dict[str, Any],
+    exclude_internal: bool,
+    type_validation: TypeValidation,
+    partial: bool = False,
+) -> Validator:
+    """
+    Compile a dictionary schema into a validator, nested schemas included.
+    """
+    fields: List[Tuple[str, str, Callable[[Any, List[str]], None]]] = [
+        (
+            field,
+            f"Field '{field}' is required.",
+            _compile_field(field, field_type, exclude_internal, type_validation),
+        )
+        for field, field_type in schema.items()
+    ]
+    accepted_fields = set(schema)
+
+    def validate(input_data: Any) -> List[str]:
+        errors: List[str] = []
+        is_dict: bool = isinstance(input_data, dict)
+        for field, required_error, validate_field in fields:
+            if not is_dict or field not in input_data:
+                if not (partial and is_dict):
+                    errors.append(required_error)
+                continue
+            validate_field(input_data[field], errors)
+
+        if input_data is not None:
+            for key in input_data.keys():
+                if key not in accepted_fields:
                     errors.append(
-                        f"Field '{key}' is not valid for model '{model.__name__}'."
+                        f"Field '{key}' is not valid for the provided schema."
                     )
-
         return errors
+
+    return validate
+
+
+def _compile_field(
+    field_name: str,
+    expected_type: Any,
+    exclude_internal: bool,
+    type_validation: TypeValidation,
+) -> Callable[[Any, List[str]], None]:
+    """
+    Compile the check of a single schema field, appending its errors to a list.
+    """
+    if isinstance(expected_type, dict):
+        nested: Validator = InputValidator.compile(
+            expected_type, exclude_internal, type_validation
+        )
+        not_a_dict: str = f"Field '{field_name}' should be a dictionary."
+
+        def validate_dict(value: Any, errors: List[str]) -> None:
+            if not isinstance(value, dict):
+                errors.append(not_a_dict)
+            else:
+                errors.extend(f"{field_name}.{err}" for err in nested(value))
+
+        return validate_dict
+
+    if isinstance(expected_type, list):
+        subtypes: Tuple[type, ...] = tuple(expected_type)
+        not_a_list: str = f"Field '{field_name}' should be a list."
+
+        def validate_list(value: Any, errors: List[str]) -> None:
+            if not isinstance(value, list):
+                errors.append(not_a_list)
+                return
+            for idx, item in enumerate(value):
+                for subtype in subtypes:
+                    if not type_validation(item, subtype):
+                        errors.append(
+                            f"Field '{field_name}[{idx}]' should be of type '{subtype.__name__}'."
+                        )
+
+        return validate_list
+
+    type_error: str = (
+        f"Field '{field_name}' should be of type '{expected_type.__name__}'."
+    )
+
+    def validate_type(value: Any, errors: List[str]) -> None:
+        if not type_validation(value, expected_type):
+            errors.append(type_error)
+
+    return validate_type
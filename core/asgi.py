@@ -0,0 +1,203 @@
+import io
+import os
+import sys
+import asyncio
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional
+
+ASGIReceive = Callable[[], Awaitable[Dict[str, Any]]]
+ASGISend = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_END = object()  # Marks the end of a WSGI response iterator
+
+
+class ClientDisconnect(Exception):
+    """
+    Raised when the client goes away before the response is sent, see `handle_http`.
+    """
+
+
+class AsgiAdapter:
+    """
+    Serve a WSGI app (the Flask API) from an asyncio event loop, as an ASGI app.
+
+    The event loop only does network I/O. The app itself, repository calls included,
+    runs on a bounded thread pool, and so does every chunk of a response body: a
+    streaming client that reads slowly waits on the loop between chunks without
+    holding a thread, so the number of connections is not tied to the pool size.
+
+    The calls of one request all run in the same copied `contextvars` context, so
+    the request context Flask pushes (e.g. through `stream_with_context`) survives
+    between chunks, whichever pool thread runs them.
+
+    The pool is shut down by the ASGI lifespan shutdown event, after the server has
+    finished its requests.
+    """
+
+    DEFAULT_THREADS = 16
+    LOGGER_NAME = "AsgiAdapter"
+
+    def __init__(
+        self,
+        wsgi_app: Callable,
+        max_threads: Optional[int] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.wsgi_app: Callable = wsgi_app
+        self.max_threads: int = max_threads or int(
+            os.getenv("ASGI_THREADS", self.DEFAULT_THREADS)
+        )
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=self.max_threads, thread_name_prefix="asgi"
+        )
+        self.logger: logging.Logger = logger or logging.getLogger(self.LOGGER_NAME)
+
+    async def __call__(
+        self, scope: Dict[str, Any], receive: ASGIReceive, send: ASGISend
+    ) -> None:
+        if scope["type"] == "http":
+            await self.handle_http(scope, receive, send)
+        elif scope["type"] == "lifespan":
+            await self.handle_lifespan(receive, send)
+
+    async def handle_lifespan(self, receive: ASGIReceive, send: ASGISend) -> None:
+        """
+        Shut the thread pool down when the server stops, the daemon owns the rest of
+        startup and shutdown.
+        """
+        while True:
+            message: Dict[str, Any] = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                # Waits for the calls still running, e.g. the close() of a response
+                await asyncio.to_thread(self.executor.shutdown, wait=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def handle_http(
+        self, scope: Dict[str, Any], receive: ASGIReceive, send: ASGISend
+    ) -> None:
+        body: bytes = await self.read_body(receive)
+        loop = asyncio.get_running_loop()
+        context: contextvars.Context = contextvars.copy_context()
+
+        def run(func: Callable, *args: Any) -> Awaitable[Any]:
+            return loop.run_in_executor(self.executor, context.run, func, *args)
+
+        response_start: Dict[str, Any] = {}
+        # Data passed to the write() callable, sent before the chunks of the iterable
+        written: List[bytes] = []
+
+        def start_response(
+            status: str, headers: List[Any], exc_info: Optional[Any] = None
+        ) -> Callable[[bytes], None]:
+            response_start.update(
+                type="http.response.start",
+                status=int(status.split(" ", 1)[0]),
+                headers=[
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in headers
+                ],
+            )
+            return written.append
+
+        try:
+            result: Iterable[bytes] = await run(
+                self.wsgi_app, self.environ(scope, body), start_response
+            )
+        except Exception:
+            self.logger.error("WSGI app failed", exc_info=True)
+            await self.send_error(send)
+            return
+
+        async def send_body(chunk: bytes) -> None:
+            if written:
+                chunk = b"".join((*written, chunk))
+                written.clear()
+            if chunk:
+                await self.send_or_disconnect(
+                    send,
+                    {"type": "http.response.body", "body": chunk, "more_body": True},
+                )
+
+        chunks: Iterator[bytes] = iter(result)
+        try:
+            await self.send_or_disconnect(send, response_start)
+            while (chunk := await run(next, chunks, _END)) is not _END:
+                await send_body(chunk)
+            await send_body(b"")
+            await self.send_or_disconnect(
+                send, {"type": "http.response.body", "body": b""}
+            )
+        except ClientDisconnect:
+            self.logger.debug("Client disconnected during the response")
+        except Exception:
+            # The status line is out, all that is left is to end the response
+            self.logger.error("Streaming the response failed", exc_info=True)
+        finally:
+            if hasattr(result, "close"):
+                await run(result.close)
+
+    async def read_body(self, receive: ASGIReceive) -> bytes:
+        body: List[bytes] = []
+        while True:
+            message: Dict[str, Any] = await receive()
+            body.append(message.get("body", b""))
+            if not message.get("more_body"):
+                return b"".join(body)
+
+    async def send_error(self, send: ASGISend) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 500,
+                "headers": [(b"content-type", b"text/plain")],
+            }
+        )
+        await send({"type": "http.response.body", "body": b"Internal Server Error"})
+
+    async def send_or_disconnect(self, send: ASGISend, message: Dict[str, Any]) -> None:
+        """
+        Send an ASGI message, raising `ClientDisconnect` when the client has gone away.
+
+        Servers raise an `OSError` (uvicorn's `ClientDisconnected`) on a send to a closed
+        connection, which is told apart here from the errors of the app.
+        """
+        try:
+            await send(message)
+        except OSError as error:
+            raise ClientDisconnect() from error
+
+    def environ(self, scope: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+        """Build the WSGI environ of an ASGI HTTP scope (PEP 3333)."""
+        server_name, server_port = scope.get("server") or ("localhost", 80)
+        environ: Dict[str, Any] = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", "").encode().decode("latin-1"),
+            "PATH_INFO": scope["path"].encode().decode("latin-1"),
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME": server_name,
+            "SERVER_PORT": str(server_port),
+            "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+            "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+            "CONTENT_LENGTH": str(len(body)),
+        }
+        for name, value in scope.get("headers", []):
+            key: str = name.decode("latin-1").upper().replace("-", "_")
+            if key == "CONTENT_TYPE":
+                environ["CONTENT_TYPE"] = value.decode("latin-1")
+            elif key != "CONTENT_LENGTH":
+                key = f"HTTP_{key}"
+                value = value.decode("latin-1")
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
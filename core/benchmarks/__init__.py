@@ -0,0 +1,71 @@
+"""
+Micro-benchmarks for the core hot paths.
+
+Run them from the core directory, e.g. `python -m benchmarks.serializer`.
+"""
+
+import time
+from typing import Any, Callable, Tuple
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from models.model import BaseModel
+from models.user import User
+from models.library import Library
+from models.library_item import LibraryItem
+
+
+def make_session(url: str = "sqlite://") -> Session:
+    """
+    Create a session on a fresh database with the schema of all models.
+    """
+    engine = create_engine(url)
+    BaseModel.metadata.create_all(engine)
+    return Session(engine)
+
+
+def seed_library_items(session: Session, num_items: int) -> Tuple[User, Library]:
+    """
+    Insert one user and one library holding `num_items` library items.
+    """
+    user = User(
+        username="bench", email="bench@dmdd.eu", password_hash="-", password_salt="-"
+    )
+    library = Library(name="bench", description="Benchmark library", owner=user)
+    session.add_all([user, library])
+    session.flush()
+    session.add_all(
+        LibraryItem(
+            name=f"item-{i}",
+            description=f"Benchmark item {i}",
+            mime_type="video/mp4",
+            file_size=i * 1024,
+            file_path=f"/media/item-{i}.mp4",
+            owner_id=user.id,
+            library_id=library.id,
+        )
+        for i in range(num_items)
+    )
+    session.commit()
+    return user, library
+
+
+def measure(func: Callable[[], Any], repeat: int = 5) -> float:
+    """
+    Return the best wall-clock time of `repeat` runs of `func`, in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(
+    name: str, baseline: float, candidate: float, rows: int, unit: str = "rows"
+) -> None:
+    print(
+        f"{name}: {baseline * 1000:.1f} ms -> {candidate * 1000:.1f} ms "
+        f"({baseline / candidate:.1f}x, {rows} {unit})"
+    )
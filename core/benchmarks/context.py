@@ -0,0 +1,105 @@
+"""
+Compare a new app context per repository call with reusing the caller's.
+
+The baseline repository pushes an app context, and so gets a new session, for each
+call, like the repositories did before `database.app_session`. The reads run inside
+a request context, as in a view. The writes load a library, rename it and save it,
+once call by call and once in a `unit_of_work`, as a task would.
+
+    python -m benchmarks.context [num_calls]
+"""
+
+import sys
+from typing import Callable, List, Tuple
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+
+from benchmarks import measure, report
+from database import RoutingSession
+from models.library import Library
+from models.model import BaseModel
+from models.user import User
+from repositories.library_repository import LibraryRepository
+from repositories.repository import BaseRepository
+
+
+def push_context(func: Callable) -> Callable:
+    """
+    Run a repository method in a new app context, whatever the caller runs in.
+    """
+
+    def wrapper(self, *args, **kwargs):
+        with self.app.app_context():
+            return func(self, *args, **kwargs)
+
+    return wrapper
+
+
+class NestedContextRepository(LibraryRepository):
+    get_by_id = push_context(BaseRepository.get_by_id.__wrapped__)
+    update = push_context(BaseRepository.update.__wrapped__)
+
+
+def build_app() -> Tuple[Flask, SQLAlchemy]:
+    """
+    Build an app on an in-memory database holding one user and one library.
+    """
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db = SQLAlchemy(model_class=BaseModel, session_options={"class_": RoutingSession})
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        user = User(
+            username="bench",
+            email="bench@dmdd.eu",
+            password_hash="-",
+            password_salt="-",
+        )
+        db.session.add(
+            Library(name="bench", description="Benchmark library", owner=user)
+        )
+        db.session.commit()
+    return app, db
+
+
+def main(num_calls: int = 5_000) -> None:
+    app, db = build_app()
+    nested = NestedContextRepository(db, app)
+    shared = LibraryRepository(db, app)
+    with app.app_context():
+        library_id: str = db.session.query(Library.id).scalar()
+
+    timings: List[float] = []
+    for repo in (nested, shared):
+        with app.test_request_context(f"/api/libraries/{library_id}"):
+            timings.append(
+                measure(lambda: [repo.get_by_id(library_id) for _ in range(num_calls)])
+            )
+    report("get_by_id in a request", *timings, num_calls, "calls")
+
+    def rename_nested() -> None:
+        for i in range(num_calls // 10):
+            library = nested.get_by_id(library_id)
+            library.name = f"bench-{i}"
+            nested.update(library)
+
+    def rename_shared() -> None:
+        for i in range(num_calls // 10):
+            with shared.unit_of_work():
+                library = shared.get_by_id(library_id)
+                library.name = f"bench-{i}"
+                shared.update(library)
+
+    report(
+        "load, rename and save",
+        measure(rename_nested),
+        measure(rename_shared),
+        num_calls // 10,
+        "operations",
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000)
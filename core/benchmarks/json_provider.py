@@ -0,0 +1,55 @@
+"""
+Compare the stdlib and orjson JSON providers on list endpoint payloads.
+
+    python -m benchmarks.json_provider [num_items]
+"""
+
+import sys
+from flask import Flask
+from sqlalchemy.orm import joinedload
+
+from api.json_provider import OrjsonProvider, StdlibJSONProvider, orjson
+from benchmarks import make_session, measure, report, seed_library_items
+from models.library import Library
+from models.library_item import LibraryItem
+
+
+def main(num_items: int = 10_000) -> None:
+    if orjson is None:
+        sys.exit("orjson is not installed, nothing to compare.")
+
+    session = make_session()
+    seed_library_items(session, num_items)
+    items = (
+        session.query(LibraryItem)
+        .options(
+            joinedload(LibraryItem.owner),
+            joinedload(LibraryItem.library).joinedload(Library.owner),
+        )
+        .all()
+    )
+
+    app = Flask(__name__)
+    stdlib, fast = StdlibJSONProvider(app), OrjsonProvider(app)
+
+    for full in (False, True):
+        payload = {
+            "status": "success",
+            "data": {
+                "library_items": [item.api_response(full=full) for item in items],
+                "total": len(items),
+                "next_cursor": None,
+            },
+        }
+        assert stdlib.loads(fast.response(payload).get_data()) == stdlib.loads(
+            stdlib.response(payload).get_data()
+        ), "orjson output differs from the stdlib provider"
+
+        with app.app_context():
+            baseline = measure(lambda: stdlib.response(payload))
+            candidate = measure(lambda: fast.response(payload))
+        report(f"list response (full={full})", baseline, candidate, len(items))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
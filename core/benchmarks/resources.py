@@ -0,0 +1,85 @@
+"""
+Compare per-request resource construction with resources built once at startup.
+
+Both apps log at DEBUG like `CoreDaemon` does and dispatch the same request, so the
+difference is the per-request construction of the resource, its repository and
+auth wrappers, and the constructor log record.
+
+    python -m benchmarks.resources [num_requests]
+"""
+
+import io
+import logging
+import sys
+from typing import Dict, Tuple
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+
+from api import handler as APIHandler
+from api.resource import Resource
+from api.validators import InputValidator
+from benchmarks import measure, report
+from models.library import Library
+from models.model import BaseModel
+from models.user import User
+
+
+def build_app(init_every_request: bool) -> Tuple[Flask, str, Dict[str, str]]:
+    """
+    Build an API app on an in-memory database holding one user and one library.
+    """
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db = SQLAlchemy(model_class=BaseModel)
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        user = User(
+            username="bench",
+            email="bench@dmdd.eu",
+            password_hash="-",
+            password_salt="-",
+            is_confirmed=True,
+        )
+        library = Library(name="bench", description="Benchmark library", owner=user)
+        db.session.add_all([user, library])
+        db.session.commit()
+        api_key, library_id = user.api_key, library.id
+
+    # as_view reads the flag when the routes are registered
+    default: bool = Resource.init_every_request
+    Resource.init_every_request = init_every_request
+    try:
+        APIHandler(app, db, InputValidator)
+    finally:
+        Resource.init_every_request = default
+
+    return app, library_id, {"Authorization": f"Bearer {api_key}"}
+
+
+def main(num_requests: int = 20_000) -> None:
+    logging.basicConfig(
+        level=logging.DEBUG, handlers=[logging.StreamHandler(io.StringIO())]
+    )
+
+    timings = []
+    for init_every_request in (True, False):
+        app, library_id, _ = build_app(init_every_request)
+        view = app.view_functions["libraryresource"]
+
+        # Requests without credentials stop at the auth wrapper, which leaves only
+        # the dispatch itself: resource lookup or construction, and the wrapped method
+        with app.test_request_context(f"/api/libraries/{library_id}"):
+            assert view(library_id=library_id).json["http_code"] == 401
+            timings.append(
+                measure(
+                    lambda: [view(library_id=library_id) for _ in range(num_requests)]
+                )
+            )
+
+    report("dispatch /api/libraries/<id>", *timings, num_requests, "requests")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
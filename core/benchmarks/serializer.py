@@ -0,0 +1,44 @@
+"""
+Compare `SerializerMixin.to_dict` with the precompiled serialization plans.
+
+    python -m benchmarks.serializer [num_items]
+"""
+
+import sys
+from sqlalchemy.orm import joinedload
+
+from benchmarks import make_session, measure, report, seed_library_items
+from models.library import Library
+from models.library_item import LibraryItem
+
+
+def main(num_items: int = 10_000) -> None:
+    session = make_session()
+    seed_library_items(session, num_items)
+    items = (
+        session.query(LibraryItem)
+        .options(
+            joinedload(LibraryItem.owner),
+            joinedload(LibraryItem.library).joinedload(Library.owner),
+        )
+        .all()
+    )
+
+    for full, only, rules in (
+        (False, LibraryItem.serialize_head_only, LibraryItem.serialize_head_rules),
+        (True, LibraryItem.serialize_only, LibraryItem.serialize_rules),
+    ):
+        plan = LibraryItem.serialization_plan(full)
+        assert [item.to_dict(only=only, rules=rules) for item in items] == [
+            plan(item) for item in items
+        ], "Serialization plan output differs from to_dict"
+
+        baseline = measure(
+            lambda: [item.to_dict(only=only, rules=rules) for item in items]
+        )
+        candidate = measure(lambda: [plan(item) for item in items])
+        report(f"api_response(full={full})", baseline, candidate, len(items))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,123 @@
+"""
+Compare mixed read/write throughput on SQLite's defaults and on the tuned pragmas.
+
+Worker threads share a file database through one engine, like the API threads and
+the scheduler do, and run the same mix of operations: mostly reads of a library page
+and its item count, and one committed insert every few operations. Lock timeouts
+("database is locked") are counted and the operation retried.
+
+    python -m benchmarks.sqlite [num_operations] [num_threads]
+"""
+
+import os
+import sys
+import tempfile
+import itertools
+import threading
+from typing import List, Tuple
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from benchmarks import measure, report, seed_library_items
+from database import SqlitePragmas
+from models.library_item import LibraryItem
+from models.model import BaseModel
+
+WRITE_EVERY: int = 5  # One write in five operations
+PAGE_SIZE: int = 20
+
+_names = itertools.count()  # Item names are unique per library
+
+
+def build_engine(path: str, pragmas: SqlitePragmas) -> Tuple[Engine, str]:
+    """
+    Create a database file with 5000 items, return an engine on it and a library ID.
+    """
+    engine = create_engine(f"sqlite:///{path}")
+    pragmas.listen(engine)
+    BaseModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        _, library = seed_library_items(session, 5_000)
+        return engine, library.id
+
+
+def run_operations(
+    engine: Engine, library_id: str, num_operations: int, locked: List[int]
+) -> None:
+    with Session(engine) as session:
+        for operation in range(num_operations):
+            while True:
+                try:
+                    if operation % WRITE_EVERY == 0:
+                        session.add(
+                            LibraryItem(
+                                name=f"new-{next(_names)}",
+                                mime_type="image/png",
+                                file_size=operation,
+                                file_path=f"/media/new-{operation}.png",
+                                library_id=library_id,
+                            )
+                        )
+                        session.commit()
+                    else:
+                        session.execute(
+                            select(LibraryItem)
+                            .where(LibraryItem.library_id == library_id)
+                            .order_by(LibraryItem.created_at.desc())
+                            .limit(PAGE_SIZE)
+                        ).all()
+                        session.scalar(
+                            select(func.count()).where(
+                                LibraryItem.library_id == library_id
+                            )
+                        )
+                        session.commit()
+                    break
+                except OperationalError:
+                    session.rollback()
+                    locked.append(1)
+
+
+def main(num_operations: int = 2_000, num_threads: int = 8) -> None:
+    per_thread: int = num_operations // num_threads
+    timings: List[float] = []
+    for name in ("default", "tuned"):
+        pragmas = SqlitePragmas.from_env(name)
+        with tempfile.TemporaryDirectory() as directory:
+            engine, library_id = build_engine(
+                os.path.join(directory, "bench.sqlite3"), pragmas
+            )
+            locked: List[int] = []
+
+            def mixed_workload() -> None:
+                threads = [
+                    threading.Thread(
+                        target=run_operations,
+                        args=(engine, library_id, per_thread, locked),
+                    )
+                    for _ in range(num_threads)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+            timings.append(measure(mixed_workload, repeat=3))
+            print(f"{name} ({pragmas}): {len(locked)} lock timeouts")
+            engine.dispose()
+
+    report(
+        f"mixed read/write, {num_threads} threads",
+        *timings,
+        per_thread * num_threads,
+        "operations",
+    )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 8,
+    )
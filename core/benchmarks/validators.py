@@ -0,0 +1,210 @@
+"""
+Compare the compiled `InputValidator` with the previous, uncompiled implementation.
+
+Every case is checked to produce the same errors, in the same order, before timing
+the validation of a bulk payload.
+
+    python -m benchmarks.validators [num_items]
+"""
+
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type, Union
+
+from api.validators import InputValidator
+from benchmarks import measure, report
+from models.library import Library
+from models.library_item import LibraryItem
+from models.model import T
+from models.user import User
+
+SCHEMA: Dict[str, Any] = {
+    "name": str,
+    "count": int,
+    "tags": [str],
+    "meta": {"source": str, "size": int, "labels": [str]},
+}
+
+CASES: List[tuple] = [
+    (
+        {
+            "name": "a",
+            "mime_type": "video/mp4",
+            "file_size": 1,
+            "file_path": "/a",
+            "is_public": False,
+        },
+        LibraryItem,
+    ),
+    ({"name": 1, "file_size": "big", "unknown": True, "id": "x"}, LibraryItem),
+    ({}, LibraryItem),
+    ({"name": "lib", "description": None}, Library),
+    ({"username": "u", "email": "e", "is_admin": "yes", "api_key": 5}, User),
+    (
+        {
+            "name": "a",
+            "count": 1,
+            "tags": ["x", "y"],
+            "meta": {"source": "s", "size": 1, "labels": []},
+        },
+        SCHEMA,
+    ),
+    (
+        {"name": 1, "tags": ["x", 2], "meta": {"size": "1", "extra": 1}, "other": 1},
+        SCHEMA,
+    ),
+    ({"tags": "x", "meta": []}, SCHEMA),
+    (None, SCHEMA),
+]
+
+
+def reference_verify_input(
+    input_data: Optional[Union[Dict[Any, Any], Any]],
+    model: Union[Type[T], Dict[str, Type]],
+    exclude_internal: bool = True,
+    type_validation: Callable[
+        [object, Type], bool
+    ] = lambda value, expected_type: isinstance(value, expected_type),
+) -> List[str]:
+    """
+    The validator as it was before compilation, the baseline the compiled one must match.
+
+    :param input_data: The data to verify
+    :param model: The SQLAlchemy model or a dictionary defining required fields and types
+    :param exclude_internal: If True, excludes internal columns (e.g., primary key, timestamps)
+    :param type_validation: A custom callable for type validation
+    :return: A list of validation error messages
+    """
+    errors = []
+    internal_columns = ["id", "created_at", "updated_at"] if exclude_internal else []
+
+    def get_allowed_api_fields(model_class: Type[T]) -> Optional[Iterable[str]]:
+        """
+        Retrieve the allowed API fields for the given model.
+
+        :param model_class: The SQLAlchemy model class
+        :return: An iterable of allowed field names
+        """
+        if not hasattr(model_class, "get_allowed_fields"):
+            return None
+
+        allowed_fields: Optional[Iterable[str]] = getattr(
+            model_class, "get_allowed_fields"
+        )()
+
+        if not allowed_fields:
+            # Default to all column names if __ALLOWED_API_FIELDS__ is None or empty
+            return [column.name for column in model_class.__table__.columns]
+        return allowed_fields
+
+    def validate_field(value: Any, expected_type: Any, field_name: str) -> None:
+        """Perform validation for a single field, including nested objects."""
+        if isinstance(expected_type, dict):
+            # Recursive validation for nested dictionaries
+            if not isinstance(value, dict):
+                errors.append(f"Field '{field_name}' should be a dictionary.")
+            else:
+                nested_errors = reference_verify_input(
+                    value, expected_type, exclude_internal, type_validation
+                )
+                errors.extend([f"{field_name}.{err}" for err in nested_errors])
+        elif isinstance(expected_type, list):
+            # Validation for lists of a specific type
+            if not isinstance(value, list):
+                errors.append(f"Field '{field_name}' should be a list.")
+            else:
+                for idx, item in enumerate(value):
+                    for subtype in expected_type:
+                        if not type_validation(item, subtype):
+                            errors.append(
+                                f"Field '{field_name}[{idx}]' should be of type '{subtype.__name__}'."
+                            )
+        else:
+            # Basic type validation
+            if not type_validation(value, expected_type):
+                errors.append(
+                    f"Field '{field_name}' should be of type '{expected_type.__name__}'."
+                )
+
+    if isinstance(model, dict):
+        # Validate against a provided dictionary schema
+        for field, field_type in model.items():
+            if not isinstance(input_data, dict) or field not in input_data:
+                errors.append(f"Field '{field}' is required.")
+                continue
+
+            validate_field(input_data[field], field_type, field)
+
+        if input_data is not None:
+            for key in input_data.keys():
+                if key not in model:
+                    errors.append(
+                        f"Field '{key}' is not valid for the provided schema."
+                    )
+    else:
+        # Validate against SQLAlchemy model
+        allowed_fields: Optional[Iterable[str]] = get_allowed_api_fields(model)
+
+        for column in model.__table__.columns:
+            column_name: str = column.name
+
+            if column_name in internal_columns or column_name not in allowed_fields:
+                continue
+
+            if column_name not in input_data:
+                if not column.nullable and column.default is None:
+                    errors.append(f"Field '{column_name}' is required.")
+                continue
+
+            value: Optional[str] = input_data[column_name] if input_data else None
+
+            # Type validation
+            expected_type = column.type.python_type
+            validate_field(value, expected_type, column_name)
+
+        # Additional validation for unexpected fields
+        for key in input_data.keys() if input_data is not None else []:
+            if (
+                key not in [column.name for column in model.__table__.columns]
+                or key not in allowed_fields
+            ):
+                errors.append(
+                    f"Field '{key}' is not valid for model '{model.__name__}'."
+                )
+
+    return errors
+
+
+def main(num_items: int = 10_000) -> None:
+    for input_data, model in CASES:
+        for exclude_internal in (True, False):
+            assert reference_verify_input(
+                input_data, model, exclude_internal
+            ) == InputValidator.verify_input(
+                input_data, model, exclude_internal
+            ), f"Compiled validator differs on {input_data!r}"
+
+    items: List[Dict[str, Any]] = [
+        {
+            "name": f"item-{i}",
+            "description": f"Benchmark item {i}",
+            "mime_type": "video/mp4",
+            "file_size": i * 1024,
+            "file_path": f"/media/item-{i}.mp4",
+            "is_public": bool(i % 2),
+            **({"unknown": i} if i % 10 == 0 else {}),
+        }
+        for i in range(num_items)
+    ]
+    for model, payload in ((LibraryItem, items), (SCHEMA, [CASES[6][0]] * num_items)):
+        baseline = measure(
+            lambda: [reference_verify_input(item, model) for item in payload]
+        )
+        candidate = measure(
+            lambda: [InputValidator.verify_input(item, model) for item in payload]
+        )
+        name = model.__name__ if isinstance(model, type) else "dict schema"
+        report(f"verify_input({name})", baseline, candidate, len(payload))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -6,6 +6,7 @@ from alembic import command, config as alembic_config
 import logging
 from colorama import Fore, Style
 from datetime import datetime
+from typing import Optional
 
 
 class ColoredCLIHandler(logging.StreamHandler):
@@ -131,6 +132,49 @@ class CLICommands:
                 command.downgrade(alembic_cfg, "-1")
                 self.logger.info("Database downgraded successfully.")
 
+        @self.app.cli.command("search-rebuild")
+        @click.option(
+            "--batch-size",
+            "-b",
+            type=int,
+            default=None,
+            help="Rows indexed per transaction.",
+        )
+        def search_rebuild(batch_size: Optional[int]):
+            """Rebuild the full-text search indexes."""
+            from repositories.search_repository import SearchRepository
+
+            search_repo = SearchRepository(self.db, self.app)
+            indexed = search_repo.rebuild(
+                batch_size,
+                on_batch=lambda index, rows: self.logger.info(
+                    f"Indexed {rows} rows into {index}."
+                ),
+            )
+            for index, rows in indexed.items():
+                self.logger.info(f"Search index {index} rebuilt with {rows} rows.")
+
+        @self.app.cli.command("stats-repair")
+        @click.option(
+            "--chunk-size",
+            "-c",
+            type=int,
+            default=None,
+            help="Libraries recomputed per transaction.",
+        )
+        def stats_repair(chunk_size: Optional[int]):
+            """Recompute the per-library statistics from the library items."""
+            from repositories.library_stats_repository import LibraryStatsRepository
+
+            stats_repo = LibraryStatsRepository(self.db, self.app)
+            repaired = stats_repo.repair(
+                chunk_size,
+                on_chunk=lambda libraries: self.logger.info(
+                    f"Recomputed the statistics of {libraries} libraries."
+                ),
+            )
+            self.logger.info(f"Library statistics repaired for {repaired} libraries.")
+
         @self.app.cli.command("db-seed")
         @click.option("--models", "-m", multiple=True, help="Specific models to seed.")
         @click.option(
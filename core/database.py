@@ -0,0 +1,294 @@
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Set
+from flask import Flask, current_app, has_app_context, has_request_context, request
+from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy.orm import scoped_session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+# Bind key of the engine reads are routed to, see `RoutingSession`
+READER_BIND_KEY: str = "reader"
+# WSGI environ key marking a request that committed a write
+READ_YOUR_WRITES_KEY: str = "dmdd.read_your_writes"
+# Session info key holding the depth of nested `unit_of_work` blocks
+UNIT_OF_WORK_INFO: str = "dmdd.unit_of_work"
+
+_reading: ContextVar[bool] = ContextVar("dmdd_db_reading", default=False)
+_read_your_writes: ContextVar[bool] = ContextVar(
+    "dmdd_db_read_your_writes", default=False
+)
+
+
+class SqlitePragmas:
+    """
+    A profile of SQLite pragmas, set on every new connection of an engine.
+
+    The default `tuned` profile suits a daemon where the API and the tasks read and
+    write concurrently: WAL lets readers run alongside the writer, `synchronous=NORMAL`
+    only syncs at checkpoints (durable across crashes of the process, not of the OS),
+    and the busy timeout makes writers wait for the lock instead of failing with
+    "database is locked". Foreign keys are enforced, along with their ON DELETE
+    actions, e.g. the items of a deleted library are detached from it.
+    `SQLITE_PROFILE=default` keeps SQLite's own defaults.
+
+    Each pragma can be overridden with its `SQLITE_*` env var, e.g.
+    `SQLITE_MMAP_SIZE=0`, or left at SQLite's default with an empty value.
+    """
+
+    ENV_PREFIX: str = "SQLITE_"
+    PROFILES: Dict[str, Dict[str, str]] = {
+        "tuned": {
+            # First, so the other pragmas (journal_mode) wait for locks too
+            "busy_timeout": "5000",
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": str(256 * 1024 * 1024),
+            "cache_size": str(-64 * 1024),  # Negative: in KiB, i.e. 64 MiB
+            "temp_store": "MEMORY",
+            "foreign_keys": "ON",
+        },
+        "default": {},
+    }
+    CHOICES: Dict[str, Set[str]] = {
+        "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+        "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA", "0", "1", "2", "3"},
+        "temp_store": {"DEFAULT", "FILE", "MEMORY", "0", "1", "2"},
+        "foreign_keys": {"ON", "OFF", "TRUE", "FALSE", "1", "0"},
+    }
+    INTEGERS: Set[str] = {"busy_timeout", "mmap_size", "cache_size"}
+
+    def __init__(self, pragmas: Dict[str, str]) -> None:
+        self.pragmas: Dict[str, str] = {
+            name: self.validate(name, value) for name, value in pragmas.items()
+        }
+
+    @classmethod
+    def from_env(cls, profile: Optional[str] = None) -> "SqlitePragmas":
+        """
+        Build the profile named by `SQLITE_PROFILE`, with `SQLITE_<PRAGMA>` overrides.
+        """
+        name: str = (profile or os.getenv("SQLITE_PROFILE", "tuned")).lower()
+        if name not in cls.PROFILES:
+            raise ValueError(
+                f"Unknown SQLite profile '{name}', expected one of "
+                f"{', '.join(cls.PROFILES)}."
+            )
+
+        pragmas: Dict[str, str] = dict(cls.PROFILES[name])
+        for pragma in (*cls.INTEGERS, *cls.CHOICES):
+            value: Optional[str] = os.getenv(f"{cls.ENV_PREFIX}{pragma.upper()}")
+            if value is None:
+                continue
+            if value.strip():
+                pragmas[pragma] = value
+            else:
+                pragmas.pop(pragma, None)
+        return cls(pragmas)
+
+    def validate(self, name: str, value: str) -> str:
+        """
+        Check a pragma value, as it ends up in the SQL of the PRAGMA statement.
+        """
+        value = value.strip().upper()
+        if name in self.INTEGERS:
+            try:
+                return str(int(value))
+            except ValueError:
+                raise ValueError(f"SQLite pragma {name} should be an integer.")
+        if name in self.CHOICES:
+            if value not in self.CHOICES[name]:
+                raise ValueError(
+                    f"SQLite pragma {name} should be one of "
+                    f"{', '.join(sorted(self.CHOICES[name]))}."
+                )
+            return value
+        raise ValueError(f"Unsupported SQLite pragma {name}.")
+
+    def listen(self, engine: Engine, query_only: bool = False) -> None:
+        """
+        Apply the pragmas to every connection the engine opens from now on.
+
+        Connections already in the pool keep their settings, so call this before
+        the engine is first used.
+
+        :param query_only: Also reject writes on these connections, for reader engines
+        """
+        if engine.dialect.name != "sqlite":
+            return
+        pragmas: Dict[str, str] = dict(self.pragmas)
+        if query_only:
+            pragmas["query_only"] = "ON"
+        if pragmas:
+            event.listen(
+                engine,
+                "connect",
+                lambda dbapi_connection, record: self.apply(dbapi_connection, pragmas),
+            )
+
+    def apply(self, dbapi_connection: Any, pragmas: Dict[str, str]) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+    def __str__(self) -> str:
+        if not self.pragmas:
+            return "SQLite defaults"
+        return ", ".join(f"{name}={value}" for name, value in self.pragmas.items())
+
+
+def reader_url(
+    db_path: str, read_path: Optional[str], pragmas: SqlitePragmas
+) -> Optional[str]:
+    """
+    Get the URL of the reader engine, or None to read from the writer.
+
+    `read_path` (DB_READ_PATH) names a replica, or disables the reader when empty.
+    By default a SQLite file in WAL mode gets a second pool on the same file, whose
+    readers never wait for the writer. Other journal modes would make a session that
+    reads and then writes wait on its own read lock, so they get no reader.
+    """
+    if read_path is not None:
+        return read_path.strip() or None
+
+    url = make_url(db_path)
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return None
+    if pragmas.pragmas.get("journal_mode") != "WAL":
+        return None
+    return db_path
+
+
+@contextmanager
+def app_session(app: Flask, db: SQLAlchemy) -> Iterator[None]:
+    """
+    Run DB work in the caller's app context, and so in its scoped session, or in a
+    new one when it has none of `app`.
+
+    A new context and its session end with the block, so commits do not expire the
+    entities loaded in it: they are left detached with their attributes.
+    """
+    if has_app_context() and current_app._get_current_object() is app:
+        yield
+        return
+    with app.app_context():
+        db.session().expire_on_commit = False
+        yield
+
+
+@contextmanager
+def unit_of_work(app: Flask, db: SQLAlchemy) -> Iterator[scoped_session]:
+    """
+    Run repository calls in one transaction, committed when the block ends and
+    rolled back when it raises.
+
+    Inside, repository writes only flush, and reads go to the writer so they see
+    them. Nested units join the outermost one.
+    """
+    with app_session(app, db):
+        session: scoped_session = db.session
+        depth: int = session.info.get(UNIT_OF_WORK_INFO, 0)
+        session.info[UNIT_OF_WORK_INFO] = depth + 1
+        try:
+            yield session
+            if not depth:
+                session.commit()
+        except BaseException:
+            if not depth:
+                session.rollback()
+            raise
+        finally:
+            session.info[UNIT_OF_WORK_INFO] = depth
+
+
+@contextmanager
+def reading() -> Iterator[None]:
+    """
+    Route the reads run inside to the reader engine, when there is one.
+    """
+    token = _reading.set(True)
+    try:
+        yield
+    finally:
+        _reading.reset(token)
+
+
+@contextmanager
+def read_your_writes() -> Iterator[None]:
+    """
+    Route the reads run inside to the writer, so they see the latest writes even
+    when the reader is a replica that lags behind.
+    """
+    token = _read_your_writes.set(True)
+    try:
+        yield
+    finally:
+        _read_your_writes.reset(token)
+
+
+class RoutingSession(Session):
+    """
+    A session that sends reads to the reader engine and everything else to the writer.
+
+    Only statements run inside `reading()` go to the reader. Flushes, DML and any
+    read after a flush of the same transaction stay on the writer, and so do the
+    reads of a request that committed a write, and those inside `read_your_writes()`
+    or a `unit_of_work`.
+    """
+
+    WROTE_INFO: str = "dmdd.wrote"
+
+    def get_bind(
+        self,
+        mapper: Any = None,
+        clause: Any = None,
+        bind: Any = None,
+        **kwargs: Any,
+    ) -> Any:
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None:
+            return engine
+        if getattr(clause, "is_dml", False):
+            self.info[self.WROTE_INFO] = True
+            return engine
+
+        engines = self._db.engines
+        if (
+            READER_BIND_KEY in engines
+            and engine is engines.get(None)
+            and self.reads_from_reader()
+        ):
+            return engines[READER_BIND_KEY]
+        return engine
+
+    def reads_from_reader(self) -> bool:
+        if not _reading.get() or _read_your_writes.get():
+            return False
+        if (
+            self._flushing
+            or self.info.get(self.WROTE_INFO)
+            or self.info.get(UNIT_OF_WORK_INFO)
+        ):
+            return False
+        return not (has_request_context() and request.environ.get(READ_YOUR_WRITES_KEY))
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session: RoutingSession, flush_context: Any) -> None:
+    session.info[RoutingSession.WROTE_INFO] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session: RoutingSession) -> None:
+    if session.info.pop(RoutingSession.WROTE_INFO, False) and has_request_context():
+        request.environ[READ_YOUR_WRITES_KEY] = True
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _after_rollback(session: RoutingSession) -> None:
+    session.info.pop(RoutingSession.WROTE_INFO, None)
@@ -16,7 +16,9 @@ from cli import ColoredCLIHandler, CLICommands
 # application imports
 from api import handler as APIHandler
 from api.validators import InputValidator
+from api.json_provider import init_json_provider
 from system import System
+from database import READER_BIND_KEY, RoutingSession, SqlitePragmas, reader_url
 
 from models.model import BaseModel
 
@@ -46,8 +48,28 @@ class CoreDaemon:
         load_dotenv()
 
         self.app = Flask(__name__)
+        init_json_provider(self.app, os.getenv("JSON_PROVIDER"))
         self.db_path = os.getenv("DB_PATH", "sqlite:////app/instance/./db.sqlite3")
+        self.db_pragmas: SqlitePragmas = SqlitePragmas.from_env()
+        self.db_read_path: Optional[str] = reader_url(
+            self.db_path, os.getenv("DB_READ_PATH"), self.db_pragmas
+        )
         self.log_path = os.getenv("LOG_PATH", "./tmp/core_daemon.log")
+        self.serve_mode: str = os.getenv("SERVE_MODE", "dev").lower()
+        self.scheduler_lock_path: str = os.getenv(
+            "SCHEDULER_LOCK_PATH",
+            os.path.join(os.path.dirname(self.log_path), "scheduler.lock"),
+        )
+        # Snapshots of the metrics of the gunicorn workers, see `MultiProcessMetrics`
+        self.metrics_dir: str = os.getenv(
+            "METRICS_MULTIPROC_DIR",
+            os.path.join(os.path.dirname(self.log_path), "metrics"),
+        )
+        # Shared by the processes caching API-key principals, see `ApiAuthenticator`
+        self.auth_cache_stamp_path: str = os.getenv(
+            "AUTH_CACHE_STAMP_PATH",
+            os.path.join(os.path.dirname(self.log_path), "auth_cache.stamp"),
+        )
         self.db_engine = None
         self.db_session = None
         self.running = False
@@ -55,9 +77,17 @@ class CoreDaemon:
 
         self.app.config["SQLALCHEMY_DATABASE_URI"] = self.db_path
         self.app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+        self.app.config["AUTH_CACHE_STAMP_PATH"] = self.auth_cache_stamp_path
+        if self.db_read_path:
+            self.app.config["SQLALCHEMY_BINDS"] = {READER_BIND_KEY: self.db_read_path}
 
-        self.db = SQLAlchemy(model_class=BaseModel)
+        self.db = SQLAlchemy(
+            model_class=BaseModel, session_options={"class_": RoutingSession}
+        )
         self.db.init_app(self.app)
+        with self.app.app_context():
+            for key, engine in self.db.engines.items():
+                self.db_pragmas.listen(engine, query_only=key == READER_BIND_KEY)
 
         self.setup_logging(self.log_path)
         self.logger = logging.getLogger("CoreDaemon")
@@ -124,19 +154,30 @@ class CoreDaemon:
         print(f"Daemon is running: {self.running}")
         print(f"Database Path: {self.db_path}")
         print(f"Log Path: {self.log_path}")
+        print(f"Auth Cache: {self.api_handler.authenticator.cache.stats()}")
 
     def echo_configuration(self) -> None:
         """Echo the current configuration to the CLI."""
         print("Configuration:")
         print(f"Database Path: {self.db_path}")
+        print(f"Database Pragmas: {self.db_pragmas}")
+        print(f"Database Reader: {self.db_read_path or 'writer'}")
         print(f"Log Path: {self.log_path}")
+        print(f"Serve Mode: {self.serve_mode}")
         print(f"Running: {self.running}")
 
     def run(self) -> None:
         """Start the daemon."""
-        self.running = True
         self.logger.info("CoreDaemon is starting.")
 
+        if self.serve_mode == "gunicorn":
+            from server import GunicornServer
+
+            # The workers run the API and elect the scheduler leader among themselves
+            GunicornServer(self).run()
+            return
+
+        self.running = True
         asyncio.run(self.start_async_components())
 
     async def start_async_components(self) -> None:
@@ -144,13 +185,16 @@ class CoreDaemon:
         task = asyncio.create_task(self.system.tick(self))
 
         try:
-            await asyncio.to_thread(
-                self.app.run,
-                host=os.getenv("FLASK_HOST", "0.0.0.0"),
-                port=int(os.getenv("FLASK_PORT", 5000)),
-                use_reloader=bool(os.getenv("CORE_DEBUG", False)),
-                debug=bool(os.getenv("CORE_DEBUG", False)),
-            )
+            if self.serve_mode == "asgi":
+                await self.serve_asgi()
+            else:
+                await asyncio.to_thread(
+                    self.app.run,
+                    host=os.getenv("FLASK_HOST", "0.0.0.0"),
+                    port=int(os.getenv("FLASK_PORT", 5000)),
+                    use_reloader=bool(os.getenv("CORE_DEBUG", False)),
+                    debug=bool(os.getenv("CORE_DEBUG", False)),
+                )
         except Exception as e:
             self.logger.error(f"Unexpected error: {e}")
         finally:
@@ -159,6 +203,20 @@ class CoreDaemon:
             await asyncio.gather(task, return_exceptions=True)
             self.graceful_shutdown()
 
+    async def serve_asgi(self) -> None:
+        """Serve the API with uvicorn on the event loop that runs `System.tick`."""
+        import uvicorn
+        from asgi import AsgiAdapter
+
+        config = uvicorn.Config(
+            AsgiAdapter(self.app, logger=self.logger.getChild("ASGI")),
+            host=os.getenv("FLASK_HOST", "0.0.0.0"),
+            port=int(os.getenv("FLASK_PORT", 5000)),
+            lifespan="on",
+            log_config=None,
+        )
+        await uvicorn.Server(config).serve()
+
     def graceful_shutdown(self, *args: Any) -> None:
         """Shutdown gracefully, releasing resources."""
         if self.shutting_down:
@@ -277,6 +335,13 @@ if __name__ == "__main__":
     parser.add_argument("--log-path", type=str, help="Path to the log file.")
     parser.add_argument("--flask-host", type=str, help="Host for Flask.")
     parser.add_argument("--flask-port", type=int, help="Port for Flask.")
+    parser.add_argument(
+        "--serve-mode",
+        type=str,
+        choices=["dev", "gunicorn", "asgi"],
+        help="Serve the API with the Flask dev server, gunicorn workers or uvicorn.",
+    )
+    parser.add_argument("--workers", type=int, help="Number of gunicorn workers.")
     parser.add_argument(
         "command",
         type=str,
@@ -295,6 +360,10 @@ if __name__ == "__main__":
         os.environ["FLASK_HOST"] = args.flask_host
     if args.flask_port:
         os.environ["FLASK_PORT"] = str(args.flask_port)
+    if args.serve_mode:
+        os.environ["SERVE_MODE"] = args.serve_mode
+    if args.workers:
+        os.environ["WORKERS"] = str(args.workers)
 
     daemon = CoreDaemon()
     daemon.run()
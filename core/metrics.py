@@ -0,0 +1,445 @@
+import gc
+import glob
+import json
+import os
+import threading
+from bisect import bisect_left
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+LabelValues = Tuple[str, ...]
+# The value of each series of a metric, as returned by `Metric.collect`
+Series = List[Tuple[LabelValues, Any]]
+
+# Buckets in seconds, from fast cached reads to slow scans and task runs
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs: str = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """
+    A metric family in the Prometheus text format, with one series per label values.
+
+    Updates take a per-metric lock around a dict operation or two, which keeps the
+    cost of instrumenting a request in the order of a microsecond.
+    """
+
+    TYPE: str = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labels: Sequence[str] = ()
+    ) -> None:
+        self.name: str = name
+        self.documentation: str = documentation
+        self.label_names: Tuple[str, ...] = tuple(labels)
+        self._lock: threading.Lock = threading.Lock()
+
+    def collect(self) -> Series:
+        """Copy the current value of every series."""
+        raise NotImplementedError
+
+    def samples(
+        self,
+        series: Optional[Series] = None,
+        label_names: Optional[Sequence[str]] = None,
+    ) -> Iterator[Tuple[str, str, float]]:
+        """
+        Yield (name suffix, formatted labels, value) per sample.
+
+        :param series: Values to format instead of the current ones, e.g. merged ones
+        :param label_names: Label names of `series`, when they have extra labels
+        """
+        raise NotImplementedError
+
+    def render(
+        self,
+        series: Optional[Series] = None,
+        label_names: Optional[Sequence[str]] = None,
+    ) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.TYPE}"
+        for suffix, labels, value in self.samples(series, label_names):
+            yield f"{self.name}{suffix}{labels} {_format_value(value)}"
+
+
+class Counter(Metric):
+    TYPE = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def collect(self) -> Series:
+        with self._lock:
+            return list(self._values.items())
+
+    def samples(
+        self,
+        series: Optional[Series] = None,
+        label_names: Optional[Sequence[str]] = None,
+    ) -> Iterator[Tuple[str, str, float]]:
+        names: Sequence[str] = label_names or self.label_names
+        for labels, value in self.collect() if series is None else series:
+            yield "_total", _format_labels(names, labels), value
+
+
+class Gauge(Metric):
+    """
+    A value that goes up and down, set directly or read from a callback at scrape time.
+    """
+
+    TYPE = "gauge"
+
+    def __init__(
+        self,
+        *args,
+        callback: Optional[Callable[[], Iterable[Tuple[LabelValues, float]]]] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+        self.callback = callback
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def collect(self) -> Series:
+        if self.callback is not None:
+            return list(self.callback())
+        with self._lock:
+            return list(self._values.items())
+
+    def samples(
+        self,
+        series: Optional[Series] = None,
+        label_names: Optional[Sequence[str]] = None,
+    ) -> Iterator[Tuple[str, str, float]]:
+        names: Sequence[str] = label_names or self.label_names
+        for labels, value in self.collect() if series is None else series:
+            yield "", _format_labels(names, labels), value
+
+
+class Histogram(Metric):
+    TYPE = "histogram"
+
+    def __init__(
+        self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        # Per label values: a count per bucket (non-cumulative, +Inf last), then the sum
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index: int = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def collect(self) -> Series:
+        with self._lock:
+            return [(labels, list(counts)) for labels, counts in self._values.items()]
+
+    def samples(
+        self,
+        series: Optional[Series] = None,
+        label_names: Optional[Sequence[str]] = None,
+    ) -> Iterator[Tuple[str, str, float]]:
+        label_names = label_names or self.label_names
+        names: Tuple[str, ...] = (*label_names, "le")
+        for labels, counts in self.collect() if series is None else series:
+            cumulative: int = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                yield "_bucket", _format_labels(
+                    names, (*labels, _format_value(bound))
+                ), cumulative
+            yield "_sum", _format_labels(label_names, labels), counts[-1]
+            yield "_count", _format_labels(label_names, labels), cumulative
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labels: Sequence[str] = ()
+    ) -> Counter:
+        return self.metrics.get(name) or self.register(
+            Counter(name, documentation, labels)
+        )
+
+    def gauge(
+        self, name: str, documentation: str, labels: Sequence[str] = (), **kw
+    ) -> Gauge:
+        return self.metrics.get(name) or self.register(
+            Gauge(name, documentation, labels, **kw)
+        )
+
+    def histogram(
+        self, name: str, documentation: str, labels: Sequence[str] = (), **kw
+    ) -> Histogram:
+        return self.metrics.get(name) or self.register(
+            Histogram(name, documentation, labels, **kw)
+        )
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MultiProcessMetrics:
+    """
+    Aggregate the metrics of the processes of a pre-fork server through a shared directory.
+
+    Every process writes a snapshot of its registry to `<directory>/<pid>.json` every
+    `interval` seconds, when it exits and when it serves a scrape. The process serving
+    a scrape merges all the snapshots:
+
+    - counters and histograms are summed over the processes, including exited ones, so
+      totals never go down when a worker is replaced, and the scheduler leader's task
+      metrics are there whichever worker is scraped
+    - gauges are kept per live process, with a `pid` label
+
+    The master empties the directory when the server starts (`reset`) and drops the
+    gauges of a worker when it exits (`mark_process_dead`).
+    """
+
+    SYNC_INTERVAL: float = 5.0
+    PID_LABEL: str = "pid"
+
+    def __init__(
+        self,
+        directory: str,
+        registry: Optional[Registry] = None,
+        interval: Optional[float] = None,
+    ) -> None:
+        self.directory: str = directory
+        self.registry: Registry = registry or REGISTRY
+        self.interval: float = (
+            interval
+            if interval is not None
+            else float(os.getenv("METRICS_SYNC_INTERVAL", self.SYNC_INTERVAL))
+        )
+        self._stopped: threading.Event = threading.Event()
+
+    @staticmethod
+    def reset(directory: str) -> None:
+        """Remove the snapshots of a previous run, before the workers start."""
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            os.remove(path)
+
+    @staticmethod
+    def mark_process_dead(directory: str, pid: int) -> None:
+        """Drop the gauges of an exited process, its counters and histograms stay."""
+        path: str = os.path.join(directory, f"{pid}.json")
+        try:
+            with open(path) as snapshot_file:
+                snapshot: Dict[str, Any] = json.load(snapshot_file)
+        except (OSError, ValueError):
+            return
+        MultiProcessMetrics._dump(
+            path,
+            {
+                name: metric
+                for name, metric in snapshot.items()
+                if metric["type"] != Gauge.TYPE
+            },
+        )
+
+    @staticmethod
+    def _dump(path: str, snapshot: Dict[str, Any]) -> None:
+        # Replaced atomically, so readers never see a partial snapshot
+        temporary: str = f"{path}.tmp"
+        with open(temporary, "w") as snapshot_file:
+            json.dump(snapshot, snapshot_file)
+        os.replace(temporary, path)
+
+    def write(self) -> None:
+        """Write the snapshot of this process."""
+        self._dump(
+            os.path.join(self.directory, f"{os.getpid()}.json"),
+            {
+                name: {"type": metric.TYPE, "series": metric.collect()}
+                for name, metric in list(self.registry.metrics.items())
+            },
+        )
+
+    def start(self) -> None:
+        """Write the snapshot of this process every `interval` seconds, in a thread."""
+        self._stopped.clear()
+        threading.Thread(target=self._run, name="MetricsSync", daemon=True).start()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.write()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.write()
+
+    def collect(self) -> Dict[str, Series]:
+        """Merge the snapshots of all processes, by metric name."""
+        merged: Dict[str, Dict[LabelValues, Any]] = {}
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            pid: str = os.path.splitext(os.path.basename(path))[0]
+            try:
+                with open(path) as snapshot_file:
+                    snapshot: Dict[str, Any] = json.load(snapshot_file)
+            except (OSError, ValueError):
+                continue  # Removed since listed
+
+            for name, metric in snapshot.items():
+                values: Dict[LabelValues, Any] = merged.setdefault(name, {})
+                for labels, value in metric["series"]:
+                    if metric["type"] == Gauge.TYPE:
+                        values[(*labels, pid)] = value
+                    elif metric["type"] == Histogram.TYPE:
+                        current: Optional[List[float]] = values.get(tuple(labels))
+                        values[tuple(labels)] = (
+                            [a + b for a, b in zip(current, value)]
+                            if current
+                            else value
+                        )
+                    else:
+                        values[tuple(labels)] = values.get(tuple(labels), 0) + value
+        return {name: sorted(values.items()) for name, values in merged.items()}
+
+    def render(self) -> str:
+        """Render the merged metrics in the Prometheus text exposition format."""
+        self.write()
+        merged: Dict[str, Series] = self.collect()
+        lines: List[str] = []
+        for name, metric in list(self.registry.metrics.items()):
+            label_names: Optional[Tuple[str, ...]] = (
+                (*metric.label_names, self.PID_LABEL)
+                if isinstance(metric, Gauge)
+                else None
+            )
+            lines.extend(metric.render(merged.get(name, []), label_names))
+        return "\n".join(lines) + "\n"
+
+
+def _resident_memory_bytes() -> Iterable[Tuple[LabelValues, float]]:
+    try:
+        with open("/proc/self/statm") as statm:
+            return [((), int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE"))]
+    except (OSError, ValueError, IndexError):
+        if resource is None:
+            return []
+        # Peak rather than current RSS, in KiB on Linux
+        return [((), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)]
+
+
+def _gc_collections() -> Iterable[Tuple[LabelValues, float]]:
+    return [
+        ((str(generation),), stats["collections"])
+        for generation, stats in enumerate(gc.get_stats())
+    ]
+
+
+def _gc_objects() -> Iterable[Tuple[LabelValues, float]]:
+    return [
+        ((str(generation),), count) for generation, count in enumerate(gc.get_count())
+    ]
+
+
+REGISTRY: Registry = Registry()
+
+# Process metrics, read when scraped
+REGISTRY.gauge(
+    "process_resident_memory_bytes",
+    "Resident memory size in bytes.",
+    callback=_resident_memory_bytes,
+)
+REGISTRY.gauge(
+    "python_gc_collections",
+    "Number of times each GC generation was collected.",
+    ["generation"],
+    callback=_gc_collections,
+)
+REGISTRY.gauge(
+    "python_gc_objects_tracked",
+    "Objects tracked per GC generation since its last collection.",
+    ["generation"],
+    callback=_gc_objects,
+)
+
+# Scheduler metrics, see `System.tick`
+TASK_DURATION: Histogram = REGISTRY.histogram(
+    "dmdd_task_run_duration_seconds", "Duration of task runs.", ["task"]
+)
+TASK_LAG: Histogram = REGISTRY.histogram(
+    "dmdd_task_lag_seconds",
+    "Delay between the scheduled and the actual start of task runs.",
+    ["task"],
+)
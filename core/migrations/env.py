@@ -4,6 +4,7 @@ from logging.config import fileConfig
 from sqlalchemy import engine_from_config, pool
 from alembic import context
 from models.model import BaseModel as Base
+from models.search import search_index_names
 
 # Alembic Config
 config = context.config
@@ -26,12 +27,21 @@ for file in os.listdir(models_dir):
 # Collect metadata for Alembic
 target_metadata = Base.metadata
 
+# The search indexes are created by raw DDL (see models/search.py), so autogenerate
+# would otherwise emit drops for their tables and views
+SEARCH_INDEX_NAMES = search_index_names()
+
+def include_name(name, type_, parent_names) -> bool:
+    """Skip the tables and views of the search indexes when comparing the schema."""
+    return not (type_ == "table" and name in SEARCH_INDEX_NAMES)
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -49,7 +59,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
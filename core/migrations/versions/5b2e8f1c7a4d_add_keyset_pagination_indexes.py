@@ -0,0 +1,31 @@
+"""
+add keyset pagination indexes
+
+Revision ID: 5b2e8f1c7a4d
+Revises: d8fd0b6112ae
+Create Date: 2026-10-17 09:12:04.318220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e8f1c7a4d'
+down_revision: Union[str, None] = 'd8fd0b6112ae'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Matches the (created_at, id) ordering used by BaseRepository.get_page
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'])
+    op.create_index('ix_library_created_at_id', 'library', ['created_at', 'id'])
+    op.create_index('ix_libraryItems_created_at_id', 'libraryItems', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_libraryItems_created_at_id', table_name='libraryItems')
+    op.drop_index('ix_library_created_at_id', table_name='library')
+    op.drop_index('ix_users_created_at_id', table_name='users')
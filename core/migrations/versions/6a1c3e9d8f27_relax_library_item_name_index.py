@@ -0,0 +1,36 @@
+"""
+relax library item name index
+
+Revision ID: 6a1c3e9d8f27
+Revises: b3e6f1d8a427
+Create Date: 2026-10-18 15:03:27.190644
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a1c3e9d8f27'
+down_revision: Union[str, None] = 'b3e6f1d8a427'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # name is unique on its own already, the index only backs the list filters and sort
+    op.drop_index('ix_libraryItems_library_id_name', table_name='libraryItems')
+    op.create_index(
+        'ix_libraryItems_library_id_name', 'libraryItems', ['library_id', 'name']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_libraryItems_library_id_name', table_name='libraryItems')
+    op.create_index(
+        'ix_libraryItems_library_id_name',
+        'libraryItems',
+        ['library_id', 'name'],
+        unique=True,
+    )
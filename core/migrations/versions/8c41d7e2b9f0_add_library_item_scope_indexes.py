@@ -0,0 +1,33 @@
+"""
+add library item scope indexes
+
+Revision ID: 8c41d7e2b9f0
+Revises: 5b2e8f1c7a4d
+Create Date: 2026-10-17 10:03:51.902417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41d7e2b9f0'
+down_revision: Union[str, None] = '5b2e8f1c7a4d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # `id` is appended so a library listing is fully ordered by the index
+    op.create_index(
+        'ix_libraryItems_library_id_created_at',
+        'libraryItems',
+        ['library_id', 'created_at', 'id'],
+    )
+    op.create_index('ix_libraryItems_owner_id', 'libraryItems', ['owner_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_libraryItems_owner_id', table_name='libraryItems')
+    op.drop_index('ix_libraryItems_library_id_created_at', table_name='libraryItems')
@@ -0,0 +1,33 @@
+"""
+add updated_at indexes
+
+Revision ID: a3f9c0d61e27
+Revises: 8c41d7e2b9f0
+Create Date: 2026-10-17 11:20:37.550163
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f9c0d61e27'
+down_revision: Union[str, None] = '8c41d7e2b9f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lets the max(updated_at) of the conditional GET validators come from an index
+    op.create_index('ix_library_updated_at', 'library', ['updated_at'])
+    op.create_index(
+        'ix_libraryItems_library_id_updated_at',
+        'libraryItems',
+        ['library_id', 'updated_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_libraryItems_library_id_updated_at', table_name='libraryItems')
+    op.drop_index('ix_library_updated_at', table_name='library')
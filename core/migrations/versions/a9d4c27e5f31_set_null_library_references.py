@@ -0,0 +1,66 @@
+"""
+set null library references
+
+Revision ID: a9d4c27e5f31
+Revises: f2c7a9e4b158
+Create Date: 2026-10-18 10:03:51.207446
+
+"""
+from typing import List, Optional, Sequence, Tuple, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d4c27e5f31'
+down_revision: Union[str, None] = 'f2c7a9e4b158'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Names the foreign keys of the initial migration, which are unnamed
+NAMING_CONVENTION = {
+    "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
+}
+TABLES = ('libraryItems', 'thumbnails')
+
+
+def replace_library_fk(table: str, ondelete: Optional[str]) -> None:
+    # Batch mode recreates the table on SQLite: its triggers are dropped with it, and
+    # views on it fail to re-parse while it is renamed, so both are set up again
+    bind = op.get_bind()
+    views: List[Tuple[str, str]] = bind.execute(
+        sa.text("SELECT name, sql FROM sqlite_master WHERE type = 'view'")
+    ).all()
+    triggers: List[str] = bind.execute(
+        sa.text(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :table"
+        ),
+        {"table": table},
+    ).scalars().all()
+    for name, _ in views:
+        op.execute(f'DROP VIEW "{name}"')
+
+    name: str = f"fk_{table}_library_id_library"
+    with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(name, type_='foreignkey')
+        batch_op.create_foreign_key(
+            name, 'library', ['library_id'], ['id'], ondelete=ondelete
+        )
+
+    for _, sql in views:
+        op.execute(sql)
+    for sql in triggers:
+        op.execute(sql)
+
+
+def upgrade() -> None:
+    # Deleting a library detaches its items and thumbnails in the database, instead
+    # of failing on the foreign keys when they are enforced
+    for table in TABLES:
+        replace_library_fk(table, 'SET NULL')
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        replace_library_fk(table, None)
@@ -0,0 +1,34 @@
+"""
+add owner visibility size index
+
+Revision ID: b3e6f1d8a427
+Revises: a9d4c27e5f31
+Create Date: 2026-10-18 11:20:44.873512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e6f1d8a427'
+down_revision: Union[str, None] = 'a9d4c27e5f31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # An owner's public or private items of a library by size, without residual filters
+    op.create_index(
+        'ix_libraryItems_library_id_owner_id_is_public_file_size',
+        'libraryItems',
+        ['library_id', 'owner_id', 'is_public', 'file_size', 'id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_libraryItems_library_id_owner_id_is_public_file_size',
+        table_name='libraryItems',
+    )
@@ -0,0 +1,79 @@
+"""
+add full text search
+
+Revision ID: b7d2e5f8a031
+Revises: e14b7a2c9d53
+Create Date: 2026-10-17 15:26:48.903114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e5f8a031'
+down_revision: Union[str, None] = 'e14b7a2c9d53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # External-content FTS5 indexes: only the terms are stored, the text stays in
+    # the content tables, and triggers keep both in sync
+    op.execute(
+        "CREATE VIRTUAL TABLE library_item_search USING fts5("
+        "name, description, content='libraryItems', content_rowid='rowid', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    op.execute(
+        'CREATE TRIGGER library_item_search_ai AFTER INSERT ON "libraryItems" BEGIN '
+        "INSERT INTO library_item_search(rowid, name, description) "
+        "VALUES (new.rowid, new.name, new.description); END"
+    )
+    op.execute(
+        'CREATE TRIGGER library_item_search_ad AFTER DELETE ON "libraryItems" BEGIN '
+        "INSERT INTO library_item_search(library_item_search, rowid, name, description) "
+        "VALUES ('delete', old.rowid, old.name, old.description); END"
+    )
+    op.execute(
+        "CREATE TRIGGER library_item_search_au "
+        'AFTER UPDATE OF name, description ON "libraryItems" BEGIN '
+        "INSERT INTO library_item_search(library_item_search, rowid, name, description) "
+        "VALUES ('delete', old.rowid, old.name, old.description); "
+        "INSERT INTO library_item_search(rowid, name, description) "
+        "VALUES (new.rowid, new.name, new.description); END"
+    )
+    op.execute(
+        "INSERT INTO library_item_search(library_item_search) VALUES ('rebuild')"
+    )
+
+    op.execute(
+        "CREATE VIRTUAL TABLE library_search USING fts5("
+        "name, content='library', content_rowid='rowid', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    op.execute(
+        'CREATE TRIGGER library_search_ai AFTER INSERT ON "library" BEGIN '
+        "INSERT INTO library_search(rowid, name) VALUES (new.rowid, new.name); END"
+    )
+    op.execute(
+        'CREATE TRIGGER library_search_ad AFTER DELETE ON "library" BEGIN '
+        "INSERT INTO library_search(library_search, rowid, name) "
+        "VALUES ('delete', old.rowid, old.name); END"
+    )
+    op.execute(
+        'CREATE TRIGGER library_search_au AFTER UPDATE OF name ON "library" BEGIN '
+        "INSERT INTO library_search(library_search, rowid, name) "
+        "VALUES ('delete', old.rowid, old.name); "
+        "INSERT INTO library_search(rowid, name) VALUES (new.rowid, new.name); END"
+    )
+    op.execute("INSERT INTO library_search(library_search) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    for trigger in ('ai', 'ad', 'au'):
+        op.execute(f"DROP TRIGGER IF EXISTS library_search_{trigger}")
+        op.execute(f"DROP TRIGGER IF EXISTS library_item_search_{trigger}")
+    op.execute("DROP TABLE IF EXISTS library_search")
+    op.execute("DROP TABLE IF EXISTS library_item_search")
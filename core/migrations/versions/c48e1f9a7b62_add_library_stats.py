@@ -0,0 +1,77 @@
+"""
+add library stats
+
+Revision ID: c48e1f9a7b62
+Revises: b7d2e5f8a031
+Create Date: 2026-10-17 16:41:05.271940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c48e1f9a7b62'
+down_revision: Union[str, None] = 'b7d2e5f8a031'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ADD_NEW = (
+    "INSERT INTO library_stats(library_id, mime_type, item_count, total_bytes) "
+    "SELECT new.library_id, new.mime_type, 1, new.file_size "
+    "WHERE new.library_id IS NOT NULL "
+    "ON CONFLICT(library_id, mime_type) DO UPDATE SET "
+    "item_count = item_count + 1, total_bytes = total_bytes + excluded.total_bytes;"
+)
+REMOVE_OLD = (
+    "UPDATE library_stats SET "
+    "item_count = item_count - 1, total_bytes = total_bytes - old.file_size "
+    "WHERE library_id = old.library_id AND mime_type = old.mime_type; "
+    "DELETE FROM library_stats "
+    "WHERE library_id = old.library_id AND mime_type = old.mime_type "
+    "AND item_count <= 0;"
+)
+
+
+def upgrade() -> None:
+    # Per (library, MIME type) item count and total bytes, maintained by triggers
+    op.create_table(
+        'library_stats',
+        sa.Column('library_id', sa.String(length=36), nullable=False),
+        sa.Column('mime_type', sa.String(length=150), nullable=False),
+        sa.Column('item_count', sa.Integer(), nullable=False),
+        sa.Column('total_bytes', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['library_id'], ['library.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('library_id', 'mime_type'),
+    )
+    op.execute(
+        'CREATE TRIGGER library_stats_ai AFTER INSERT ON "libraryItems" '
+        f"BEGIN {ADD_NEW} END"
+    )
+    op.execute(
+        'CREATE TRIGGER library_stats_ad AFTER DELETE ON "libraryItems" '
+        f"BEGIN {REMOVE_OLD} END"
+    )
+    op.execute(
+        "CREATE TRIGGER library_stats_au "
+        'AFTER UPDATE OF library_id, mime_type, file_size ON "libraryItems" '
+        f"BEGIN {REMOVE_OLD} {ADD_NEW} END"
+    )
+    op.execute(
+        'CREATE TRIGGER library_stats_library_ad AFTER DELETE ON "library" '
+        "BEGIN DELETE FROM library_stats WHERE library_id = old.id; END"
+    )
+    op.execute(
+        "INSERT INTO library_stats(library_id, mime_type, item_count, total_bytes) "
+        "SELECT library_id, mime_type, count(*), coalesce(sum(file_size), 0) "
+        'FROM "libraryItems" WHERE library_id IS NOT NULL '
+        "GROUP BY library_id, mime_type"
+    )
+
+
+def downgrade() -> None:
+    for trigger in ('ai', 'ad', 'au', 'library_ad'):
+        op.execute(f"DROP TRIGGER IF EXISTS library_stats_{trigger}")
+    op.drop_table('library_stats')
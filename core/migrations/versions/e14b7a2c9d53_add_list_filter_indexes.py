@@ -0,0 +1,64 @@
+"""
+add list filter indexes
+
+Revision ID: e14b7a2c9d53
+Revises: a3f9c0d61e27
+Create Date: 2026-10-17 14:02:11.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e14b7a2c9d53'
+down_revision: Union[str, None] = 'a3f9c0d61e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Back every filter and sort the list endpoints accept, see BaseRepository.list_query
+    op.create_index(
+        'ix_libraryItems_library_id_file_size',
+        'libraryItems',
+        ['library_id', 'file_size', 'id'],
+    )
+    op.create_index(
+        'ix_libraryItems_library_id_name',
+        'libraryItems',
+        ['library_id', 'name'],
+        unique=True,
+    )
+    op.create_index(
+        'ix_libraryItems_library_id_mime_type',
+        'libraryItems',
+        ['library_id', 'mime_type', 'file_size', 'id'],
+    )
+    op.create_index(
+        'ix_libraryItems_library_id_is_public',
+        'libraryItems',
+        ['library_id', 'is_public', 'created_at', 'id'],
+    )
+    op.create_index(
+        'ix_libraryItems_library_id_owner_id',
+        'libraryItems',
+        ['library_id', 'owner_id', 'created_at', 'id'],
+    )
+    op.create_index(
+        'ix_library_owner_id_created_at', 'library', ['owner_id', 'created_at', 'id']
+    )
+    op.create_index(
+        'ix_library_is_public_created_at', 'library', ['is_public', 'created_at', 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_library_is_public_created_at', table_name='library')
+    op.drop_index('ix_library_owner_id_created_at', table_name='library')
+    op.drop_index('ix_libraryItems_library_id_owner_id', table_name='libraryItems')
+    op.drop_index('ix_libraryItems_library_id_is_public', table_name='libraryItems')
+    op.drop_index('ix_libraryItems_library_id_mime_type', table_name='libraryItems')
+    op.drop_index('ix_libraryItems_library_id_name', table_name='libraryItems')
+    op.drop_index('ix_libraryItems_library_id_file_size', table_name='libraryItems')
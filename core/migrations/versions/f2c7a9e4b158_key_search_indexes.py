@@ -0,0 +1,107 @@
+"""
+key search indexes
+
+Revision ID: f2c7a9e4b158
+Revises: c48e1f9a7b62
+Create Date: 2026-10-18 09:12:37.514208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c7a9e4b158'
+down_revision: Union[str, None] = 'c48e1f9a7b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Search index -> (content table, indexed columns)
+INDEXES = {
+    'library_item_search': ('libraryItems', ('name', 'description')),
+    'library_search': ('library', ('name',)),
+}
+OPTIONS = "tokenize='unicode61 remove_diacritics 2', prefix='2 3'"
+
+
+def drop_index(index: str) -> None:
+    for trigger in ('ai', 'ad', 'au'):
+        op.execute(f"DROP TRIGGER IF EXISTS {index}_{trigger}")
+    op.execute(f"DROP TABLE IF EXISTS {index}")
+
+
+def upgrade() -> None:
+    # The indexes were keyed on the implicit rowids of the content tables, which a
+    # VACUUM may renumber as their primary keys are strings. A keys table per index
+    # now holds a stable INTEGER PRIMARY KEY per record ID, and the index reads its
+    # content through a view joining the keys to the content table.
+    for index, (table, columns) in INDEXES.items():
+        keys: str = f"{index}_keys"
+        names: str = ", ".join(columns)
+        new: str = ", ".join(f"new.{column}" for column in columns)
+        old: str = ", ".join(f"old.{column}" for column in columns)
+        remove: str = (
+            f"INSERT INTO {index}({index}, rowid, {names}) "
+            f"SELECT 'delete', search_rowid, {old} FROM {keys} WHERE id = old.id;"
+        )
+        add: str = (
+            f"INSERT INTO {index}(rowid, {names}) "
+            f"SELECT search_rowid, {new} FROM {keys} WHERE id = new.id;"
+        )
+
+        drop_index(index)
+        op.execute(
+            f"CREATE TABLE {keys} ("
+            "search_rowid INTEGER PRIMARY KEY, id VARCHAR(36) NOT NULL UNIQUE)"
+        )
+        op.execute(
+            f"CREATE VIEW {index}_source AS SELECT k.search_rowid, "
+            f"{', '.join(f't.{column}' for column in columns)} "
+            f'FROM {keys} k JOIN "{table}" t ON t.id = k.id'
+        )
+        op.execute(
+            f"CREATE VIRTUAL TABLE {index} USING fts5({names}, "
+            f"content='{index}_source', content_rowid='search_rowid', {OPTIONS})"
+        )
+        op.execute(
+            f'CREATE TRIGGER {index}_ai AFTER INSERT ON "{table}" '
+            f"BEGIN INSERT INTO {keys}(id) VALUES (new.id); {add} END"
+        )
+        op.execute(
+            f'CREATE TRIGGER {index}_ad AFTER DELETE ON "{table}" '
+            f"BEGIN {remove} DELETE FROM {keys} WHERE id = old.id; END"
+        )
+        op.execute(
+            f'CREATE TRIGGER {index}_au AFTER UPDATE OF id, {names} ON "{table}" '
+            f"BEGIN {remove} UPDATE {keys} SET id = new.id WHERE id = old.id; {add} END"
+        )
+        op.execute(f'INSERT INTO {keys}(id) SELECT id FROM "{table}" ORDER BY rowid')
+        op.execute(f"INSERT INTO {index}({index}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    for index, (table, columns) in INDEXES.items():
+        names: str = ", ".join(columns)
+        new: str = ", ".join(f"new.{column}" for column in columns)
+        old: str = ", ".join(f"old.{column}" for column in columns)
+        remove: str = (
+            f"INSERT INTO {index}({index}, rowid, {names}) "
+            f"VALUES ('delete', old.rowid, {old});"
+        )
+        add: str = f"INSERT INTO {index}(rowid, {names}) VALUES (new.rowid, {new});"
+
+        drop_index(index)
+        op.execute(f"DROP VIEW IF EXISTS {index}_source")
+        op.execute(f"DROP TABLE IF EXISTS {index}_keys")
+        op.execute(
+            f"CREATE VIRTUAL TABLE {index} USING fts5({names}, "
+            f"content='{table}', content_rowid='rowid', {OPTIONS})"
+        )
+        op.execute(f'CREATE TRIGGER {index}_ai AFTER INSERT ON "{table}" BEGIN {add} END')
+        op.execute(f'CREATE TRIGGER {index}_ad AFTER DELETE ON "{table}" BEGIN {remove} END')
+        op.execute(
+            f'CREATE TRIGGER {index}_au AFTER UPDATE OF {names} ON "{table}" '
+            f"BEGIN {remove} {add} END"
+        )
+        op.execute(f"INSERT INTO {index}({index}) VALUES ('rebuild')")
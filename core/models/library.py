@@ -1,5 +1,5 @@
 from typing import List, Union, Optional, TYPE_CHECKING
-from sqlalchemy import String, Boolean, ForeignKey
+from sqlalchemy import String, Boolean, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from faker import Faker
 
@@ -19,6 +19,13 @@ class Library(BaseModel):
     """
 
     __tablename__ = "library"
+    __table_args__ = (
+        Index("ix_library_created_at_id", "created_at", "id"),
+        Index("ix_library_updated_at", "updated_at"),
+        # Filters of the library list, see LibraryRepository.FILTERS
+        Index("ix_library_owner_id_created_at", "owner_id", "created_at", "id"),
+        Index("ix_library_is_public_created_at", "is_public", "created_at", "id"),
+    )
     serialize_head_only = ("id", "name", "description", "is_public", "owner_id")
     serialize_only = (
         "id",
@@ -40,9 +47,13 @@ class Library(BaseModel):
     description: Mapped[str] = mapped_column(String(255), nullable=False)
     is_public: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
 
-    items: Mapped["LibraryItem"] = relationship("LibraryItem", back_populates="library")
-    itemsThumbnails: Mapped["Thumbnail"] = relationship(
-        "Thumbnail", back_populates="library"
+    # The items and thumbnails of a deleted library are detached by the database,
+    # their foreign keys are ON DELETE SET NULL
+    items: Mapped[List["LibraryItem"]] = relationship(
+        "LibraryItem", back_populates="library", passive_deletes=True
+    )
+    itemsThumbnails: Mapped[List["Thumbnail"]] = relationship(
+        "Thumbnail", back_populates="library", passive_deletes=True
     )
 
     def __repr__(self) -> str:
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Boolean, ForeignKey, Integer, Text
+from sqlalchemy import String, Boolean, ForeignKey, Index, Integer, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import TYPE_CHECKING, Optional, Tuple
 from .model import BaseModel
@@ -14,6 +14,46 @@ class LibraryItem(BaseModel):
     """
 
     __tablename__ = "libraryItems"
+    __table_args__ = (
+        Index("ix_libraryItems_created_at_id", "created_at", "id"),
+        Index(
+            "ix_libraryItems_library_id_created_at", "library_id", "created_at", "id"
+        ),
+        Index("ix_libraryItems_owner_id", "owner_id"),
+        Index("ix_libraryItems_library_id_updated_at", "library_id", "updated_at"),
+        # Filters and sorts of the item list, see LibraryItemRepository.FILTERS
+        Index("ix_libraryItems_library_id_file_size", "library_id", "file_size", "id"),
+        Index("ix_libraryItems_library_id_name", "library_id", "name"),
+        Index(
+            "ix_libraryItems_library_id_mime_type",
+            "library_id",
+            "mime_type",
+            "file_size",
+            "id",
+        ),
+        Index(
+            "ix_libraryItems_library_id_is_public",
+            "library_id",
+            "is_public",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "ix_libraryItems_library_id_owner_id",
+            "library_id",
+            "owner_id",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "ix_libraryItems_library_id_owner_id_is_public_file_size",
+            "library_id",
+            "owner_id",
+            "is_public",
+            "file_size",
+            "id",
+        ),
+    )
     serialize_head_only: Tuple[str | None, ...] = (
         "id",
         "name",
@@ -46,7 +86,7 @@ class LibraryItem(BaseModel):
 
     # one to many relationship with Library, back_populates is used to define the relationship in the other model
     library_id: Mapped[Optional[str]] = mapped_column(
-        ForeignKey("library.id"), nullable=True
+        ForeignKey("library.id", ondelete="SET NULL"), nullable=True
     )
     library: Mapped["Library"] = relationship(back_populates="items")
 
@@ -0,0 +1,105 @@
+from typing import List, Optional
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Insert,
+    Integer,
+    String,
+    Table,
+    event,
+    func,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection
+from .model import BaseModel
+
+# Item count and total bytes of every (library, MIME type) pair. The rows are kept
+# up to date by the triggers below on every write to libraryItems, ORM or not, so
+# reading the statistics of a library never aggregates over its items.
+library_stats = Table(
+    "library_stats",
+    BaseModel.metadata,
+    Column(
+        "library_id",
+        String(36),
+        ForeignKey("library.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("mime_type", String(150), primary_key=True),
+    Column("item_count", Integer, nullable=False, default=0),
+    Column("total_bytes", Integer, nullable=False, default=0),
+)
+
+_ADD_NEW: str = (
+    "INSERT INTO library_stats(library_id, mime_type, item_count, total_bytes) "
+    "SELECT new.library_id, new.mime_type, 1, new.file_size "
+    "WHERE new.library_id IS NOT NULL "
+    "ON CONFLICT(library_id, mime_type) DO UPDATE SET "
+    "item_count = item_count + 1, total_bytes = total_bytes + excluded.total_bytes;"
+)
+_REMOVE_OLD: str = (
+    "UPDATE library_stats SET "
+    "item_count = item_count - 1, total_bytes = total_bytes - old.file_size "
+    "WHERE library_id = old.library_id AND mime_type = old.mime_type; "
+    "DELETE FROM library_stats "
+    "WHERE library_id = old.library_id AND mime_type = old.mime_type "
+    "AND item_count <= 0;"
+)
+
+LIBRARY_STATS_TRIGGERS: List[str] = [
+    'CREATE TRIGGER IF NOT EXISTS library_stats_ai AFTER INSERT ON "libraryItems" '
+    f"BEGIN {_ADD_NEW} END",
+    'CREATE TRIGGER IF NOT EXISTS library_stats_ad AFTER DELETE ON "libraryItems" '
+    f"BEGIN {_REMOVE_OLD} END",
+    "CREATE TRIGGER IF NOT EXISTS library_stats_au "
+    'AFTER UPDATE OF library_id, mime_type, file_size ON "libraryItems" '
+    f"BEGIN {_REMOVE_OLD} {_ADD_NEW} END",
+    # SQLite only enforces ON DELETE CASCADE with foreign_keys enabled
+    'CREATE TRIGGER IF NOT EXISTS library_stats_library_ad AFTER DELETE ON "library" '
+    "BEGIN DELETE FROM library_stats WHERE library_id = old.id; END",
+]
+
+
+def recompute_library_stats(library_ids: Optional[List[str]] = None) -> Insert:
+    """
+    Build the INSERT ... SELECT recomputing `library_stats` from the library items.
+
+    The rows it replaces have to be deleted first.
+
+    :param library_ids: The libraries to recompute, by default all of them
+    """
+    items: Table = BaseModel.metadata.tables["libraryItems"]
+    return library_stats.insert().from_select(
+        ["library_id", "mime_type", "item_count", "total_bytes"],
+        select(
+            items.c.library_id,
+            items.c.mime_type,
+            func.count(),
+            func.coalesce(func.sum(items.c.file_size), 0),
+        )
+        .where(
+            items.c.library_id.isnot(None)
+            if library_ids is None
+            else items.c.library_id.in_(library_ids)
+        )
+        .group_by(items.c.library_id, items.c.mime_type),
+    )
+
+
+@event.listens_for(BaseModel.metadata, "after_create")
+def create_library_stats_triggers(target, connection: Connection, **kwargs) -> None:
+    """
+    Create the triggers maintaining `library_stats` along with the tables on `create_all`.
+
+    Databases set up through the migrations get them from the migration instead.
+    A table created next to existing items is filled from them.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    for statement in LIBRARY_STATS_TRIGGERS:
+        connection.execute(text(statement))
+
+    empty = connection.execute(library_stats.select().limit(1)).first()
+    if empty is None:
+        connection.execute(recompute_library_stats())
@@ -1,11 +1,23 @@
 from datetime import datetime
 from typing import Type, TypeVar, List, Optional, Tuple, Union, Any, Dict
-from sqlalchemy import String, DateTime
-from sqlalchemy.orm import declared_attr, Mapped, mapped_column
+from sqlalchemy import String, DateTime, event
+from sqlalchemy.orm import (
+    declared_attr,
+    Mapped,
+    Mapper,
+    configure_mappers,
+    mapped_column,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy_serializer import SerializerMixin
 from uuid import uuid4, UUID
 
+from .serializer import (
+    SerializationPlan,
+    compile_fieldset_plan,
+    compile_serialization_plans,
+)
+
 # Type variable for model classes
 T = TypeVar("T", bound="BaseModel")
 
@@ -27,6 +39,10 @@ class BaseModel(base, SerializerMixin):
     serialize_only: Tuple[Union[str, None], ...] = tuple()
     serialize_rules: Tuple[Union[str, None], ...] = tuple()
 
+    # Filled by `compile_serialization_plans` once the mappers are configured
+    __serialization_plans__: Dict[bool, SerializationPlan] = {}
+    MAX_CACHED_FIELDSETS: int = 64
+
     @declared_attr
     def id(cls) -> Mapped[str]:
         """
@@ -132,18 +148,78 @@ class BaseModel(base, SerializerMixin):
         """
         self.id = str(value)
 
-    def api_response(self, full: bool = True) -> str | List[Any] | Dict[Any, Any]:
+    def api_response(
+        self, full: bool = True, fields: Optional[Tuple[str, ...]] = None
+    ) -> str | List[Any] | Dict[Any, Any]:
         """
         Get a dictionary representation of the model instance for API responses.
 
+        :param full: True for the `serialize_only` fields, False for `serialize_head_only`.
+        :param fields: A sparse fieldset to serialize instead, see `selectable_fields`.
         :return: Dictionary representation of the model.
         """
-        if full:
-            return self.to_dict(rules=self.serialize_rules, only=self.serialize_only)
-        else:
-            return self.to_dict(
-                rules=self.serialize_head_rules, only=self.serialize_head_only
-            )
+        if fields:
+            return self.fieldset_plan(fields)(self)
+        return self.serialization_plan(full)(self)
+
+    @classmethod
+    def selectable_fields(cls) -> Tuple[str, ...]:
+        """
+        Get the fields API clients can select with a sparse fieldset.
+
+        :return: The fields of `serialize_only` and `serialize_head_only`.
+        """
+        return tuple(
+            field
+            for field in dict.fromkeys((*cls.serialize_only, *cls.serialize_head_only))
+            if field
+        )
+
+    @classmethod
+    def column_fields(cls) -> Tuple[str, ...]:
+        """
+        Get the selectable fields that are columns of the model's table.
+
+        :return: The fields a row of the table holds, without relationships.
+        """
+        columns = cls.__table__.columns
+        return tuple(field for field in cls.selectable_fields() if field in columns)
+
+    @classmethod
+    def fieldset_plan(cls, fields: Tuple[str, ...]) -> SerializationPlan:
+        """
+        Get the serializer of a sparse fieldset, compiled once per fieldset.
+
+        :param fields: The fields to serialize, already checked against `selectable_fields`.
+        :return: The serialization plan of the fieldset.
+        """
+        plans: Dict[Tuple[str, ...], SerializationPlan] = cls.__dict__.get(
+            "__fieldset_plans__", {}
+        )
+        plan: Optional[SerializationPlan] = plans.get(fields)
+        if plan is None:
+            cls.serialization_plan()  # The fieldset links to the compiled model plans
+            if not plans or len(plans) >= cls.MAX_CACHED_FIELDSETS:
+                plans = {}
+                cls.__fieldset_plans__ = plans
+            plan = plans[fields] = compile_fieldset_plan(cls, fields)
+        return plan
+
+    @classmethod
+    def serialization_plan(cls, full: bool = True) -> SerializationPlan:
+        """
+        Get the precompiled serializer used by `api_response`.
+
+        :param full: True for the `serialize_only` plan, False for `serialize_head_only`.
+        :return: The serialization plan of this model.
+        """
+        plans: Dict[bool, SerializationPlan] = cls.__dict__.get(
+            "__serialization_plans__", {}
+        )
+        if not plans:
+            configure_mappers()
+            plans = cls.__dict__.get("__serialization_plans__", {})
+        return plans[full]
 
     @classmethod
     def seed(
@@ -153,3 +229,11 @@ class BaseModel(base, SerializerMixin):
         Seed the database with initial data.
         """
         raise NotImplementedError("Seed method must be implemented in the model.")
+
+
+@event.listens_for(Mapper, "after_configured")
+def _compile_serialization_plans() -> None:
+    """
+    Compile the API serializers of all models once their mappers are configured.
+    """
+    compile_serialization_plans(BaseModel)
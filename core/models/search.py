@@ -0,0 +1,131 @@
+from typing import Dict, List, Set, Tuple
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from .model import BaseModel
+
+# FTS5 external-content indexes, by name: (content table, indexed columns). The
+# indexes store only the terms, the text itself stays in the content table.
+SEARCH_INDEXES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "library_item_search": ("libraryItems", ("name", "description")),
+    "library_search": ("library", ("name",)),
+}
+
+# Prefix lengths FTS5 keeps extra index entries for, so prefix queries of up to
+# this many characters are index lookups instead of term scans
+SEARCH_PREFIXES: str = "2 3"
+
+
+def search_keys_table(index: str) -> str:
+    """
+    Name the table mapping the rowids of a search index to the IDs of its records.
+
+    The content tables have string primary keys, so their implicit rowids may be
+    renumbered by a VACUUM. The keys table's `INTEGER PRIMARY KEY` never is.
+    """
+    return f"{index}_keys"
+
+
+def search_index_names() -> Set[str]:
+    """
+    Name the tables and views backing the search indexes, none of which are in the
+    metadata: the FTS5 tables and their shadow tables, the keys tables and the views.
+    """
+    return {
+        f"{index}{suffix}"
+        for index in SEARCH_INDEXES
+        for suffix in ("", "_data", "_idx", "_docsize", "_config", "_keys", "_source")
+    }
+
+
+def search_index_ddl(index: str) -> List[str]:
+    """
+    Build the statements creating a search index and the triggers keeping it in sync.
+
+    The index reads its content through a view joining its keys table to the content
+    table. The update trigger only fires when the ID or an indexed column changes.
+    """
+    table, columns = SEARCH_INDEXES[index]
+    keys: str = search_keys_table(index)
+    names: str = ", ".join(columns)
+    new: str = ", ".join(f"new.{column}" for column in columns)
+    old: str = ", ".join(f"old.{column}" for column in columns)
+    remove: str = (
+        f"INSERT INTO {index}({index}, rowid, {names}) "
+        f"SELECT 'delete', search_rowid, {old} FROM {keys} WHERE id = old.id;"
+    )
+    add: str = (
+        f"INSERT INTO {index}(rowid, {names}) "
+        f"SELECT search_rowid, {new} FROM {keys} WHERE id = new.id;"
+    )
+    return [
+        f"CREATE TABLE IF NOT EXISTS {keys} ("
+        "search_rowid INTEGER PRIMARY KEY, id VARCHAR(36) NOT NULL UNIQUE)",
+        f"CREATE VIEW IF NOT EXISTS {index}_source AS "
+        f"SELECT k.search_rowid, "
+        f"{', '.join(f't.{column}' for column in columns)} "
+        f'FROM {keys} k JOIN "{table}" t ON t.id = k.id',
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+        f"{names}, content='{index}_source', content_rowid='search_rowid', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='{SEARCH_PREFIXES}')",
+        f'CREATE TRIGGER IF NOT EXISTS {index}_ai AFTER INSERT ON "{table}" '
+        f"BEGIN INSERT INTO {keys}(id) VALUES (new.id); {add} END",
+        f'CREATE TRIGGER IF NOT EXISTS {index}_ad AFTER DELETE ON "{table}" '
+        f"BEGIN {remove} DELETE FROM {keys} WHERE id = old.id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_au "
+        f'AFTER UPDATE OF id, {names} ON "{table}" '
+        f"BEGIN {remove} UPDATE {keys} SET id = new.id WHERE id = old.id; {add} END",
+    ]
+
+
+def drop_search_index_ddl(index: str) -> List[str]:
+    """
+    Build the statements dropping a search index, its triggers, view and keys table.
+    """
+    return [
+        *(
+            f"DROP TRIGGER IF EXISTS {index}_{trigger}"
+            for trigger in ("ai", "ad", "au")
+        ),
+        f"DROP TABLE IF EXISTS {index}",
+        f"DROP VIEW IF EXISTS {index}_source",
+        f"DROP TABLE IF EXISTS {search_keys_table(index)}",
+    ]
+
+
+def fill_search_index_ddl(index: str) -> List[str]:
+    """
+    Build the statements giving every record of the content table a key, then
+    filling the index from scratch.
+    """
+    table, _ = SEARCH_INDEXES[index]
+    keys: str = search_keys_table(index)
+    return [
+        f'INSERT OR IGNORE INTO {keys}(id) SELECT id FROM "{table}" ORDER BY rowid',
+        f"INSERT INTO {index}({index}) VALUES ('rebuild')",
+    ]
+
+
+@event.listens_for(BaseModel.metadata, "after_create")
+def create_search_indexes(target, connection: Connection, **kwargs) -> None:
+    """
+    Create the search indexes along with the tables on `create_all`.
+
+    Databases set up through the migrations get them from the migration instead.
+    An index created next to existing rows is filled with a 'rebuild', and an index
+    of an earlier layout, keyed on the rowids of the content table, is replaced.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    for index in SEARCH_INDEXES:
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": search_keys_table(index)},
+        ).first()
+        if not exists:
+            for statement in drop_search_index_ddl(index):
+                connection.execute(text(statement))
+        for statement in search_index_ddl(index):
+            connection.execute(text(statement))
+        if not exists:
+            for statement in fill_search_index_ddl(index):
+                connection.execute(text(statement))
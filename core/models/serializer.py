@@ -0,0 +1,178 @@
+from datetime import date, datetime, time
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Type
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Mapper
+from sqlalchemy_serializer import SerializerMixin
+from sqlalchemy_serializer.serializer import Serializer
+
+if TYPE_CHECKING:
+    from .model import BaseModel
+
+Converter = Optional[Callable[[Any], Any]]
+
+# Column types that sqlalchemy-serializer passes through untouched
+ATOMIC_TYPES: Tuple[type, ...] = (int, str, float, bool)
+
+
+class SerializationPlan:
+    """
+    A flat, precompiled replacement for `SerializerMixin.to_dict(only=..., rules=...)`.
+
+    The plan resolves the field list of a model once into (key, getter, converter)
+    entries, so serializing a row is a single pass over attributes without any rule
+    parsing or type dispatch. Models or field lists the plan cannot reproduce exactly
+    (rules, dotted or negative keys, custom serializer options) fall back to `to_dict`.
+    """
+
+    def __init__(
+        self,
+        model: Type["BaseModel"],
+        only: Tuple[Optional[str], ...],
+        rules: Tuple[Optional[str], ...],
+    ) -> None:
+        self.model: Type["BaseModel"] = model
+        self.only: Tuple[Optional[str], ...] = only
+        self.rules: Tuple[Optional[str], ...] = rules
+        self.fields: Optional[List[Tuple[str, Callable, Converter]]] = None
+
+    def __call__(self, instance: "BaseModel") -> Dict[str, Any]:
+        if self.fields is None:
+            return instance.to_dict(rules=self.rules, only=self.only)
+
+        data: Dict[str, Any] = {}
+        for key, getter, convert in self.fields:
+            value = getter(instance)
+            data[key] = value if convert is None else convert(value)
+        return data
+
+    def is_compilable(self) -> bool:
+        """
+        Check whether this plan can reproduce the output of `to_dict` exactly.
+        """
+        model = self.model
+        if self.rules or not self.only:
+            return False
+        if any(not key or "." in key or key.startswith("-") for key in self.only):
+            return False
+        return (
+            not model.serialize_types
+            and not model.exclude_values
+            and not model.serialize_columns
+            and model.get_tzinfo is SerializerMixin.get_tzinfo
+        )
+
+    def compile(
+        self, plans: Dict[Type["BaseModel"], Dict[bool, "SerializationPlan"]]
+    ) -> None:
+        """
+        Resolve the field list into getters and converters.
+
+        :param plans: The plans of every mapped model, used to serialize relationships
+        """
+        if not self.is_compilable():
+            self.fields = None
+            return
+
+        mapper: Mapper = sa_inspect(self.model)
+        fields: List[Tuple[str, Callable, Converter]] = []
+
+        for key in dict.fromkeys(self.only):  # Drop duplicates, keep the order
+            if key in mapper.relationships:
+                relationship = mapper.relationships[key]
+                nested = plans[relationship.mapper.class_][True]
+                converter = (
+                    _list_converter(nested)
+                    if relationship.uselist
+                    else _optional_converter(nested)
+                )
+            elif key in mapper.columns:
+                converter = self._column_converter(mapper.columns[key])
+            else:
+                converter = self._generic_converter()
+            fields.append((key, attrgetter(key), converter))
+
+        self.fields = fields
+
+    def _column_converter(self, column: Any) -> Converter:
+        try:
+            python_type: type = column.type.python_type
+        except NotImplementedError:
+            return self._generic_converter()
+
+        if issubclass(python_type, ATOMIC_TYPES):
+            return None
+        if issubclass(python_type, datetime):
+            return _optional_converter(_strftime_converter(self.model.datetime_format))
+        if issubclass(python_type, date):
+            return _optional_converter(_strftime_converter(self.model.date_format))
+        if issubclass(python_type, time):
+            return _optional_converter(_strftime_converter(self.model.time_format))
+        return self._generic_converter()
+
+    def _generic_converter(self) -> Converter:
+        serializer = Serializer(
+            date_format=self.model.date_format,
+            datetime_format=self.model.datetime_format,
+            time_format=self.model.time_format,
+            decimal_format=self.model.decimal_format,
+        )
+        return serializer.serialize
+
+
+def _strftime_converter(str_format: str) -> Callable[[Any], str]:
+    return lambda value: value.strftime(str_format)
+
+
+def _optional_converter(convert: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    return lambda value: None if value is None else convert(value)
+
+
+def _list_converter(convert: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    return lambda values: [convert(value) for value in values]
+
+
+def compile_serialization_plans(
+    base: Type["BaseModel"],
+) -> Dict[Type["BaseModel"], Dict[bool, SerializationPlan]]:
+    """
+    Build the full and head plans of every model mapped on the registry of `base`.
+
+    The plans are stored on each model as `__serialization_plans__`, keyed by the
+    `full` flag of `BaseModel.api_response`.
+    """
+    plans: Dict[Type["BaseModel"], Dict[bool, SerializationPlan]] = {}
+    for mapper in base.registry.mappers:
+        model = mapper.class_
+        plans[model] = {
+            True: SerializationPlan(model, model.serialize_only, model.serialize_rules),
+            False: SerializationPlan(
+                model, model.serialize_head_only, model.serialize_head_rules
+            ),
+        }
+
+    # Compile only once every plan exists, so relationships can link to each other
+    for model, model_plans in plans.items():
+        for plan in model_plans.values():
+            plan.compile(plans)
+        model.__serialization_plans__ = model_plans
+
+    return plans
+
+
+def compile_fieldset_plan(
+    model: Type["BaseModel"], fields: Tuple[str, ...]
+) -> SerializationPlan:
+    """
+    Build the plan of a sparse fieldset, relationships serialized with their full plans.
+
+    The full and head plans of every model must be compiled already.
+    """
+    plan = SerializationPlan(model, fields, ())
+    plan.compile(
+        {
+            mapper.class_: mapper.class_.__serialization_plans__
+            for mapper in model.registry.mappers
+        }
+    )
+    return plan
@@ -26,7 +26,7 @@ class Thumbnail(BaseModel):
     owner: Mapped["User"] = relationship("User", back_populates="libraryItemsThumbnails")
 
     # Foreign key relationship with Library
-    library_id: Mapped[int] = mapped_column(ForeignKey("library.id"), nullable=True)
+    library_id: Mapped[int] = mapped_column(ForeignKey("library.id", ondelete="SET NULL"), nullable=True)
     library: Mapped["Library"] = relationship("Library", back_populates="itemsThumbnails")
 
     # Additional properties specific to Thumbnails
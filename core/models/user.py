@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, DateTime, Boolean
+from sqlalchemy import String, DateTime, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import uuid
 import hashlib
@@ -18,6 +18,7 @@ if TYPE_CHECKING:
 
 class User(BaseModel):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
     __enable_seeding__ = True
 
     __default_hash_algorithm__ = "sha3_512"
@@ -60,14 +61,12 @@ class User(BaseModel):
     from .thumbnail import Thumbnail
 
     # Relationships defined with forward references
-    libraries: Mapped[List["Library"]] = relationship(
-        "Library", back_populates="owner", lazy="joined"
-    )
+    libraries: Mapped[List["Library"]] = relationship("Library", back_populates="owner")
     libraryItems: Mapped[List["LibraryItem"]] = relationship(
-        "LibraryItem", back_populates="owner", lazy="joined"
+        "LibraryItem", back_populates="owner"
     )
     libraryItemsThumbnails: Mapped[List["Thumbnail"]] = relationship(
-        "Thumbnail", back_populates="owner", lazy="joined"
+        "Thumbnail", back_populates="owner"
     )
 
     def __repr__(self) -> str:
@@ -1,16 +1,124 @@
 from models.library_item import LibraryItem
 from models.library import Library
-from typing import Optional, Union
+from typing import Any, Iterable, List, Optional, Set, Tuple, Union
 from flask_sqlalchemy import SQLAlchemy
 from flask import Flask
+from uuid import UUID
 
-from .repository import BaseRepository, execute_with_context
+from .repository import (
+    RANGE_OPERATORS,
+    BaseRepository,
+    ListQuery,
+    Profile,
+    execute_with_context,
+    read_with_context,
+)
 
 
 class LibraryItemRepository(BaseRepository[LibraryItem]):
+    NAME_LOOKUP_BATCH_SIZE: int = 500  # Stays well below SQLite's bound parameter limit
+
+    # Served by the (library_id, ...) indexes of LibraryItem, see `list_query`
+    FILTERS = {
+        "mime_type": ("eq", "prefix"),
+        "is_public": ("eq",),
+        "owner_id": ("eq",),
+        "file_size": ("eq", *RANGE_OPERATORS),
+        "created_at": RANGE_OPERATORS,
+        "name": ("eq", "prefix"),
+    }
+    SORTS = ("created_at", "file_size", "name")
+
     def __init__(self, db: SQLAlchemy, app: Flask):
         super().__init__(db=db, model=LibraryItem, app=app)
 
+    @read_with_context
+    def get_page_for_library(
+        self,
+        library_id: Union[UUID, str],
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        profile: Profile = None,
+        list_query: Optional[ListQuery] = None,
+    ) -> Tuple[List[LibraryItem], Optional[str]]:
+        """
+        Fetch one page of the items in a single library.
+
+        Args:
+            library_id (Union[UUID, str]): The ID of the library to list.
+            limit (Optional[int]): Maximum number of items to return.
+            after (Optional[str]): Cursor returned by a previous page.
+            profile (Profile): Name of the loader profile or a sparse fieldset to apply.
+            list_query (Optional[ListQuery]): Filters and sort from `list_query_for_library`.
+        Returns:
+            Tuple[List[LibraryItem], Optional[str]]: The items and the cursor of the next page.
+        """
+        return self.get_page(
+            limit=limit,
+            after=after,
+            profile=profile,
+            list_query=list_query or self.list_query_for_library(library_id),
+        )
+
+    def list_query_for_library(
+        self,
+        library_id: Union[UUID, str],
+        filters: Iterable[Tuple[str, str, Any]] = (),
+        sort: Optional[str] = None,
+    ) -> ListQuery:
+        """
+        Compile the filters and sort of the item list of a single library.
+
+        Args:
+            library_id (Union[UUID, str]): The ID of the library to list.
+            filters (Iterable[Tuple[str, str, Any]]): (field, operator, value) filters.
+            sort (Optional[str]): The sort field, prefixed with "-" for descending order.
+        Returns:
+            ListQuery: The list query, scoped to the library.
+        """
+        return self.list_query(filters, sort, library_id=str(library_id))
+
+    @execute_with_context
+    def existing_names(self, names: Iterable[str]) -> Set[str]:
+        """
+        Find which of the given item names are already taken.
+
+        Args:
+            names (Iterable[str]): The names to look up.
+        Returns:
+            Set[str]: The names that already belong to a library item.
+        """
+        names = list(dict.fromkeys(names))
+        existing: Set[str] = set()
+        for start in range(0, len(names), self.NAME_LOOKUP_BATCH_SIZE):
+            batch: List[str] = names[start : start + self.NAME_LOOKUP_BATCH_SIZE]
+            existing.update(
+                name
+                for (name,) in self.db.session.query(LibraryItem.name).filter(
+                    LibraryItem.name.in_(batch)
+                )
+            )
+        return existing
+
+    @read_with_context
+    def get_in_library(
+        self,
+        item_id: Union[UUID, str],
+        library_id: Union[UUID, str],
+        profile: Profile = None,
+    ) -> Optional[LibraryItem]:
+        """
+        Fetch a library item by ID, only if it belongs to the given library.
+
+        Args:
+            item_id (Union[UUID, str]): The ID of the library item.
+            library_id (Union[UUID, str]): The ID of the library it should belong to.
+            profile (Profile): Name of the loader profile or a sparse fieldset to apply.
+        Returns:
+            Optional[LibraryItem]: The library item if found, None otherwise.
+        """
+        return self.find(profile=profile, id=str(item_id), library_id=str(library_id))
+
     @execute_with_context
     def link_to_library(
         self,
@@ -3,10 +3,19 @@ from flask_sqlalchemy import SQLAlchemy
 from flask import Flask
 from sqlalchemy.exc import SQLAlchemyError
 from models.user import User
-from .repository import BaseRepository
+from .repository import RANGE_OPERATORS, BaseRepository
 
 
 class LibraryRepository(BaseRepository[Library]):
+    # Served by the indexes of Library, see `list_query`
+    FILTERS = {
+        "is_public": ("eq",),
+        "owner_id": ("eq",),
+        "created_at": RANGE_OPERATORS,
+        "name": ("eq", "prefix"),
+    }
+    SORTS = ("created_at", "name")
+
     def __init__(self, db: SQLAlchemy, app: Flask):
         super().__init__(db=db, model=Library, app=app)
 
@@ -29,10 +38,10 @@ class LibraryRepository(BaseRepository[Library]):
 
             # Assume 'owner_id' is the linking field
             library.owner_id = user_id
-            self.db.session.commit()
+            self._commit()
             return True
         except SQLAlchemyError as e:
-            self.db.session.rollback()
+            self._rollback()
             self.app.logger.error(f"Failed to link library: {e}")
             return False
 
@@ -60,9 +69,9 @@ class LibraryRepository(BaseRepository[Library]):
 
             # Set the owner_id to None to unlink
             library.owner_id = None
-            self.db.session.commit()
+            self._commit()
             return True
         except SQLAlchemyError as e:
-            self.db.session.rollback()
+            self._rollback()
             self.app.logger.error(f"Failed to unlink library: {e}")
             return False
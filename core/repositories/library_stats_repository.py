@@ -0,0 +1,124 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+from uuid import UUID
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import select
+
+from models.library import Library
+from models.library_stats import library_stats, recompute_library_stats
+
+from .repository import execute_with_context
+
+
+def empty_stats() -> Dict[str, Any]:
+    return {"item_count": 0, "total_bytes": 0, "mime_types": {}}
+
+
+class LibraryStatsRepository:
+    """
+    Read and repair the per-library item statistics of `library_stats`.
+
+    The statistics are maintained by triggers on every item write, so reads are a
+    primary key lookup of a few rows (one per MIME type) instead of an aggregate
+    over the items of the library.
+    """
+
+    REPAIR_CHUNK_SIZE: int = 500  # Libraries recomputed per transaction
+
+    def __init__(self, db: SQLAlchemy, app: Flask):
+        self.db: SQLAlchemy = db
+        self.app: Flask = app
+
+    @execute_with_context
+    def get_for_library(self, library_id: Union[UUID, str]) -> Dict[str, Any]:
+        """
+        Get the item count, total bytes and MIME type breakdown of a library.
+
+        :param library_id: The ID of the library
+        :return: The statistics, all zero for a library without items
+        """
+        return self.get_for_libraries([library_id])[str(library_id)]
+
+    @execute_with_context
+    def get_for_libraries(
+        self, library_ids: Iterable[Union[UUID, str]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the statistics of many libraries in one query, see `get_for_library`.
+
+        :param library_ids: The IDs of the libraries
+        :return: The statistics by library ID
+        """
+        stats: Dict[str, Dict[str, Any]] = {
+            str(library_id): empty_stats() for library_id in library_ids
+        }
+        if not stats:
+            return stats
+
+        rows = self.db.session.execute(
+            select(library_stats).where(library_stats.c.library_id.in_(list(stats)))
+        )
+        for library_id, mime_type, item_count, total_bytes in rows:
+            library: Dict[str, Any] = stats[library_id]
+            library["item_count"] += item_count
+            library["total_bytes"] += total_bytes
+            library["mime_types"][mime_type] = {
+                "item_count": item_count,
+                "total_bytes": total_bytes,
+            }
+        return stats
+
+    @execute_with_context
+    def repair(
+        self,
+        chunk_size: Optional[int] = None,
+        on_chunk: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """
+        Recompute the statistics of every library from its items, in chunks of libraries.
+
+        Each chunk is replaced in its own transaction, so the triggers never see a
+        half-repaired library and writers are only blocked for the time of one chunk.
+        Rows left behind by deleted libraries are removed at the end.
+
+        :param chunk_size: Libraries recomputed per transaction
+        :param on_chunk: Called with the number of libraries repaired so far
+        :return: The number of libraries repaired
+        """
+        chunk_size = chunk_size or self.REPAIR_CHUNK_SIZE
+        repaired: int = 0
+        last_id: str = ""
+        while True:
+            library_ids: List[str] = (
+                self.db.session.execute(
+                    select(Library.id)
+                    .where(Library.id > last_id)
+                    .order_by(Library.id)
+                    .limit(chunk_size)
+                )
+                .scalars()
+                .all()
+            )
+            if not library_ids:
+                break
+
+            self.db.session.execute(
+                library_stats.delete().where(
+                    library_stats.c.library_id.in_(library_ids)
+                )
+            )
+            self.db.session.execute(recompute_library_stats(library_ids))
+            self.db.session.commit()
+
+            last_id = library_ids[-1]
+            repaired += len(library_ids)
+            if on_chunk:
+                on_chunk(repaired)
+
+        self.db.session.execute(
+            library_stats.delete().where(
+                library_stats.c.library_id.not_in(select(Library.id))
+            )
+        )
+        self.db.session.commit()
+        return repaired
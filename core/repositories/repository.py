@@ -1,45 +1,749 @@
-from typing import TypeVar, Generic, List, Optional, Type, Callable
-from sqlalchemy import func as sql_func
+from typing import (
+    Any,
+    Dict,
+    Set,
+    TypeVar,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Callable,
+    ContextManager,
+    Sequence,
+    Union,
+)
+from sqlalchemy import (
+    PrimaryKeyConstraint,
+    UniqueConstraint,
+    delete,
+    func as sql_func,
+    insert,
+    inspect,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.orm import MANYTOONE, Query, aliased, load_only, raiseload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
 from models.model import BaseModel
+from database import UNIT_OF_WORK_INFO, app_session, read_your_writes, reading, unit_of_work
 from sqlalchemy.exc import SQLAlchemyError
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime, timedelta
+from functools import wraps
 from uuid import UUID
+import base64
+import binascii
+import json
 
 T = TypeVar("T", bound=BaseModel)  # Generic type for models
 
+# A named loader profile, a sparse fieldset (see `parse_fieldset`), or None
+Profile = Union[str, Tuple[str, ...], None]
+
+# Rows a bulk write applies to: equality filters by field, or criteria (e.g. of a `ListQuery`)
+Where = Union[Dict[str, Any], Iterable[ColumnElement]]
+
+# Insert constructs with ON CONFLICT support, by dialect name
+UPSERT_INSERTS: Dict[str, Callable] = {
+    "sqlite": sqlite_insert,
+    "postgresql": postgresql_insert,
+}
+
+# Columns an upsert never overwrites on conflict
+UPSERT_PRESERVED_COLUMNS: Tuple[str, ...] = ("id", "created_at")
+
+MAX_LOAD_DEPTH: int = 3  # How deep loader profiles follow serialized relationships
+
+
+class InvalidCursorError(ValueError):
+    """
+    Raised when a pagination cursor cannot be decoded.
+    """
+
+
+class InvalidQueryError(ValueError):
+    """
+    Raised when list filters or a sort are not supported, or not backed by an index.
+    """
+
+
+def encode_position(position: List[Any]) -> str:
+    """
+    Encode a keyset position (a list of JSON values) into an opaque, url-safe cursor.
+    """
+    raw: bytes = json.dumps(position).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_position(cursor: str) -> List[Any]:
+    """
+    Decode a cursor created by `encode_position` back into its position.
+
+    :raises InvalidCursorError: When the cursor is malformed
+    """
+    try:
+        padded: str = cursor + "=" * (-len(cursor) % 4)
+        position: Any = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursorError(f"Invalid pagination cursor: {cursor}") from e
+    if not isinstance(position, list):
+        raise InvalidCursorError(f"Invalid pagination cursor: {cursor}")
+    return position
+
+
+def encode_cursor(entity: BaseModel, sort: str = "created_at") -> str:
+    """
+    Encode the keyset position of an entity into an opaque, url-safe cursor.
+
+    :param entity: The last record of a page
+    :param sort: The sort of the page, see `ListQuery.sort_key`
+    """
+    value: Any = getattr(entity, sort.lstrip("-"))
+    position: List[Any] = [
+        value.isoformat() if isinstance(value, datetime) else value,
+        str(entity.id),
+    ]
+    if sort != "created_at":
+        position.append(sort)
+    return encode_position(position)
+
+
+def decode_cursor(cursor: str, sort: str = "created_at") -> Tuple[Any, str]:
+    """
+    Decode a cursor created by `encode_cursor` back into its (sort value, id) position.
+
+    The sort value is returned as stored in the cursor, see `coerce_value`.
+
+    :raises InvalidCursorError: When the cursor is malformed or was made for another sort
+    """
+    try:
+        value, _id, *cursor_sort = decode_position(cursor)
+    except ValueError as e:
+        raise InvalidCursorError(f"Invalid pagination cursor: {cursor}") from e
+
+    if (cursor_sort or ["created_at"])[0] != sort:
+        raise InvalidCursorError(
+            f"Pagination cursor {cursor} belongs to another sort order"
+        )
+    return value, str(_id)
+
+
+def coerce_value(column: Any, raw: Any) -> Any:
+    """
+    Convert a query string or cursor value to the Python type of `column`.
+
+    :raises ValueError: When the value does not fit the column type
+    """
+    python_type: type = column.type.python_type
+    if isinstance(raw, python_type):
+        return raw
+    if python_type is bool:
+        lowered: str = str(raw).lower()
+        if lowered not in ("1", "0", "true", "false"):
+            raise ValueError(f"Invalid boolean: {raw}")
+        return lowered in ("1", "true")
+    if python_type is datetime:
+        return datetime.fromisoformat(raw)
+    return python_type(raw)
+
+
+def _prefix_criteria(column: Any, prefix: str) -> List[ColumnElement]:
+    """
+    Match a string prefix with a range, which SQLite serves from a (case-sensitive)
+    index, unlike LIKE.
+    """
+    if not prefix:
+        return []
+    upper: int = ord(prefix[-1]) + 1
+    if upper > 0x10FFFF:
+        return [column >= prefix]
+    return [column >= prefix, column < prefix[:-1] + chr(upper)]
+
+
+# Filter operators, by name, compiled into the criteria of a column and a value
+FILTER_OPERATORS: Dict[str, Callable[[Any, Any], List[ColumnElement]]] = {
+    "eq": lambda column, value: [column == value],
+    "gt": lambda column, value: [column > value],
+    "gte": lambda column, value: [column >= value],
+    "lt": lambda column, value: [column < value],
+    "lte": lambda column, value: [column <= value],
+    "prefix": _prefix_criteria,
+}
+RANGE_OPERATORS: Tuple[str, ...] = ("gt", "gte", "lt", "lte")
+
+
+class ListQuery:
+    """
+    The compiled filters and sort of a list endpoint, see `BaseRepository.list_query`.
+    """
+
+    def __init__(
+        self,
+        criteria: Optional[List[ColumnElement]] = None,
+        sort: str = "created_at",
+        descending: bool = False,
+    ) -> None:
+        self.criteria: List[ColumnElement] = criteria or []
+        self.sort: str = sort
+        self.descending: bool = descending
+
+    @property
+    def sort_key(self) -> str:
+        return f"-{self.sort}" if self.descending else self.sort
+
+
+class InvalidFieldsError(ValueError):
+    """
+    Raised when a sparse fieldset names fields the model does not expose.
+    """
+
+
+def parse_fieldset(model: Type[BaseModel], fields: str) -> Tuple[str, ...]:
+    """
+    Parse a comma separated `fields` parameter into a sparse fieldset of `model`.
+
+    Only the fields of `BaseModel.selectable_fields` can be selected, so a fieldset
+    never exposes more than the serializers of the model already do.
+    """
+    fieldset: Tuple[str, ...] = tuple(
+        dict.fromkeys(field.strip() for field in fields.split(",") if field.strip())
+    )
+    selectable: Tuple[str, ...] = model.selectable_fields()
+    unknown: List[str] = [field for field in fieldset if field not in selectable]
+    if not fieldset or unknown:
+        raise InvalidFieldsError(
+            f"Invalid fields: {', '.join(unknown) or fields}. "
+            f"Selectable fields are: {', '.join(selectable)}."
+        )
+    return fieldset
+
+
+def serialization_load_options(
+    model: Type[BaseModel], fields: Iterable[Optional[str]], depth: int = 0
+) -> List[LoaderOption]:
+    """
+    Build the loader options needed to serialize `fields` of `model` without extra queries.
+
+    Columns outside `fields` are deferred, serialized relationships are fetched with one
+    SELECT ... IN per relationship (recursing into their own `serialize_only`), and the
+    keyset columns (id, created_at) are always loaded.
+    """
+    mapper = inspect(model)
+    columns: Dict[str, Any] = {"id": model.id, "created_at": model.created_at}
+    options: List[LoaderOption] = []
+
+    for key in fields:
+        if key in mapper.columns:
+            columns[key] = getattr(model, key)
+        elif key in mapper.relationships and depth < MAX_LOAD_DEPTH:
+            relationship = mapper.relationships[key]
+            # The loader needs the foreign key of many-to-one relationships
+            for column in relationship.local_columns:
+                columns[column.key] = getattr(model, column.key)
+            related: Type[BaseModel] = relationship.mapper.class_
+            options.append(
+                selectinload(getattr(model, key)).options(
+                    *serialization_load_options(
+                        related, related.serialize_only, depth + 1
+                    )
+                )
+            )
+
+    return [load_only(*columns.values()), *options]
+
+
+def nested_version_joins(
+    model: Type[BaseModel],
+    fields: Iterable[Optional[str]],
+    source: Any = None,
+    depth: int = 0,
+) -> List[Tuple[Any, Any]]:
+    """
+    List the outer joins reaching the rows a serialization of `fields` of `model` nests.
+
+    A representation changes with the rows it nests, e.g. a library with its owner, so
+    their updated_at are part of its version. Like `serialization_load_options`, nested
+    rows are followed through their own `serialize_only`. Only many-to-one relationships
+    are followed, the joins then never multiply the rows of `model`.
+
+    :param source: The entity the relationships are joined from, `model` or an alias of it
+    :return: (alias of the nested model, relationship to join it on) pairs, in join order
+    """
+    mapper = inspect(model)
+    source = model if source is None else source
+    joins: List[Tuple[Any, Any]] = []
+
+    for key in fields:
+        if key not in mapper.relationships or depth >= MAX_LOAD_DEPTH:
+            continue
+        relationship = mapper.relationships[key]
+        if relationship.direction is not MANYTOONE:
+            continue
+        related: Type[BaseModel] = relationship.mapper.class_
+        target = aliased(related)
+        joins.append((target, getattr(source, key).of_type(target)))
+        joins.extend(
+            nested_version_joins(related, related.serialize_only, target, depth + 1)
+        )
+
+    return joins
+
+
 def execute_with_context(func: Callable) -> Callable:
     """
     Wraps a repository method to ensure it executes within the app context.
+
+    The caller's app context, e.g. the request's, is reused along with its session,
+    so nested calls share one session and entities stay attached between them.
     """
+    @wraps(func)
     def wrapper(self, *args, **kwargs):
-        with self.app.app_context():
+        with app_session(self.app, self.db):
+            return func(self, *args, **kwargs)
+    return wrapper
+
+def read_with_context(func: Callable) -> Callable:
+    """
+    Wraps a read-only repository method to run within the app context, on the reader engine.
+    """
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with app_session(self.app, self.db), reading():
             return func(self, *args, **kwargs)
     return wrapper
 
 class BaseRepository(Generic[T]):
+    DEFAULT_PAGE_SIZE: int = 50
+    MAX_PAGE_SIZE: int = 500
+    STREAM_BATCH_SIZE: int = 500
+    MAX_CACHED_FIELDSETS: int = 64
+
+    # Fields list endpoints may filter on, with their allowed operators
+    FILTERS: Dict[str, Tuple[str, ...]] = {"created_at": RANGE_OPERATORS}
+    # Fields list endpoints may sort on, in order of preference when none is requested
+    SORTS: Tuple[str, ...] = ("created_at",)
+
     def __init__(self, app: Flask, db: SQLAlchemy, model: Type[T]):
         self.db: SQLAlchemy = db
         self.app: Flask = app
         self.model: Type[T] = model
+        self._load_options: Dict[Union[str, Tuple[str, ...]], List[LoaderOption]] = {}
+        self._index_paths: Optional[List[Tuple[Tuple[str, ...], bool]]] = None
 
-    @execute_with_context
-    def get_all(self) -> List[T]:
-        return self.db.session.query(self.model).all()
+    @staticmethod
+    def read_your_writes() -> ContextManager[None]:
+        """
+        Route the reads run inside to the writer engine, e.g. right after a write:
+        `with repo.read_your_writes(): repo.get_by_id(_id)`.
+        """
+        return read_your_writes()
 
-    @execute_with_context
-    def get_by_id(self, _id: UUID) -> Optional[T]:
-        return self.db.session.query(self.model).filter_by(id=str(_id)).first()
+    def unit_of_work(self) -> ContextManager[Any]:
+        """
+        Run the repository calls inside in one transaction, see `database.unit_of_work`:
+        `with repo.unit_of_work(): repo.update(repo.get_by_id(_id))`.
+        """
+        return unit_of_work(self.app, self.db)
 
-    @execute_with_context
-    def find(self, **kwargs) -> Optional[T]:
-        return self.db.session.query(self.model).filter_by(**kwargs).first()
+    def load_profiles(self) -> Dict[str, Callable[[], List[LoaderOption]]]:
+        """
+        Get the named loader profiles queries of this repository can use.
+
+        - head: only the columns of `serialize_head_only`, relationships raise when touched
+        - full: the columns and relationships of `serialize_only`, relationships selectin-loaded
+        """
+        return {
+            "head": lambda: [
+                *serialization_load_options(self.model, self.model.serialize_head_only),
+                raiseload("*"),
+            ],
+            "full": lambda: serialization_load_options(
+                self.model, self.model.serialize_only
+            ),
+        }
+
+    def load_options(self, profile: Profile = None) -> List[LoaderOption]:
+        """
+        Get the loader options of a named profile, built once per repository.
+
+        A sparse fieldset loads only the columns of its fields (plus the keyset and
+        foreign key columns), and selectin-loads only the relationships it names.
+
+        :param profile: The profile name, a sparse fieldset, or None for the mapper defaults (lazy loading)
+        :return: The loader options to apply to a query
+        """
+        if profile is None:
+            return []
+
+        if isinstance(profile, tuple):
+            if profile not in self._load_options:
+                if len(self._load_options) >= self.MAX_CACHED_FIELDSETS:
+                    self._load_options.clear()
+                self._load_options[profile] = [
+                    *serialization_load_options(self.model, profile),
+                    raiseload("*"),
+                ]
+            return self._load_options[profile]
+
+        if profile not in self._load_options:
+            profiles = self.load_profiles()
+            if profile not in profiles:
+                raise ValueError(
+                    f"Unknown load profile '{profile}' for {self.model.__name__}."
+                )
+            self._load_options[profile] = profiles[profile]()
+        return self._load_options[profile]
+
+    def query(self, profile: Profile = None) -> Query:
+        """
+        Start a query on the model with the loader options of `profile` applied.
+        """
+        return self.db.session.query(self.model).options(*self.load_options(profile))
+
+    def list_query(
+        self,
+        filters: Iterable[Tuple[str, str, Any]] = (),
+        sort: Optional[str] = None,
+        **scope: Any,
+    ) -> ListQuery:
+        """
+        Compile whitelisted filters and a sort into the criteria and order of a list.
+
+        Only combinations an index can serve are accepted: its leading columns must be
+        equality filtered fields, the whole scope included, and the next index column
+        the sort field. Predicates the index leaves out, equality or range, are applied
+        as residual filters to the rows read in index order. A query whose predicates
+        the index serves none of is rejected instead of running as a scan.
+
+        :param filters: (field, operator, value) triples, operators from FILTER_OPERATORS
+        :param sort: A field of SORTS, prefixed with "-" for descending order. When None,
+            the field of SORTS leaving the fewest residual filters is used, the first
+            one on a tie
+        :param scope: Equality filters the endpoint always applies, e.g. a parent ID
+        :return: The compiled list query
+        :raises InvalidQueryError: When a filter or the sort is not supported or not indexed
+        """
+        criteria: List[ColumnElement] = [
+            getattr(self.model, field) == value for field, value in scope.items()
+        ]
+        equal: Set[str] = set(scope)
+        ranged: Set[str] = set()
+
+        for field, operator, raw in filters:
+            if field not in self.FILTERS:
+                raise InvalidQueryError(f"Filtering on '{field}' is not supported.")
+            if operator not in self.FILTERS[field]:
+                raise InvalidQueryError(
+                    f"Operator '{operator}' is not supported on '{field}'."
+                )
+            column = getattr(self.model, field)
+            try:
+                value: Any = coerce_value(column, raw)
+            except (TypeError, ValueError) as e:
+                raise InvalidQueryError(f"Invalid value for '{field}': {raw}") from e
+            criteria.extend(FILTER_OPERATORS[operator](column, value))
+            (equal if operator == "eq" else ranged).add(field)
+
+        descending: bool = bool(sort and sort.startswith("-"))
+        if sort:
+            if sort.lstrip("-") not in self.SORTS:
+                raise InvalidQueryError(f"Sorting on '{sort.lstrip('-')}' is not supported.")
+            candidates: Tuple[str, ...] = (sort.lstrip("-"),)
+        else:
+            candidates = self.SORTS
+
+        residuals: List[Tuple[int, int, str]] = []
+        for position, candidate in enumerate(candidates):
+            residual: Optional[int] = self.residual_filters(
+                equal, ranged, candidate, set(scope)
+            )
+            if residual is not None:
+                residuals.append((residual, position, candidate))
+        if not residuals:
+            raise InvalidQueryError(
+                "This combination of filters and sort is not backed by an index."
+            )
+        return ListQuery(criteria, min(residuals)[2], descending)
+
+    def index_paths(self) -> List[Tuple[Tuple[str, ...], bool]]:
+        """
+        Get the column lists of the indexes and unique constraints of the model's table.
+
+        :return: (columns, unique) per index
+        """
+        if self._index_paths is None:
+            table = self.model.__table__
+            self._index_paths = [
+                (tuple(column.name for column in index.columns), bool(index.unique))
+                for index in table.indexes
+            ] + [
+                (tuple(column.name for column in constraint.columns), True)
+                for constraint in table.constraints
+                if isinstance(constraint, (PrimaryKeyConstraint, UniqueConstraint))
+            ]
+        return self._index_paths
+
+    def residual_filters(
+        self,
+        equal: Set[str],
+        ranged: Set[str],
+        sort: str,
+        scope: Set[str] = frozenset(),
+    ) -> Optional[int]:
+        """
+        Find the index that best serves equality filters on `equal`, range or prefix
+        filters on `ranged` and the order of `sort`.
+
+        An index serves them when its leading columns are fields of `equal`, all of
+        `scope` included, followed by the sort column. It must serve at least one of
+        the predicates, when there are any.
+
+        :return: The number of predicates left to filter row by row with the best index,
+            or None when no index serves the query
+        """
+        # With an equality filter on the sort field, rows are ordered by ID alone
+        order: str = "id" if sort in equal else sort
+        predicates: int = len(equal) + len(ranged)
+        best: Optional[int] = None
+        for columns, unique in self.index_paths():
+            for length in range(len(columns) + 1):
+                prefix: Set[str] = set(columns[:length])
+                if not prefix <= equal:
+                    break
+                if not scope <= prefix:
+                    continue
+                if length == len(columns):
+                    # Equality on a whole unique index matches one row, any order will do
+                    served: int = length if unique else 0
+                elif columns[length] == order:
+                    served = length + (order in ranged)
+                else:
+                    continue
+                if served or not predicates:
+                    residual: int = predicates - served
+                    best = residual if best is None else min(best, residual)
+        return best
+
+    @read_with_context
+    def get_all(self, profile: Profile = None) -> List[T]:
+        return self.query(profile).all()
+
+    @read_with_context
+    def get_page(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        profile: Profile = None,
+        list_query: Optional[ListQuery] = None,
+        **kwargs: Any,
+    ) -> Tuple[List[T], Optional[str]]:
+        """
+        Fetch one page of records using keyset pagination on (sort field, id).
+
+        :param limit: Maximum number of records to return, clamped to MAX_PAGE_SIZE
+        :param after: Cursor returned by a previous page, or None for the first page
+        :param profile: Loader profile name or sparse fieldset to apply, see `load_options`
+        :param list_query: Filters and sort from `list_query`, by default (created_at, id) order
+        :param kwargs: Optional equality filters, as accepted by `find_all`
+        :return: The records of this page and the cursor of the next page (None on the last page)
+        """
+        limit = self.clamp_page_size(limit)
+        list_query = list_query or ListQuery()
+        query = (
+            self.query(self.with_sort_column(profile, list_query))
+            .filter_by(**kwargs)
+            .filter(*list_query.criteria)
+        )
+        sort_column = getattr(self.model, list_query.sort)
+
+        if after:
+            value, _id = decode_cursor(after, list_query.sort_key)
+            try:
+                value = coerce_value(sort_column, value)
+            except (TypeError, ValueError) as e:
+                raise InvalidCursorError(f"Invalid pagination cursor: {after}") from e
+            position = tuple_(sort_column, self.model.id)
+            query = query.filter(
+                position < tuple_(value, _id)
+                if list_query.descending
+                else position > tuple_(value, _id)
+            )
+
+        # Fetch one extra row to find out whether there is a next page
+        rows: List[T] = (
+            query.order_by(*self.list_order(list_query)).limit(limit + 1).all()
+        )
+        if len(rows) > limit:
+            return rows[:limit], encode_cursor(rows[limit - 1], list_query.sort_key)
+        return rows, None
+
+    @staticmethod
+    def with_sort_column(profile: Profile, list_query: ListQuery) -> Profile:
+        """
+        Make sure a sparse fieldset loads the sort column the next cursor is made of.
+        """
+        if isinstance(profile, tuple) and list_query.sort not in profile:
+            return (*profile, list_query.sort)
+        return profile
+
+    def list_order(self, list_query: ListQuery) -> Tuple[Any, Any]:
+        """
+        Get the ORDER BY clauses of a list query, the sort column then the ID.
+        """
+        sort_column = getattr(self.model, list_query.sort)
+        if list_query.descending:
+            return sort_column.desc(), self.model.id.desc()
+        return sort_column, self.model.id
+
+    def stream(
+        self,
+        batch_size: Optional[int] = None,
+        profile: Profile = None,
+        list_query: Optional[ListQuery] = None,
+        **kwargs: Any,
+    ) -> Iterator[T]:
+        """
+        Iterate over all matching records in (sort field, id) order through a server-side cursor.
+
+        Rows are fetched `batch_size` at a time, so memory stays flat regardless of the
+        collection size. The iteration runs lazily in the caller's app context; inside a
+        request wrap the consumer with `flask.stream_with_context`. The query runs on
+        the reader engine for the lifetime of the generator.
+
+        :param batch_size: Number of rows fetched per round trip
+        :param profile: Loader profile name or sparse fieldset to apply, see `load_options`
+        :param list_query: Filters and sort from `list_query`, by default (created_at, id) order
+        :param kwargs: Optional equality filters, as accepted by `find_all`
+        :return: An iterator over the records
+        """
+        list_query = list_query or ListQuery()
+        query = (
+            self.query(self.with_sort_column(profile, list_query))
+            .filter_by(**kwargs)
+            .filter(*list_query.criteria)
+            .order_by(*self.list_order(list_query))
+            .yield_per(batch_size or self.STREAM_BATCH_SIZE)
+        )
+        rows: Optional[Iterator[T]] = None
+        while True:
+            # Routed per row rather than across the yields, which may resume in another
+            # context (e.g. a thread of the ASGI executor). Starting the query and the
+            # selectin loads of each batch both happen in next().
+            with reading():
+                if rows is None:
+                    rows = iter(query)
+                row: Optional[T] = next(rows, None)
+            if row is None:
+                return
+            yield row
+
+    def clamp_page_size(self, limit: Optional[int]) -> int:
+        if limit is None or limit < 1:
+            return self.DEFAULT_PAGE_SIZE
+        return min(limit, self.MAX_PAGE_SIZE)
+
+    @read_with_context
+    def get_by_id(self, _id: UUID, profile: Profile = None) -> Optional[T]:
+        return self.query(profile).filter_by(id=str(_id)).first()
+
+    @read_with_context
+    def get_version(self, _id: UUID, **kwargs: Any) -> Optional[datetime]:
+        """
+        Fetch only the updated_at of a record, to validate cached copies cheaply.
+
+        :param _id: The ID of the record
+        :param kwargs: Optional equality filters the record must also match
+        :return: The updated_at of the record, or None if it does not exist
+        """
+        versions = self.get_versions(_id, **kwargs)
+        return versions[0] if versions else None
+
+    @read_with_context
+    def get_versions(
+        self,
+        _id: UUID,
+        fields: Optional[Iterable[Optional[str]]] = None,
+        **kwargs: Any,
+    ) -> Optional[Tuple[datetime, datetime]]:
+        """
+        Fetch the updated_at of a record and of the rows its representation nests.
+
+        :param _id: The ID of the record
+        :param fields: The serialized fields, e.g. `serialize_only` or a sparse fieldset
+        :param kwargs: Optional equality filters the record must also match
+        :return: The updated_at of the record and the last modification time of its
+            representation, or None if the record does not exist
+        """
+        joins: List[Tuple[Any, Any]] = nested_version_joins(self.model, fields or ())
+        # Filter first: filter_by applies to the last joined entity
+        query = (
+            self.db.session.query(
+                self.model.updated_at, *(target.updated_at for target, _ in joins)
+            )
+            .select_from(self.model)
+            .filter_by(id=str(_id), **kwargs)
+        )
+        for _, onclause in joins:
+            query = query.outerjoin(onclause)
+        row = query.first()
+        if row is None:
+            return None
+        return row[0], max(version for version in row if version is not None)
+
+    @read_with_context
+    def get_collection_version(
+        self,
+        *criteria: ColumnElement,
+        fields: Optional[Iterable[Optional[str]]] = None,
+        **kwargs: Any,
+    ) -> Tuple[Optional[datetime], int]:
+        """
+        Fetch max(updated_at) and the row count of a collection in one aggregate.
+
+        The updated_at of the rows the serialized `fields` nest count as well, see
+        `nested_version_joins`.
+
+        :param criteria: Optional filter criteria, e.g. those of a `ListQuery`
+        :param fields: The serialized fields, e.g. a sparse fieldset
+        :param kwargs: Optional equality filters, as accepted by `find_all`
+        :return: The last modification time (None when empty) and the number of records
+        """
+        joins: List[Tuple[Any, Any]] = nested_version_joins(self.model, fields or ())
+        # Filter first: filter_by applies to the last joined entity
+        query = (
+            self.db.session.query(
+                sql_func.count(self.model.id),
+                sql_func.max(self.model.updated_at),
+                *(sql_func.max(target.updated_at) for target, _ in joins),
+            )
+            .select_from(self.model)
+            .filter_by(**kwargs)
+            .filter(*criteria)
+        )
+        for _, onclause in joins:
+            query = query.outerjoin(onclause)
+        count, *versions = query.one()
+        last_modified: Optional[datetime] = max(
+            (version for version in versions if version is not None), default=None
+        )
+        return last_modified, count
+
+    @read_with_context
+    def find(self, profile: Profile = None, **kwargs) -> Optional[T]:
+        return self.query(profile).filter_by(**kwargs).first()
     
-    @execute_with_context
-    def find_all(self, **kwargs) -> List[T]:
-        return self.db.session.query(self.model).filter_by(**kwargs).all()
+    @read_with_context
+    def find_all(self, profile: Profile = None, **kwargs) -> List[T]:
+        return self.query(profile).filter_by(**kwargs).all()
     
-    @execute_with_context
+    @read_with_context
     def all(self) -> List[T]:
         return self.db.session.query(self.model).all()
     
@@ -49,6 +753,212 @@ class BaseRepository(Generic[T]):
         self._commit()
         return entity
 
+    @execute_with_context
+    def insert_many(self, rows: List[Dict[str, Any]]) -> List[str]:
+        """
+        Insert many records with multi-row INSERT statements, committed as one transaction.
+
+        Column defaults (id, timestamps, ...) are applied per row, and SQLAlchemy batches
+        the rows into as few INSERT ... VALUES statements as the driver allows.
+
+        :param rows: The column values of each record
+        :return: The IDs of the inserted records, in the order of `rows`
+        """
+        if not rows:
+            return []
+
+        try:
+            ids: List[str] = list(
+                self.db.session.scalars(
+                    insert(self.model).returning(
+                        self.model.id, sort_by_parameter_order=True
+                    ),
+                    rows,
+                )
+            )
+            self._commit()
+        except SQLAlchemyError as e:
+            self._rollback()
+            raise e
+        return ids
+
+    @execute_with_context
+    def add_many(self, entities: List[T]) -> int:
+        """
+        Add many records in one flush, committed as one transaction.
+
+        Unlike `insert_many`, the records go through the unit of work: the per-row
+        mapper and session events fire as they do for `add`, and SQLAlchemy still
+        batches the rows into multi-row INSERT statements.
+
+        :param entities: The records to add
+        :return: The number of records added
+        """
+        if not entities:
+            return 0
+
+        try:
+            self.db.session.add_all(entities)
+            self._commit()
+        except SQLAlchemyError as e:
+            self._rollback()
+            raise e
+        return len(entities)
+
+    @execute_with_context
+    def update_many(self, where: Where, values: Dict[str, Any]) -> int:
+        """
+        Update all matching records with a single UPDATE statement, committed as one transaction.
+
+        The statement runs through the ORM session: `updated_at` gets its onupdate value,
+        records already loaded in the session are synchronized, and the session's
+        `do_orm_execute` and `after_bulk_update` events fire. The per-row mapper events
+        (`before_update`, ...) do not, as no record is loaded.
+
+        :param where: Equality filters by field, or criteria; an empty filter is rejected,
+            pass `[sqlalchemy.true()]` to update every record
+        :param values: The new column values
+        :return: The number of records updated
+        """
+        if not values:
+            return 0
+
+        return self._execute_bulk(
+            update(self.model).where(*self.where_criteria(where)).values(**values)
+        )
+
+    @execute_with_context
+    def delete_many(self, where: Where) -> int:
+        """
+        Delete all matching records with a single DELETE statement, committed as one transaction.
+
+        Like `update_many`, the session's `do_orm_execute` and `after_bulk_delete` events
+        fire, but not the per-row mapper events, and relationship cascades are left to
+        the database.
+
+        :param where: Equality filters by field, or criteria; an empty filter is rejected,
+            pass `[sqlalchemy.true()]` to delete every record
+        :return: The number of records deleted
+        """
+        return self._execute_bulk(delete(self.model).where(*self.where_criteria(where)))
+
+    @execute_with_context
+    def upsert_many(
+        self,
+        rows: List[Dict[str, Any]],
+        index_elements: Sequence[str] = ("id",),
+    ) -> int:
+        """
+        Insert many records, or update those conflicting on `index_elements`, committed as one transaction.
+
+        Rows are batched into multi-row INSERT ... ON CONFLICT DO UPDATE statements. On
+        conflict, the columns given in the rows (and `updated_at`) are overwritten,
+        except the conflict target, `id` and `created_at`. Column defaults apply to
+        new records, and the session's `do_orm_execute` event fires.
+
+        :param rows: The column values of each record, all with the same columns
+        :param index_elements: The columns of the unique index conflicts are detected on
+        :return: The number of records inserted or updated
+        """
+        if not rows:
+            return 0
+
+        dialect: str = self.db.session.get_bind(self.model).dialect.name
+        if dialect not in UPSERT_INSERTS:
+            raise NotImplementedError(f"Upserts are not supported on {dialect}.")
+
+        statement = UPSERT_INSERTS[dialect](self.model)
+        preserved: Set[str] = {*index_elements, *UPSERT_PRESERVED_COLUMNS}
+        columns: Set[str] = {*rows[0], "updated_at"} - preserved
+        statement = statement.on_conflict_do_update(
+            index_elements=list(index_elements),
+            set_={column: statement.excluded[column] for column in columns},
+        ).returning(self.model.id)
+
+        try:
+            count: int = len(self.db.session.scalars(statement, rows).all())
+            self._commit()
+        except SQLAlchemyError as e:
+            self._rollback()
+            raise e
+        return count
+
+    def where_criteria(self, where: Where) -> List[ColumnElement]:
+        """
+        Turn the filter of a bulk write into criteria, rejecting empty filters.
+        """
+        if isinstance(where, dict):
+            criteria: List[ColumnElement] = [
+                getattr(self.model, field) == value for field, value in where.items()
+            ]
+        else:
+            criteria = list(where)
+        if not criteria:
+            raise ValueError("Bulk writes need a filter, use [true()] to match every record.")
+        return criteria
+
+    def _execute_bulk(self, statement: Any) -> int:
+        try:
+            count: int = self.db.session.execute(statement).rowcount
+            self._commit()
+        except SQLAlchemyError as e:
+            self._rollback()
+            raise e
+        return count
+
+    @execute_with_context
+    def patch(
+        self,
+        _id: UUID,
+        values: Dict[str, Any],
+        versions: Optional[Sequence[datetime]] = None,
+        unmodified_since: Optional[datetime] = None,
+        **kwargs: Any,
+    ) -> Optional[T]:
+        """
+        Update some columns of one record with a single UPDATE ... RETURNING statement.
+
+        The preconditions are part of the WHERE clause, so a record changed since the
+        client's copy is simply not matched: nothing is read before the update, and the
+        returned row is not read again after it.
+
+        :param _id: The ID of the record
+        :param values: The new column values
+        :param versions: The updated_at values the record may still have, e.g. from If-Match
+        :param unmodified_since: A time the record must not have been modified after,
+            with HTTP date precision (If-Unmodified-Since)
+        :param kwargs: Optional equality filters the record must also match
+        :return: The updated record, detached with its columns loaded, or None when no
+            record matched the ID, the filters and the preconditions
+        """
+        statement = (
+            update(self.model)
+            .where(
+                self.model.id == str(_id),
+                *(getattr(self.model, field) == value for field, value in kwargs.items()),
+            )
+            .values(**values)
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+        if versions is not None:
+            statement = statement.where(self.model.updated_at.in_(versions))
+        if unmodified_since is not None:
+            statement = statement.where(
+                self.model.updated_at < unmodified_since + timedelta(seconds=1)
+            )
+
+        try:
+            entity: Optional[T] = self.db.session.scalars(statement).one_or_none()
+            if entity is not None:
+                # Keep the returned columns, the commit would expire them
+                self.db.session.expunge(entity)
+            self._commit()
+        except SQLAlchemyError as e:
+            self._rollback()
+            raise e
+        return entity
+
     @execute_with_context
     def update(self, entity: T) -> T:
         self.db.session.merge(entity)
@@ -60,15 +970,25 @@ class BaseRepository(Generic[T]):
         self.db.session.delete(entity)
         self._commit()
 
-    @execute_with_context
     def _commit(self) -> None:
+        """
+        Commit the session, or only flush it inside a `unit_of_work`, which commits once at its end.
+        """
         try:
-            self.db.session.commit()
+            if self.db.session.info.get(UNIT_OF_WORK_INFO):
+                self.db.session.flush()
+            else:
+                self.db.session.commit()
         except SQLAlchemyError as e:
-            self.db.session.rollback()
+            self._rollback()
             raise e
+
+    def _rollback(self) -> None:
+        # Inside a unit of work, the unit as a whole is rolled back when the error reaches it
+        if not self.db.session.info.get(UNIT_OF_WORK_INFO):
+            self.db.session.rollback()
         
-    @execute_with_context
+    @read_with_context
     def count(self) -> int:
         return self.db.session.query(sql_func.count(self.model.id)).scalar()
 
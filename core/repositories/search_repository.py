@@ -0,0 +1,228 @@
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+
+from models.library import Library
+from models.library_item import LibraryItem
+from models.model import BaseModel
+from models.search import SEARCH_INDEXES, search_keys_table
+
+from .library_item_repository import LibraryItemRepository
+from .library_repository import LibraryRepository
+from .repository import (
+    BaseRepository,
+    InvalidCursorError,
+    decode_position,
+    encode_position,
+    execute_with_context,
+)
+
+# One hit: (kind, ID, rank), ranks are bm25 scores and lower is better
+SearchHit = Tuple[str, str, float]
+
+
+class InvalidSearchError(ValueError):
+    """
+    Raised when a search query holds no searchable terms.
+    """
+
+
+class SearchRepository:
+    """
+    Ranked full-text search over library items (name, description) and libraries (name).
+
+    Hits of both kinds are ranked together by bm25, with matches on a name weighing
+    more than matches on a description, and paginated with a (rank, kind, id) keyset.
+    """
+
+    MAX_TERMS: int = 16
+    REBUILD_BATCH_SIZE: int = 5_000
+    NAME_WEIGHT: float = 10.0
+
+    # Kind name -> (search index, model)
+    KINDS: Dict[str, Tuple[str, type]] = {
+        "library_item": ("library_item_search", LibraryItem),
+        "library": ("library_search", Library),
+    }
+
+    def __init__(self, db: SQLAlchemy, app: Flask):
+        self.db: SQLAlchemy = db
+        self.app: Flask = app
+        self.repos: Dict[str, BaseRepository] = {
+            "library_item": LibraryItemRepository(db=db, app=app),
+            "library": LibraryRepository(db=db, app=app),
+        }
+
+    def match_expression(self, query: str) -> str:
+        """
+        Turn free text into an FTS5 MATCH expression where every term is a prefix.
+
+        Terms are quoted, so FTS5 operators and column filters typed by a client are
+        searched for as plain words.
+
+        :raises InvalidSearchError: When the query holds no terms
+        """
+        terms: List[str] = re.findall(r"\w+", query)[: self.MAX_TERMS]
+        if not terms:
+            raise InvalidSearchError("The search query holds no searchable terms.")
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def hits_statement(self, kinds: Iterable[str], after: bool) -> str:
+        selects: List[str] = []
+        for kind in kinds:
+            index, _ = self.KINDS[kind]
+            _, columns = SEARCH_INDEXES[index]
+            weights: str = ", ".join(
+                str(self.NAME_WEIGHT if column == "name" else 1.0) for column in columns
+            )
+            selects.append(
+                f"SELECT '{kind}' AS kind, k.id AS id, bm25({index}, {weights}) AS rank "
+                f"FROM {index} JOIN {search_keys_table(index)} k "
+                f"ON k.search_rowid = {index}.rowid WHERE {index} MATCH :match"
+            )
+        keyset: str = "WHERE (rank, kind, id) > (:rank, :kind, :id) " if after else ""
+        return (
+            f"SELECT kind, id, rank FROM ({' UNION ALL '.join(selects)}) "
+            f"{keyset}ORDER BY rank, kind, id LIMIT :limit"
+        )
+
+    @execute_with_context
+    def search(
+        self,
+        query: str,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        kinds: Optional[Iterable[str]] = None,
+    ) -> Tuple[List[Tuple[str, BaseModel, float]], Optional[str]]:
+        """
+        Fetch one page of search results.
+
+        :param query: Free text, every term has to match the start of a word
+        :param limit: Maximum number of results, clamped like list pages
+        :param after: Cursor returned by a previous page, or None for the first page
+        :param kinds: Kinds of results to include, see KINDS, by default all of them
+        :return: (kind, entity, rank) per result, best first, and the cursor of the next page
+        :raises InvalidSearchError: When the query holds no terms
+        :raises InvalidCursorError: When the cursor is malformed
+        """
+        kinds = list(kinds or self.KINDS)
+        limit = self.repos["library_item"].clamp_page_size(limit)
+        params: Dict[str, Any] = {
+            "match": self.match_expression(query),
+            "limit": limit + 1,
+        }
+        if after:
+            try:
+                params["rank"], params["kind"], params["id"] = decode_position(after)
+                params["rank"] = float(params["rank"])
+            except (TypeError, ValueError) as e:
+                raise InvalidCursorError(f"Invalid pagination cursor: {after}") from e
+
+        hits: List[SearchHit] = [
+            tuple(row)
+            for row in self.db.session.execute(
+                text(self.hits_statement(kinds, bool(after))), params
+            )
+        ]
+        next_cursor: Optional[str] = None
+        if len(hits) > limit:
+            hits = hits[:limit]
+            kind, _id, rank = hits[-1]
+            next_cursor = encode_position([rank, kind, _id])
+
+        return [
+            (kind, entity, rank)
+            for kind, entity, rank in self.load_hits(hits)
+            if entity is not None
+        ], next_cursor
+
+    def load_hits(
+        self, hits: List[SearchHit]
+    ) -> List[Tuple[str, Optional[BaseModel], float]]:
+        """
+        Load the entities of the hits with one query per kind, keeping the rank order.
+        """
+        entities: Dict[Tuple[str, str], BaseModel] = {}
+        for kind, repo in self.repos.items():
+            ids: List[str] = [_id for hit_kind, _id, _ in hits if hit_kind == kind]
+            if ids:
+                for entity in repo.query("head").filter(repo.model.id.in_(ids)):
+                    entities[kind, entity.id] = entity
+        return [(kind, entities.get((kind, _id)), rank) for kind, _id, rank in hits]
+
+    @execute_with_context
+    def rebuild(
+        self,
+        batch_size: Optional[int] = None,
+        on_batch: Optional[Callable[[str, int], None]] = None,
+    ) -> Dict[str, int]:
+        """
+        Rebuild the search indexes from their content tables, in batches.
+
+        The keys of the records are brought in line with the content table first, then
+        the index is filled in the order of the keys. Every batch is its own transaction,
+        so writers are only blocked for the time of one batch. Searches see a partial
+        index until the rebuild finishes.
+
+        :param batch_size: Rows indexed per transaction
+        :param on_batch: Called with the index name and the rows indexed so far
+        :return: The number of rows indexed, per index
+        """
+        batch_size = batch_size or self.REBUILD_BATCH_SIZE
+        indexed: Dict[str, int] = {}
+        for index, (table, columns) in SEARCH_INDEXES.items():
+            keys: str = search_keys_table(index)
+            names: str = ", ".join(columns)
+            values: str = ", ".join(f"t.{column}" for column in columns)
+            self.db.session.execute(
+                text(f"INSERT INTO {index}({index}) VALUES ('delete-all')")
+            )
+            self.db.session.execute(
+                text(f'DELETE FROM {keys} WHERE id NOT IN (SELECT id FROM "{table}")')
+            )
+            self.db.session.execute(
+                text(
+                    f'INSERT OR IGNORE INTO {keys}(id) SELECT id FROM "{table}" '
+                    "ORDER BY rowid"
+                )
+            )
+            self.db.session.commit()
+
+            last_rowid, indexed[index] = 0, 0
+            while True:
+                rowids: List[int] = (
+                    self.db.session.execute(
+                        text(
+                            f"SELECT search_rowid FROM {keys} WHERE search_rowid > :last "
+                            "ORDER BY search_rowid LIMIT :limit"
+                        ),
+                        {"last": last_rowid, "limit": batch_size},
+                    )
+                    .scalars()
+                    .all()
+                )
+                if not rowids:
+                    break
+                self.db.session.execute(
+                    text(
+                        f"INSERT INTO {index}(rowid, {names}) "
+                        f"SELECT k.search_rowid, {values} "
+                        f'FROM {keys} k JOIN "{table}" t ON t.id = k.id '
+                        "WHERE k.search_rowid BETWEEN :first AND :last"
+                    ),
+                    {"first": rowids[0], "last": rowids[-1]},
+                )
+                self.db.session.commit()
+                last_rowid = rowids[-1]
+                indexed[index] += len(rowids)
+                if on_batch:
+                    on_batch(index, indexed[index])
+
+            # Merge the b-trees written batch by batch into one
+            self.db.session.execute(
+                text(f"INSERT INTO {index}({index}) VALUES ('optimize')")
+            )
+            self.db.session.commit()
+        return indexed
@@ -1,14 +1,35 @@
 from models.user import User
-from typing import Optional
+from typing import Callable, Dict, List, Optional
 from flask_sqlalchemy import SQLAlchemy
 from flask import Flask
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm.interfaces import LoaderOption
 
-from .repository import BaseRepository, execute_with_context
+from .repository import BaseRepository, execute_with_context, read_with_context
 
 class UserRepository(BaseRepository[User]):
     def __init__(self, db: SQLAlchemy, app: Flask):
         super().__init__(db=db, model=User, app=app)
 
+    def load_profiles(self) -> Dict[str, Callable[[], List[LoaderOption]]]:
+        """
+        Adds the `auth` profile: only the columns needed to resolve an API key.
+        """
+        return {
+            **super().load_profiles(),
+            "auth": lambda: [
+                load_only(
+                    User.id,
+                    User.username,
+                    User.email,
+                    User.api_key,
+                    User.is_active,
+                    User.is_admin,
+                    User.is_confirmed,
+                )
+            ],
+        }
+
     @execute_with_context
     def find_by_email(self, email: str) -> Optional[User]:
         self.db.session.query(User).all()
@@ -27,39 +48,39 @@ class UserRepository(BaseRepository[User]):
             user.generate_api_key()
             
         self.db.session.add(user)
-        self.db.session.commit()
+        self._commit()
         return user
     
     @execute_with_context
     def activate_user(self, user: User) -> None:
         user.is_active = True
         self.db.session.add(user)
-        self.db.session.commit()
+        self._commit()
         
     @execute_with_context
     def deactivate_user(self, user: User) -> None:
         user.is_active = False
         self.db.session.add(user)
-        self.db.session.commit()
+        self._commit()
         
     @execute_with_context
     def confirm_user(self, user: User) -> None:
         user.is_confirmed = True
         self.db.session.add(user)
-        self.db.session.commit()
+        self._commit()
         
     @execute_with_context
     def unconfirm_user(self, user: User) -> None:
         user.is_confirmed = False
         self.db.session.add(user)
-        self.db.session.commit()
+        self._commit()
         
-    @execute_with_context
+    @read_with_context
     def search_by_api_key(self, api_key: str, is_active: bool = True, is_admin: bool = False, is_confirmed: bool = True) -> Optional[User]:
-        query = self.db.session.query(User) \
+        query = self.query("auth") \
             .filter_by(api_key=api_key) \
             .filter_by(is_active=is_active) \
             .filter_by(is_confirmed=is_confirmed)
         if is_admin:
             query = query.filter_by(is_admin=True)
-        return query.first() if query.count() > 0 else None
\ No newline at end of file
+        return query.first()
\ No newline at end of file
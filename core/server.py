@@ -0,0 +1,149 @@
+import os
+import fcntl
+import asyncio
+import logging
+import threading
+from typing import IO, Any, Dict, Optional, TYPE_CHECKING
+
+from gunicorn.app.base import BaseApplication
+
+from api.metrics import RequestMetrics
+from metrics import MultiProcessMetrics
+
+if TYPE_CHECKING:
+    from main import CoreDaemon  # noqa: F401
+
+
+class SchedulerLeader:
+    """
+    File-lock leader election, so only one process of a pre-fork server runs `System.tick`.
+
+    Every worker tries to take an exclusive `flock` on the same file. The lock is held
+    as long as the leader's file stays open, and the OS releases it when the leader
+    exits or crashes, after which the next worker to retry takes over.
+    """
+
+    RETRY_INTERVAL_SECONDS = 5
+    LOGGER_CHILD = "SchedulerLeader"
+
+    def __init__(self, lock_path: str, logger: logging.Logger) -> None:
+        self.lock_path: str = lock_path
+        self.logger: logging.Logger = logger.getChild(self.LOGGER_CHILD)
+        self.lock_file: Optional[IO[str]] = None
+
+    def try_acquire(self) -> bool:
+        """Take the lock without blocking, return whether this process is the leader."""
+        if self.lock_file is not None:
+            return True
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.lock_path)), exist_ok=True)
+        lock_file = open(self.lock_path, "a+")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+
+        # The PID is only informative, the lock itself is what elects the leader
+        lock_file.truncate(0)
+        lock_file.write(f"{os.getpid()}\n")
+        lock_file.flush()
+        self.lock_file = lock_file
+        return True
+
+    def release(self) -> None:
+        if self.lock_file is None:
+            return
+        fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_UN)
+        self.lock_file.close()
+        self.lock_file = None
+
+    async def run(self, core_daemon: "CoreDaemon") -> None:
+        """Run the scheduler whenever this process is the leader, until the daemon stops."""
+        while core_daemon.running:
+            if not self.try_acquire():
+                await asyncio.sleep(self.RETRY_INTERVAL_SECONDS)
+                continue
+
+            self.logger.info(f"Process {os.getpid()} is the scheduler leader.")
+            try:
+                await core_daemon.system.tick(core_daemon)
+            finally:
+                await core_daemon.system.stop()
+                self.release()
+
+
+class GunicornServer(BaseApplication):
+    """
+    Production server: N pre-forked gunicorn workers sharing one listening socket.
+
+    The app is loaded once in the master and inherited by the workers. Each worker
+    runs a scheduler thread, of which only the elected leader ticks the tasks, see
+    `SchedulerLeader`. The workers share their metrics through `metrics_dir`, so a
+    scrape of /metrics covers all of them, see `MultiProcessMetrics`.
+    """
+
+    DEFAULT_THREADS = 4
+    DEFAULT_TIMEOUT_SECONDS = 30
+
+    def __init__(self, core_daemon: "CoreDaemon") -> None:
+        self.core_daemon: "CoreDaemon" = core_daemon
+        self.leader: Optional[SchedulerLeader] = None
+        self.metrics: Optional[MultiProcessMetrics] = None
+        MultiProcessMetrics.reset(core_daemon.metrics_dir)
+        super().__init__()
+
+    def load_config(self) -> None:
+        host: str = os.getenv("FLASK_HOST", "0.0.0.0")
+        port: int = int(os.getenv("FLASK_PORT", 5000))
+        options: Dict[str, Any] = {
+            "bind": f"{host}:{port}",
+            "workers": int(os.getenv("WORKERS", os.cpu_count() or 1)),
+            "worker_class": "gthread",
+            "threads": int(os.getenv("WORKER_THREADS", self.DEFAULT_THREADS)),
+            "timeout": int(os.getenv("WORKER_TIMEOUT", self.DEFAULT_TIMEOUT_SECONDS)),
+            "preload_app": True,
+            "post_fork": self.post_fork,
+            "worker_exit": self.worker_exit,
+            "child_exit": self.child_exit,
+        }
+        for key, value in options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return self.core_daemon.app
+
+    def post_fork(self, server: Any, worker: Any) -> None:
+        """Drop the DB connections inherited from the master and start the scheduler thread."""
+        with self.core_daemon.app.app_context():
+            for engine in self.core_daemon.db.engines.values():
+                engine.dispose(close=False)
+
+        request_metrics: Optional[RequestMetrics] = self.core_daemon.app.extensions.get(
+            RequestMetrics.EXTENSION_KEY
+        )
+        if request_metrics is not None:
+            self.metrics = MultiProcessMetrics(self.core_daemon.metrics_dir)
+            self.metrics.start()
+            request_metrics.multiprocess = self.metrics
+
+        self.core_daemon.running = True
+        self.leader = SchedulerLeader(
+            self.core_daemon.scheduler_lock_path, self.core_daemon.logger
+        )
+        threading.Thread(
+            target=asyncio.run,
+            args=(self.leader.run(self.core_daemon),),
+            name="Scheduler",
+            daemon=True,
+        ).start()
+
+    def worker_exit(self, server: Any, worker: Any) -> None:
+        """Stop the scheduler loop, which hands leadership over to another worker."""
+        self.core_daemon.running = False
+        if self.metrics is not None:
+            self.metrics.stop()
+
+    def child_exit(self, server: Any, worker: Any) -> None:
+        """Drop the gauges of an exited worker, in the master."""
+        MultiProcessMetrics.mark_process_dead(self.core_daemon.metrics_dir, worker.pid)
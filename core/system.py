@@ -6,9 +6,11 @@ import threading
 from flask_sqlalchemy import SQLAlchemy
 import setproctitle
 import importlib.util
+from time import perf_counter
 from datetime import datetime, timedelta
 from typing import Dict, List, Self, Type, Optional, TYPE_CHECKING
 
+from metrics import TASK_DURATION, TASK_LAG
 from tasks.task import Task
 
 if TYPE_CHECKING:
@@ -145,6 +147,7 @@ class System:
 
             for run_time in tasks_to_run:
                 for task in self.tasks[run_time]:
+                    TASK_LAG.observe((now - run_time).total_seconds(), task.name)
                     if task.is_blocking:
                         self.logger.info(
                             f"Blocking task detected: {task.name}. Waiting for running tasks to finish."
@@ -152,7 +155,7 @@ class System:
                         self.logger.info(f"Executing blocking task: {task.name}.")
                         await self._wait_for_running_tasks()
                         try:
-                            await task.tick()
+                            await self._timed_tick(task)
                         except Exception as e:
                             self.logger.error(
                                 f"Blocking task {task.name} failed with error: {e}"
@@ -163,7 +166,9 @@ class System:
                         self.logger.info(f"Running task: {task.name}.")
                         try:
                             if asyncio.iscoroutinefunction(task.tick):
-                                task_instance = asyncio.create_task(task.tick())
+                                task_instance = asyncio.create_task(
+                                    self._timed_tick(task)
+                                )
                                 self.running_tasks.append(task_instance)
                                 task_instance.add_done_callback(self._task_done)
                             else:
@@ -209,7 +214,15 @@ class System:
         """Run a synchronous task."""
         threading.current_thread().name = f"{self.TASK_THREAD_NAME_PREFIX}{task.name}"
         loop = asyncio.get_event_loop()
-        loop.run_until_complete(task.tick())
+        loop.run_until_complete(self._timed_tick(task))
+
+    async def _timed_tick(self, task: Task) -> None:
+        """Run a task and record its duration, failed runs included."""
+        start = perf_counter()
+        try:
+            await task.tick()
+        finally:
+            TASK_DURATION.observe(perf_counter() - start, task.name)
 
     def _task_done(self, task: asyncio.Task) -> None:
         """Callback for when an async task is done."""
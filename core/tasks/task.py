@@ -2,8 +2,10 @@ from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
 import threading
 import logging
+from typing import Any, ContextManager
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from database import unit_of_work
 
 class Task(ABC):
     def __init__(self, name: str, run_interval: timedelta, app: Flask, logger: logging.Logger, db: SQLAlchemy, is_blocking: bool = False) -> None:
@@ -24,6 +26,13 @@ class Task(ABC):
         """Define the logic to be executed for this task."""
         pass
     
+    def unit_of_work(self) -> ContextManager[Any]:
+        """
+        Run the repository calls inside in one transaction, committed when the block ends:
+        `with self.unit_of_work(): ...`. See `database.unit_of_work`.
+        """
+        return unit_of_work(self.app, self.db)
+
     def first_call(self) -> None:
         threading.current_thread().name = f"Task-{self.name}"
 
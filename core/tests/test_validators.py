@@ -0,0 +1,155 @@
+"""
+Check the compiled `InputValidator` against the previous, uncompiled implementation.
+
+Both must return the same errors, in the same order, for every case.
+
+    python -m pytest tests/test_validators.py
+"""
+
+from typing import Any, Dict, List
+
+import pytest
+
+from api.validators import InputValidator
+from benchmarks.validators import reference_verify_input
+from models.library import Library
+from models.library_item import LibraryItem
+from models.user import User
+
+SCHEMA: Dict[str, Any] = {
+    "name": str,
+    "count": int,
+    "tags": [str],
+    "meta": {"source": str, "size": int, "labels": [str]},
+}
+NESTED_SCHEMA: Dict[str, Any] = {
+    "owner": {"name": str, "address": {"city": str, "zip": int}},
+    "ids": [int, str],
+}
+
+ITEM: Dict[str, Any] = {
+    "name": "a",
+    "mime_type": "video/mp4",
+    "file_size": 1,
+    "file_path": "/a",
+    "is_public": False,
+}
+USER: Dict[str, Any] = {
+    "username": "u",
+    "email": "e@dmdd.eu",
+    "password_hash": "-",
+    "password_salt": "-",
+}
+
+MODEL_CASES: List[tuple] = [
+    pytest.param(ITEM, LibraryItem, id="item-valid"),
+    pytest.param({}, LibraryItem, id="item-missing"),
+    pytest.param({"name": "a", "file_size": 1}, LibraryItem, id="item-some-missing"),
+    pytest.param({**ITEM, "unknown": True}, LibraryItem, id="item-extra"),
+    pytest.param({**ITEM, "id": "x", "created_at": 1}, LibraryItem, id="item-internal"),
+    pytest.param(
+        {**ITEM, "name": 1, "file_size": "big", "is_public": "no"},
+        LibraryItem,
+        id="item-wrong-types",
+    ),
+    pytest.param(
+        {**ITEM, "description": None, "library_id": None},
+        LibraryItem,
+        id="item-nullable-none",
+    ),
+    pytest.param({**ITEM, "description": 5}, LibraryItem, id="item-nullable-wrong"),
+    pytest.param({"name": "lib", "description": "d"}, Library, id="library-valid"),
+    pytest.param({"name": "lib", "description": None}, Library, id="library-none"),
+    pytest.param({"name": ["lib"], "other": 1}, Library, id="library-wrong-extra"),
+    pytest.param(USER, User, id="user-valid"),
+    pytest.param(
+        {**USER, "first_name": None, "avatar": None}, User, id="user-nullable-none"
+    ),
+    pytest.param(
+        {"username": "u", "email": "e", "is_admin": "yes", "api_key": 5},
+        User,
+        id="user-wrong-missing",
+    ),
+]
+
+SCHEMA_CASES: List[tuple] = [
+    pytest.param(
+        {
+            "name": "a",
+            "count": 1,
+            "tags": ["x", "y"],
+            "meta": {"source": "s", "size": 1, "labels": []},
+        },
+        SCHEMA,
+        id="schema-valid",
+    ),
+    pytest.param({}, SCHEMA, id="schema-missing"),
+    pytest.param(None, SCHEMA, id="schema-none"),
+    pytest.param(
+        {"name": 1, "tags": ["x", 2], "meta": {"size": "1", "extra": 1}, "other": 1},
+        SCHEMA,
+        id="schema-wrong-extra",
+    ),
+    pytest.param({"tags": "x", "meta": []}, SCHEMA, id="schema-not-containers"),
+    pytest.param(
+        {"name": None, "count": None, "tags": [None], "meta": None},
+        SCHEMA,
+        id="schema-none-values",
+    ),
+    pytest.param(
+        {"owner": {"name": "o", "address": {"city": "c", "zip": 1}}, "ids": [1, "a"]},
+        NESTED_SCHEMA,
+        id="nested-valid",
+    ),
+    pytest.param(
+        {"owner": {"address": {"zip": "1", "street": "s"}, "x": 1}, "ids": [None]},
+        NESTED_SCHEMA,
+        id="nested-wrong-extra-missing",
+    ),
+    pytest.param(
+        {"owner": {"name": "o", "address": None}}, NESTED_SCHEMA, id="nested-none"
+    ),
+]
+
+
+@pytest.mark.parametrize("exclude_internal", [True, False])
+@pytest.mark.parametrize("input_data, model", MODEL_CASES + SCHEMA_CASES)
+def test_compiled_matches_reference(input_data, model, exclude_internal) -> None:
+    expected: List[str] = reference_verify_input(input_data, model, exclude_internal)
+    assert InputValidator.verify_input(input_data, model, exclude_internal) == expected
+    # Again, through the cached validator
+    assert InputValidator.verify_input(input_data, model, exclude_internal) == expected
+
+
+@pytest.mark.parametrize("input_data, model", MODEL_CASES + SCHEMA_CASES)
+def test_compiled_matches_reference_type_validation(input_data, model) -> None:
+    def strict(value: object, expected_type: type) -> bool:
+        return type(value) is expected_type
+
+    assert InputValidator.verify_input(
+        input_data, model, type_validation=strict
+    ) == reference_verify_input(input_data, model, type_validation=strict)
+
+
+def test_equal_schema_reuses_validator() -> None:
+    schema: Dict[str, Any] = {"name": str, "meta": {"size": int}}
+    validator = InputValidator.compile(schema)
+    assert InputValidator.compile({"name": str, "meta": {"size": int}}) is validator
+
+
+def test_mutated_schema_is_recompiled() -> None:
+    schema: Dict[str, Any] = {"name": str}
+    assert InputValidator.verify_input({"name": "a"}, schema) == []
+    schema["count"] = int
+    assert InputValidator.verify_input({"name": "a"}, schema) == reference_verify_input(
+        {"name": "a"}, schema
+    )
+
+
+def test_caches_are_bounded(monkeypatch) -> None:
+    monkeypatch.setattr(InputValidator, "_compiled", {})
+    monkeypatch.setattr(InputValidator, "_compiled_schemas", {})
+    for i in range(InputValidator.MAX_CACHED_VALIDATORS + 10):
+        InputValidator.compile({f"field_{i}": int})
+    assert len(InputValidator._compiled) <= InputValidator.MAX_CACHED_VALIDATORS
+    assert len(InputValidator._compiled_schemas) <= InputValidator.MAX_CACHED_SCHEMAS